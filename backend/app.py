@@ -1,18 +1,42 @@
 import os
-from flask import Flask, send_from_directory
+from flask import Flask
+from config import Config
 from modules.api.routes import api_bp
+from modules.scraper.pipeline import ParseStage
+from modules.alerts.engine import AlertEngine
+from modules.analytics.deal_index import DealIndex
+from modules.services.search_index import LocalSearchIndex
+from modules.services.write_behind import WriteBehindBuffer
 from modules.services.supabase_client import supabase
+from modules.services.static_assets import StaticManifest
 
-# Point Flask to the folder where Docker put the React files
-app = Flask(__name__, static_folder='static_react', static_url_path='/')
+# Docker puts the React build in 'static_react'. Flask's own static route is
+# disabled; the manifest below serves those files from memory instead.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_react')
+app = Flask(__name__, static_folder=None)
 
 # Register API Blueprint
 app.register_blueprint(api_bp)
 
+# Start the parser processes at boot rather than on the first search
+ParseStage().start()
+# Replay journals a crashed worker left behind now, not on the first search
+if Config.WRITE_BEHIND_ENABLED:
+    WriteBehindBuffer()
+# Alerts have to listen to every price this worker saves, not just after the first /api/alerts call
+AlertEngine()
+# Start warming the local search index before the first /api/search arrives
+LocalSearchIndex()
+# Same for the deals ranking, which also has to see every price saved from now on
+DealIndex()
+
+# Read, hash and precompress the build once per worker
+static_manifest = StaticManifest(STATIC_DIR)
+
 @app.route('/')
 def serve():
     """Serve the React App (index.html)"""
-    return send_from_directory(app.static_folder, 'index.html')
+    return static_manifest.respond('index.html')
 
 @app.route('/<path:path>')
 def static_proxy(path):
@@ -20,13 +44,7 @@ def static_proxy(path):
     Serve static files (JS, CSS, Images) from the React build.
     If file doesn't exist, return index.html (for Client-Side Routing).
     """
-    file_name = path.split('/')[-1]
-    dir_name = os.path.join(app.static_folder, '/'.join(path.split('/')[:-1]))
-    
-    if os.path.exists(os.path.join(app.static_folder, path)):
-        return send_from_directory(app.static_folder, path)
-    
-    return send_from_directory(app.static_folder, 'index.html')
+    return static_manifest.respond(path)
 
 if __name__ == '__main__':
     # Local Development
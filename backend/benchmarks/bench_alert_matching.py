@@ -0,0 +1,65 @@
+"""
+Benchmark: price-alert matching with millions of registered alerts.
+
+Builds an AlertIndex, then replays random price events against it and reports
+matching throughput, next to a naive scan over every alert of the product.
+
+Run from the backend folder:
+    python -m benchmarks.bench_alert_matching --alerts 2000000 --products 20000
+"""
+import time
+import random
+import argparse
+
+from modules.alerts.index import AlertIndex
+
+
+def build(n_alerts, n_products, rng):
+    base_prices = [rng.uniform(200, 100000) for _ in range(n_products)]
+    per_product = [[] for _ in range(n_products)]
+    for alert_id in range(n_alerts):
+        pid = rng.randrange(n_products)
+        # Users ask for 5-40% below the going price
+        per_product[pid].append((round(base_prices[pid] * rng.uniform(0.6, 0.95), 2), alert_id))
+    return base_prices, per_product
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--alerts', type=int, default=2_000_000)
+    parser.add_argument('--products', type=int, default=20_000)
+    parser.add_argument('--events', type=int, default=500_000)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    base_prices, per_product = build(args.alerts, args.products, rng)
+
+    index = AlertIndex()
+    start = time.perf_counter()
+    for pid, alerts in enumerate(per_product):
+        if alerts:
+            index.load(pid, alerts)
+    build_s = time.perf_counter() - start
+    print(f"{len(index):,} alerts over {args.products:,} products, loaded in {build_s:.2f}s")
+
+    # Price events hover around the going price, with occasional deep drops that fire alerts
+    events = [(pid, base_prices[pid] * (rng.uniform(0.55, 0.8) if rng.random() < 0.05 else rng.uniform(0.9, 1.1)))
+              for pid in (rng.randrange(args.products) for _ in range(args.events))]
+
+    start = time.perf_counter()
+    matched = sum(len(index.match(pid, price, consume=False)) for pid, price in events)
+    indexed_s = time.perf_counter() - start
+    print(f"sorted index : {args.events / indexed_s:>12,.0f} prices/s   ({matched:,} alert hits)")
+
+    # Naive baseline: check every alert of the product on each price
+    sample = events[:max(1, args.events // 20)]
+    start = time.perf_counter()
+    naive = sum(sum(1 for threshold, _ in per_product[pid] if threshold >= price) for pid, price in sample)
+    naive_s = time.perf_counter() - start
+    print(f"naive scan   : {len(sample) / naive_s:>12,.0f} prices/s   ({naive:,} alert hits on {len(sample):,} prices)")
+    print(f"\nspeedup: {(args.events / indexed_s) / (len(sample) / naive_s):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
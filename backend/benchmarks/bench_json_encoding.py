@@ -0,0 +1,79 @@
+"""
+Benchmark: encoding the enriched retail response.
+
+Compares Flask's stdlib `jsonify` encoding against `modules.api.encoding.dumps`
+(orjson when installed) on realistic 50-product payloads, and reports bytes
+on the wire with and without gzip.
+
+Run from the backend folder:
+    python -m benchmarks.bench_json_encoding
+"""
+import gzip
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from modules.api import encoding
+
+SOURCES = ["Amazon", "Flipkart", "eBay", "JioMart", "Myntra"]
+
+
+def build_payload(n_products=50, history_len=60, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    payload = []
+    for i in range(n_products):
+        base = rng.uniform(500, 90000)
+        history = [
+            {
+                "price_inr": round(base * rng.uniform(0.85, 1.15), 2),
+                "scraped_at": (start + timedelta(hours=6 * h)).isoformat() + "+00:00",
+            }
+            for h in range(history_len)
+        ]
+        source = rng.choice(SOURCES)
+        payload.append({
+            "title": f"Product {i} Wireless Noise Cancelling Headphones with 30H Battery – ₹ Edition",
+            "brand": source, "category": "Electronics",
+            "price": round(base, 2), "currency": "INR",
+            "url": f"https://www.example.com/dp/B0{i:08d}?ref=sr_1_{i}",
+            "image": f"https://m.media-amazon.com/images/I/{i:011d}._AC_UY218_.jpg",
+            "source": source, "type": "Retail",
+            "analysis": {
+                "score": rng.randint(0, 100), "verdict": "✅ Good Price",
+                "volatility": round(rng.uniform(0, 30), 2),
+                "history_count": history_len, "price_history": history,
+                "forecast": {"trend": "Downward", "change_pct": -2.4,
+                             "predicted_price": round(base * 0.97, 2), "confidence": 72},
+            },
+        })
+    return payload
+
+
+def stdlib_jsonify(payload):
+    # Same settings as Flask's DefaultJSONProvider outside debug mode
+    return json.dumps(payload, ensure_ascii=True, sort_keys=True,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def bench(label, fn, payload, number=200):
+    seconds = min(timeit.repeat(lambda: fn(payload), number=number, repeat=5)) / number
+    body = fn(payload)
+    gz = gzip.compress(body, compresslevel=encoding.GZIP_LEVEL)
+    print(f"{label:<28} {seconds * 1000:>8.3f} ms   {len(body) / 1024:>8.1f} KB raw   "
+          f"{len(gz) / 1024:>7.1f} KB gzip")
+    return seconds
+
+
+def main():
+    payload = build_payload()
+    backend = "orjson" if encoding.orjson is not None else "stdlib (orjson not installed)"
+    print(f"50 products x 60 history points | fast encoder: {backend}\n")
+    base = bench("jsonify (stdlib)", stdlib_jsonify, payload)
+    fast = bench("encoding.dumps", encoding.dumps, payload)
+    print(f"\nspeedup: {base / fast:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
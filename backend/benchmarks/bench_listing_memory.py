@@ -0,0 +1,80 @@
+"""
+Benchmark: memory per scraped listing, dict vs slotted ProductListing.
+
+Builds the same listings twice (as the per-item dicts the scrapers used to
+return, then as ProductListing records) and measures the heap each set holds
+with tracemalloc. Brands and categories are built as fresh strings, the way
+they come out of parsed HTML/JSON, so interning is measured too.
+
+Run from the backend folder:
+    python -m benchmarks.bench_listing_memory --listings 200000
+"""
+import random
+import argparse
+import tracemalloc
+
+from modules.scraper.records import ProductListing
+
+SOURCES = ["Amazon", "Flipkart", "eBay", "JioMart", "Myntra", "IKEA"]
+BRANDS = ["Samsung", "Apple", "Boat", "Nike", "Puma", "Tata", "Amul", "Philips", "Sony", "Levis"]
+CATEGORIES = ["Electronics", "Fashion", "Grocery", "Furniture", "General"]
+
+
+def raw_rows(n, seed):
+    """Per-listing fields as a scraper sees them; every parsed string is a new object."""
+    rng = random.Random(seed)
+    for i in range(n):
+        sku = rng.randrange(10 ** 9)
+        yield (
+            f"Product {sku} {rng.choice(BRANDS)} Edition {i}",
+            "".join(rng.choice(BRANDS)),        # fresh str, like BeautifulSoup/JSON output
+            "".join(rng.choice(CATEGORIES)),
+            round(rng.uniform(100, 90000), 2),
+            f"https://shop.example.com/p/{sku}",
+            f"https://img.example.com/{sku}.jpg",
+            rng.choice(SOURCES),
+        )
+
+
+def as_dict(row):
+    title, brand, category, price, url, image, source = row
+    return {"title": title, "brand": brand, "category": category, "price": price, "currency": "INR",
+            "url": url, "image": image, "source": source, "type": "Retail"}
+
+
+def as_record(row):
+    title, brand, category, price, url, image, source = row
+    return ProductListing(title, price, url, image, source, brand=brand, category=category)
+
+
+def measure(build, n, seed):
+    """Bytes still held after building n listings; parse-time strings a listing drops are freed."""
+    tracemalloc.start()
+    listings = [build(row) for row in raw_rows(n, seed)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return listings, held
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--listings', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    dicts, dict_bytes = measure(as_dict, args.listings, args.seed)
+    del dicts
+    records, record_bytes = measure(as_record, args.listings, args.seed)
+    del records
+
+    # Title, url and image strings cost the same in both layouts; the difference is container + interning
+    print(f"{args.listings:,} listings")
+    print(f"dict             : {dict_bytes / args.listings:>8.1f} bytes/listing")
+    print(f"ProductListing   : {record_bytes / args.listings:>8.1f} bytes/listing")
+    print(f"saved            : {(dict_bytes - record_bytes) / args.listings:>8.1f} bytes/listing "
+          f"({100 * (1 - record_bytes / dict_bytes):.0f}%), "
+          f"{(dict_bytes - record_bytes) / 2 ** 20:.1f} MB in total")
+
+
+if __name__ == '__main__':
+    main()
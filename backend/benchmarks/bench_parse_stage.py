@@ -0,0 +1,63 @@
+"""
+Benchmark: parse throughput, inline vs the process-pool ParseStage.
+
+Feeds the same fixture search pages (loadtest/fixtures.py, one per retail
+source) from a pool of fetch threads, the way ScraperEngine.fetch_source does,
+once with parsing inline on those threads and once through ParseStage with
+each worker count. There is no network here, so it measures the CPU half only.
+
+Run from the backend folder:
+    python -m benchmarks.bench_parse_stage --pages 600 --workers 2 4
+"""
+import os
+import time
+import argparse
+import concurrent.futures
+
+from config import Config
+from loadtest import fixtures
+from modules.scraper.parsers import parse_page
+from modules.scraper.pipeline import ParseStage
+
+
+def pages(n):
+    queries = ["green tea", "running shoe", "office chair", "gaming laptop", "basmati rice"]
+    sources = sorted(fixtures.RETAIL_SOURCES)
+    for i in range(n):
+        source = sources[i % len(sources)]
+        query = queries[i % len(queries)]
+        yield source, fixtures.retail_page(source, query), query, "general"
+
+
+def run(parse, work, threads):
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        listings = sum(len(r) for r in executor.map(lambda page: parse(*page), work))
+    return time.perf_counter() - started, listings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=600)
+    parser.add_argument('--threads', type=int, default=16, help="fetch threads handing pages over")
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    work = list(pages(args.pages))
+    print(f"{args.pages} pages, {sum(len(p[1]) for p in work) / len(work) / 1024:.0f} KB each, "
+          f"{args.threads} fetch threads")
+
+    elapsed, listings = run(parse_page, work, args.threads)
+    print(f"inline           : {args.pages / elapsed:>8.1f} pages/s  ({listings} listings)")
+
+    for workers in args.workers:
+        Config.SCRAPER_PARSE_WORKERS = workers
+        ParseStage._instance = None
+        stage = ParseStage().start()
+        elapsed, listings = run(stage.parse, work, args.threads)
+        stage.close()
+        print(f"{workers:>2} workers       : {args.pages / elapsed:>8.1f} pages/s  ({listings} listings)")
+
+
+if __name__ == '__main__':
+    main()
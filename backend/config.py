@@ -4,3 +4,50 @@ class Config:
     DEBUG = True
     DB_URL = os.getenv("DB_URL", "sqlite:///priceatlas.db")
     FOREX_API = os.getenv("FOREX_API", "")
+
+    # Batch search (/api/search/batch)
+    # Sized to finish inside BATCH_DEADLINE at BATCH_PER_HOST_LIMIT fetches per retailer
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "100"))
+    BATCH_DEADLINE = float(os.getenv("BATCH_DEADLINE", "90"))   # seconds; keep under gunicorn's --timeout
+    BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "16"))
+    BATCH_PER_HOST_LIMIT = int(os.getenv("BATCH_PER_HOST_LIMIT", "3"))
+
+    # Write-behind persistence (modules/services/write_behind.py)
+    WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "1") == "1"
+    WRITE_BEHIND_DIR = os.getenv("WRITE_BEHIND_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "write_behind"))
+    WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "5000"))
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "2"))
+    WRITE_BEHIND_PUT_TIMEOUT = float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT", "2"))
+    WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))   # lone failures before a record is dead-lettered
+
+    # Price history compaction (modules/services/compactor.py)
+    PRICE_COMPACT_AFTER_DAYS = int(os.getenv("PRICE_COMPACT_AFTER_DAYS", "30"))
+
+    # Price alerts (modules/alerts)
+    ALERT_NOTIFIER = os.getenv("ALERT_NOTIFIER", "log")    # "log" or "webhook"
+    ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL", "")
+    # Hosts an alert's own webhook contact may point at; empty allows any public address
+    ALERT_WEBHOOK_ALLOWED_HOSTS = tuple(h.strip().lower() for h in os.getenv("ALERT_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip())
+    ALERT_SYNC_INTERVAL = float(os.getenv("ALERT_SYNC_INTERVAL", "10"))
+
+    # Deals feed (modules/analytics/deal_index.py). Each worker polls price_latest for other workers' writes
+    DEAL_INDEX_SYNC_INTERVAL = float(os.getenv("DEAL_INDEX_SYNC_INTERVAL", "30"))
+    DEAL_INDEX_SYNC_LOOKBACK = float(os.getenv("DEAL_INDEX_SYNC_LOOKBACK", "300"))   # seconds; write-behind lands rows late
+
+    # Local search over stored products (modules/services/search_index.py)
+    LOCAL_SEARCH_ENABLED = os.getenv("LOCAL_SEARCH_ENABLED", "1") == "1"
+    LOCAL_SEARCH_TTL = int(os.getenv("LOCAL_SEARCH_TTL", str(6 * 3600)))   # seconds before a stored price is stale
+    LOCAL_SEARCH_MIN_RESULTS = int(os.getenv("LOCAL_SEARCH_MIN_RESULTS", "3"))   # distinct stored products needed to skip the live scrape
+    LOCAL_SEARCH_MAX_PRODUCTS = int(os.getenv("LOCAL_SEARCH_MAX_PRODUCTS", "30"))
+    LOCAL_SEARCH_MAX_REFRESHES = int(os.getenv("LOCAL_SEARCH_MAX_REFRESHES", "8"))   # background re-scrapes running or queued
+
+    # Forecast calibration (modules/ml/backtest.py)
+    FORECAST_CALIBRATION_PATH = os.getenv("FORECAST_CALIBRATION_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "forecast_calibration.json"))
+    FORECAST_CALIBRATION_MIN_FORECASTS = int(os.getenv("FORECAST_CALIBRATION_MIN_FORECASTS", "5"))
+
+    # Scraper parse stage (modules/scraper/pipeline.py)
+    # Per gunicorn worker: the cores are shared between WEB_CONCURRENCY workers. 0 parses on the fetch thread
+    SCRAPER_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS",
+                                          str(max(1, (os.cpu_count() or 1) // max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)))))
+    SCRAPER_PARSE_QUEUE = int(os.getenv("SCRAPER_PARSE_QUEUE", "32"))   # pages in flight before fetchers block
@@ -0,0 +1,122 @@
+import json
+import random
+import hashlib
+from html import escape
+
+from modules.scraper.records import ProductListing, B2BLead
+
+RETAIL_SOURCES = {
+    "amazon": ("Amazon", "https://www.amazon.in/dp/"),
+    "flipkart": ("Flipkart", "https://www.flipkart.com/p/"),
+    "ebay": ("eBay", "https://www.ebay.com/itm/"),
+    "jiomart": ("JioMart", "https://www.jiomart.com/p/"),
+    "myntra": ("Myntra", "https://www.myntra.com/"),
+    "ikea": ("IKEA", "https://www.ikea.com/in/en/p/"),
+}
+
+B2B_SOURCES = {
+    "tradeindia": ("TradeIndia", "https://www.tradeindia.com/products/"),
+    "indiamart": ("IndiaMART", "https://m.indiamart.com/proddetail/"),
+}
+
+VARIANTS = ["Pro", "Max", "Lite", "Plus", "Classic", "Neo", "Prime", "Ultra", "Mini", "Air"]
+UNITS = ["kg", "Piece", "Litre", "Box", "Pack"]
+
+QUERY_MIX = [
+    "laptop", "gaming mouse", "bluetooth earphone", "4k monitor", "mechanical keyboard",
+    "running shoe", "denim jeans", "cotton shirt", "smart watch",
+    "basmati rice", "green tea", "peanut butter", "olive oil",
+    "office chair", "study table", "floor lamp",
+]
+
+
+def _seed(*parts):
+    return int(hashlib.md5("|".join(parts).encode()).hexdigest()[:12], 16)
+
+
+def retail_listings(source, query, category, count=10):
+    """
+    Deterministic catalog for (source, query): same titles on every call,
+    with prices jittered around a stable base to simulate price movement.
+    """
+    source_name, base_url = RETAIL_SOURCES[source]
+    catalog = random.Random(_seed(source, query))
+    jitter = random.Random()
+    listings = []
+    for i in range(count):
+        base = catalog.uniform(300, 60000)
+        sku = catalog.randrange(10 ** 9)
+        listings.append(ProductListing(
+            title=f"{query.title()} {catalog.choice(VARIANTS)} {i + 1} by {source_name}",
+            brand=source_name, category=category.title(),
+            price=round(base * jitter.uniform(0.9, 1.1), 2), currency="INR",
+            url=f"{base_url}{sku}", image=f"https://img.example.com/{source}/{sku}.jpg",
+            source=source_name, type="Retail",
+        ))
+    return listings
+
+
+def retail_page(source, query, count=10):
+    """
+    The same catalog as retail_listings, rendered as the search page markup
+    each source's parser expects (modules/scraper/parsers.py).
+    """
+    cards = []
+    for item in retail_listings(source, query, "general", count):
+        title, price, image = escape(item.title), item.price, escape(item.image)
+        path = escape(item.url.split("/", 3)[3])
+        if source == "amazon":
+            cards.append(f'<div data-component-type="s-search-result"><h2>{title}</h2>'
+                         f'<span class="a-price-whole">{price:,.0f}</span>'
+                         f'<a class="a-link-normal" href="/{path}"></a><img class="s-image" src="{image}"></div>')
+        elif source == "flipkart":
+            cards.append(f'<div class="_1AtVbE"><a class="s1Q9rs" href="/{path}">{title}</a>'
+                         f'<div class="_30jeq3">₹{price:,.2f}</div><img src="{image}"></div>')
+        elif source == "ebay":
+            cards.append(f'<div class="s-item__wrapper"><div class="s-item__title">{title}</div>'
+                         f'<span class="s-item__price">INR {price:,.2f}</span>'
+                         f'<a href="{escape(item.url)}"></a><img src="{image}"></div>')
+        elif source == "jiomart":
+            cards.append(f'<div class="plp-card"><a href="/{path}"><span class="plp-card-details-name">{title}</span></a>'
+                         f'<span>₹ {price:,.0f}</span><img src="{image}"></div>')
+        elif source == "ikea":
+            cards.append(f'<div class="plp-fragment-wrapper"><a href="{escape(item.url)}">'
+                         f'<span class="header-section__title">{title}</span>'
+                         f'<span class="pip-price__integer">{price:,.0f}</span><img src="{image}"></a></div>')
+        elif source == "myntra":
+            cards.append({"productName": item.title, "brand": item.brand, "price": price,
+                          "landingPageUrl": path, "images": [{"src": item.image}]})
+
+    if source == "myntra":
+        data = json.dumps({"searchData": {"results": {"products": cards}}})
+        body = f"<script>window.__myx = {data};</script>"
+    elif source == "ebay":
+        # The first result on eBay is a placeholder the parser skips
+        body = '<div class="s-item__wrapper"><div class="s-item__title">Shop on eBay</div></div>' + "".join(cards)
+    else:
+        body = "".join(cards)
+    # Pad to a realistic page weight; real search pages are mostly scripts and markup
+    filler = '<div class="nav"><ul>' + '<li><a href="/c">Category</a></li>' * 400 + '</ul></div>'
+    return f"<html><head><title>{escape(query)}</title></head><body>{filler}{body}{filler}</body></html>".encode("utf-8")
+
+
+def b2b_leads(source, query, count=6):
+    source_name, base_url = B2B_SOURCES[source]
+    catalog = random.Random(_seed(source, query))
+    leads = []
+    for i in range(count):
+        sku = catalog.randrange(10 ** 9)
+        priced = catalog.random() < 0.7
+        unit = catalog.choice(UNITS)
+        leads.append(B2BLead(
+            title=f"{query.title()} Wholesale Lot {i + 1}",
+            price=f"₹ {catalog.randint(20, 5000)}/{unit}" if priced else "Ask Price",
+            moq_text=f"{catalog.choice([1, 10, 50, 100])} {unit}" if priced else None,
+            seller=f"Supplier {catalog.randint(1, 500)}",
+            address=catalog.choice(["Delhi", "Mumbai", "Surat", "Pune", "Chennai"]),
+            contact="Contact Supplier",
+            url=f"{base_url}{sku}.html",
+            image="https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
+            source=source_name, type="B2B",
+        ))
+    return leads
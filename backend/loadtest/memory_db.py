@@ -0,0 +1,144 @@
+import time
+import threading
+from datetime import datetime, timezone
+
+from modules.services.db_manager import DBManager, _product_key
+
+
+class InMemoryDBManager(DBManager):
+    """
+    DBManager stand-in backed by process-local dicts.
+    Storage is class-level so every request sees the same data, like Supabase.
+    """
+
+    _lock = threading.Lock()
+    _products = {}     # (name, is_wholesale) -> row
+    _prices = {}       # product_id -> [rows], oldest first
+    _next_id = 1
+    latency_ms = 0     # simulated Supabase round-trip per call
+
+    def __init__(self):
+        self.supabase = None
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._products = {}
+            cls._prices = {}
+            cls._next_id = 1
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return {
+                "products": len(cls._products),
+                "prices": sum(len(rows) for rows in cls._prices.values()),
+            }
+
+    def _round_trip(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def save_products(self, items):
+        if not items:
+            return []
+        # Mirrors DBManager: product lookup, latest-price read, product insert (only if new), price insert
+        with self._lock:
+            has_new = any(_product_key(item.title, item.category) not in self._products for item in items)
+        for _ in range(4 if has_new else 3):
+            self._round_trip()
+        now = datetime.now(timezone.utc).isoformat()
+        ids = []
+        with self._lock:
+            cls = type(self)
+            for item in items:
+                key = _product_key(item.title, item.category)
+                row = cls._products.get(key)
+                if row is None:
+                    row = dict(self._product_row(item), id=cls._next_id)
+                    cls._products[key] = row
+                    cls._next_id += 1
+                rows = cls._prices.setdefault(row['id'], [])
+                # Change-only recording, like DBManager
+                last = next((r for r in reversed(rows) if r['site_name'] == item.source), None)
+                ids.append(row['id'])
+                if last and round(float(last['price_inr']), 2) == round(float(item.price), 2):
+                    continue
+                rows.append({
+                    "price_inr": item.price,
+                    "site_name": item.source,
+                    "product_link": item.url,
+                    "scraped_at": item.scraped_at or now,
+                })
+        self._notify_price_listeners(items, ids)
+        return ids
+
+    def scan(self, table, columns, order_by='id', page_size=1000):
+        self._round_trip()
+        with self._lock:
+            if table == 'products':
+                rows = [dict(row) for row in self._products.values()]
+            elif table == 'prices':
+                rows = [dict(row, product_id=pid) for pid, prices in self._prices.items() for row in prices]
+            elif table == 'price_latest':
+                rows = self._latest_rows()
+            else:
+                rows = []
+        wanted = [c.strip() for c in columns.split(',')]
+        order = [c.strip() for c in order_by.split(',')]
+        rows.sort(key=lambda r: tuple(r.get(c) for c in order))
+        return [{c: r.get(c) for c in wanted} for r in rows]
+
+    def _latest_rows(self):
+        """price_latest as the insert trigger keeps it: newest row and stats per product and site."""
+        latest = {}
+        for pid, prices in self._prices.items():
+            for r in prices:
+                row = latest.get((pid, r['site_name']))
+                price = float(r['price_inr'])
+                if row is None:
+                    latest[(pid, r['site_name'])] = dict(r, product_id=pid, low_inr=price, high_inr=price, samples=1)
+                    continue
+                row.update(price_inr=r['price_inr'], product_link=r['product_link'], scraped_at=r['scraped_at'],
+                           low_inr=min(row['low_inr'], price), high_inr=max(row['high_inr'], price),
+                           samples=row['samples'] + 1)
+        return list(latest.values())
+
+    def find_product_ids(self, names, wholesale=False):
+        self._round_trip()
+        with self._lock:
+            return {name: self._products[(name, wholesale)]['id'] for name in names
+                    if (name, wholesale) in self._products}
+
+    def latest_since(self, since, columns):
+        self._round_trip()
+        with self._lock:
+            rows = [r for r in self._latest_rows() if r['scraped_at'] >= since]
+        wanted = [c.strip() for c in columns.split(',')]
+        rows.sort(key=lambda r: (r['scraped_at'], r['product_id'], r['site_name']))
+        return [{c: r.get(c) for c in wanted} for r in rows]
+
+    def get_products(self, product_ids, columns='id, name, brand, category, image_url'):
+        self._round_trip()
+        ids = set(product_ids)
+        wanted = [c.strip() for c in columns.split(',')]
+        with self._lock:
+            return [{c: row.get(c) for c in wanted} for row in self._products.values() if row['id'] in ids]
+
+    def has_product(self, product_id):
+        self._round_trip()
+        with self._lock:
+            return any(row['id'] == product_id for row in self._products.values())
+
+    def get_price_history(self, product_id):
+        self._round_trip()
+        with self._lock:
+            rows = self._prices.get(product_id, [])
+            return [{"price_inr": r['price_inr'], "scraped_at": r['scraped_at']} for r in reversed(rows)]
+
+    def get_price_histories(self, product_ids):
+        self._round_trip()
+        with self._lock:
+            return {pid: [{"price_inr": r['price_inr'], "scraped_at": r['scraped_at']}
+                          for r in reversed(self._prices.get(pid, []))]
+                    for pid in dict.fromkeys(product_ids) if pid}
@@ -0,0 +1,214 @@
+"""
+Load-test harness for /api/search.
+
+Boots the Flask app in-process with fixture-backed scrapers and an in-memory
+DBManager, drives concurrent HTTP traffic at it from a separate process and
+reports latency percentiles, throughput and the server's peak RSS. The client
+never shares the server's GIL or memory. Write-behind journals and the forecast
+calibration file go to a scratch directory, never backend/data.
+
+Run from the backend folder:
+    python -m loadtest.run --concurrency 16 --duration 30 --json results.json
+    python -m loadtest.run --baseline results.json    # compare against an earlier run
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import random
+import shutil
+import logging
+import resource
+import argparse
+import tempfile
+import contextlib
+import threading
+import subprocess
+import multiprocessing
+import concurrent.futures
+
+from loadtest import stubs, fixtures
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def peak_rss_mb():
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def boot_server(port, verbose=False):
+    if not verbose:
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    from werkzeug.serving import make_server
+    from app import app
+
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def use_scratch_dirs():
+    """Points every file the app writes at a fresh temp dir, removed at exit."""
+    from config import Config
+
+    scratch = tempfile.mkdtemp(prefix="priceatlas-loadtest-")
+    # Registered before the app's own atexit hooks, so it runs after the write-behind buffer closes
+    atexit.register(shutil.rmtree, scratch, True)
+    Config.WRITE_BEHIND_DIR = os.path.join(scratch, "write_behind")
+    Config.FORECAST_CALIBRATION_PATH = os.path.join(scratch, "forecast_calibration.json")
+    return scratch
+
+
+def generate_load(base_url, args):
+    """Runs in the load process: args.concurrency client threads for args.duration seconds."""
+    samples, lock = [], threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, deadline, args,
+                                              random.Random(args.seed + i), samples, lock))
+        for i in range(args.concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+
+def worker(base_url, deadline, args, rng, samples, lock):
+    import requests
+
+    session = requests.Session()
+    local = []
+    while time.perf_counter() < deadline:
+        query = rng.choice(fixtures.QUERY_MIX)
+        intent = 'bulk' if rng.random() < args.wholesale_ratio else 'single'
+        start = time.perf_counter()
+        try:
+            res = session.get(f"{base_url}/api/search", params={"query": query, "intent": intent},
+                              headers={"Accept-Encoding": "gzip"}, timeout=60)
+            res.content
+            status = res.status_code
+        except Exception:
+            status = 0
+        local.append((time.perf_counter() - start, status))
+    with lock:
+        samples.extend(local)
+
+
+def run(args):
+    profile = stubs.FetchProfile(median_ms=args.latency_ms, sigma=args.latency_sigma,
+                                 failure_rate=args.failure_rate, empty_rate=args.empty_rate,
+                                 seed=args.seed)
+    # Stubs go in before the app is imported, so its indexes warm from the in-memory DB
+    stubs.stub_supabase()
+    use_scratch_dirs()
+    stubs.install_scraper_stubs(profile)
+    memory_db = stubs.install_memory_db()
+    memory_db.latency_ms = args.db_latency_ms
+    server = boot_server(args.port, args.verbose)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # spawn, not fork: the server process already runs threads
+    context = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as client:
+        samples, elapsed = client.submit(generate_load, base_url, args).result()
+    server.shutdown()
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    return {
+        "revision": git_revision(),
+        "config": {k: v for k, v in vars(args).items() if k not in ('json', 'baseline', 'verbose')},
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "status": statuses,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "db": memory_db.stats(),
+    }
+
+
+def print_report(report, baseline=None):
+    def delta(value, old):
+        if old in (None, 0):
+            return ""
+        return f"  ({(value - old) / old * 100:+.1f}% vs {baseline['revision']})"
+
+    base = baseline or {}
+    base_lat = base.get("latency_ms", {})
+    print("\n" + "=" * 56)
+    print(f"📈 LOAD TEST REPORT @ {report['revision']}")
+    print("-" * 56)
+    print(f"requests     : {report['requests']}   status: {report['status']}")
+    print(f"throughput   : {report['rps']} req/s{delta(report['rps'], base.get('rps'))}")
+    for key, value in report["latency_ms"].items():
+        print(f"latency {key:<4} : {value} ms{delta(value, base_lat.get(key))}")
+    print(f"peak RSS     : {report['peak_rss_mb']} MB{delta(report['peak_rss_mb'], base.get('peak_rss_mb'))}")
+    print(f"stored       : {report['db']['products']} products / {report['db']['prices']} prices")
+    print("=" * 56)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /api/search with stubbed scrapers and DB")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help="seconds of traffic")
+    parser.add_argument('--latency-ms', type=float, default=250, help="median stub fetch latency")
+    parser.add_argument('--latency-sigma', type=float, default=0.6, help="log-normal spread of fetch latency")
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--empty-rate', type=float, default=0.1)
+    parser.add_argument('--db-latency-ms', type=float, default=0, help="simulated DB round-trip per call")
+    parser.add_argument('--wholesale-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--port', type=int, default=0, help="0 picks a free port")
+    parser.add_argument('--verbose', action='store_true', help="show the app's own logging")
+    parser.add_argument('--json', help="write the report to this file")
+    parser.add_argument('--baseline', help="earlier --json report to compare against")
+    args = parser.parse_args()
+
+    if args.verbose:
+        report = run(args)
+    else:
+        # The app logs every scrape to stdout; keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            report = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import sys
+import time
+import types
+import random
+
+from loadtest import fixtures
+
+
+class FetchProfile:
+    """
+    Latency and failure distribution for stubbed fetchers.
+    Latency is log-normal around `median_ms`, which gives the long tail
+    real retailers show.
+    """
+
+    def __init__(self, median_ms=250, sigma=0.6, failure_rate=0.05, empty_rate=0.1, seed=None):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.empty_rate = empty_rate
+        self.rng = random.Random(seed)
+
+    def simulate(self, label):
+        """Sleeps like a network round-trip; returns False if the fetch came back empty."""
+        if self.median_ms > 0:
+            time.sleep(self.rng.lognormvariate(0, self.sigma) * self.median_ms / 1000)
+        roll = self.rng.random()
+        if roll < self.failure_rate:
+            raise ConnectionError(f"stubbed failure in {label}")
+        return roll >= self.failure_rate + self.empty_rate
+
+
+def stub_supabase():
+    """
+    Registers a placeholder supabase_client before the app imports it, so booting
+    needs no credentials. Must run before `app` or any `modules.*` import.
+    """
+    module = types.ModuleType('modules.services.supabase_client')
+    module.supabase = None
+    sys.modules['modules.services.supabase_client'] = module
+
+
+def install_scraper_stubs(profile):
+    """Replaces every retail/B2B fetcher with a fixture-backed stub."""
+    from modules.scraper.engine import ScraperEngine
+    from modules.scraper.b2b_engine import B2BEngine
+    from modules.analytics.forex_engine import ForexEngine
+
+    def forex_rates(self):
+        self._rates = {"INR": 83.5, "USD": 1.0, "EUR": 0.92}
+        self._last_updated = None
+
+    ForexEngine.update_rates = forex_rates
+
+    # Retail stubs replace only the network fetch; the real parsers run on fixture pages
+    for source in fixtures.RETAIL_SOURCES:
+        def fetch(self, query, source=source):
+            try:
+                if not profile.simulate(source):
+                    return None
+            except ConnectionError:
+                return None  # the real fetchers swallow network errors too
+            return fixtures.retail_page(source, query)
+        setattr(ScraperEngine, f"_fetch_{source}", fetch)
+
+    def b2b_fetch(source):
+        # The real B2B scrapers swallow their own errors, so failures surface as empty results
+        def fetch(self, query):
+            try:
+                if not profile.simulate(source):
+                    return []
+            except ConnectionError:
+                return []
+            return fixtures.b2b_leads(source, query)
+        return fetch
+
+    B2BEngine._scrape_tradeindia = b2b_fetch("tradeindia")
+    B2BEngine._scrape_indiamart_mobile = b2b_fetch("indiamart")
+
+    def fallback(self, query, site):
+        try:
+            profile.simulate("duckduckgo")
+        except ConnectionError:
+            pass
+        return []
+
+    B2BEngine._search_engine_fallback = fallback
+
+
+def install_memory_db():
+    """
+    Swaps DBManager for the in-memory stand-in in every module that imported it,
+    and in db_manager itself so modules imported afterwards get it too. Install it
+    before importing `app`: the app's indexes warm from the DB at import.
+    """
+    from modules.services import db_manager
+    from loadtest.memory_db import InMemoryDBManager
+
+    original = db_manager.DBManager
+    for module in list(sys.modules.values()):
+        if getattr(module, 'DBManager', None) is original:
+            module.DBManager = InMemoryDBManager
+    return InMemoryDBManager
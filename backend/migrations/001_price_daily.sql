@@ -0,0 +1,21 @@
+-- Daily rollup tier for price history.
+-- `prices` holds a row only when a product's price on a site changes: DBManager
+-- skips prices equal to the latest one (kept in price_latest, see 003).
+-- Raw rows older than PRICE_COMPACT_AFTER_DAYS are folded into one
+-- open/high/low/close row per product, site and day by modules/services/compactor.py,
+-- so `samples` counts price changes that day, not searches that saw the price.
+create table if not exists price_daily (
+    product_id  bigint      not null references products(id) on delete cascade,
+    site_name   text        not null,
+    day         date        not null,
+    open        numeric     not null,
+    high        numeric     not null,
+    low         numeric     not null,
+    close       numeric     not null,
+    samples     integer     not null default 1,
+    primary key (product_id, site_name, day)
+);
+
+-- History reads go newest first per product, and compaction scans by age
+create index if not exists prices_product_scraped_idx on prices (product_id, scraped_at desc);
+create index if not exists prices_scraped_idx on prices (scraped_at);
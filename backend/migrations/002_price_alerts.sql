@@ -0,0 +1,16 @@
+-- "Notify me below ₹X" alerts, matched in memory by modules/alerts.
+-- A triggered alert is deactivated with a conditional update (active = true),
+-- which is what guarantees each alert notifies once across workers.
+create table if not exists price_alerts (
+    id              bigint generated by default as identity primary key,
+    product_id      bigint      not null references products(id) on delete cascade,
+    threshold_inr   numeric     not null check (threshold_inr > 0),
+    contact         text,
+    active          boolean     not null default true,
+    created_at      timestamptz not null default now(),
+    triggered_at    timestamptz
+);
+
+-- Workers load and poll active alerts in id order
+create index if not exists price_alerts_active_idx on price_alerts (id) where active;
+create index if not exists price_alerts_product_idx on price_alerts (product_id);
@@ -0,0 +1,44 @@
+-- Newest price per product and site, kept current by a trigger on `prices`.
+-- Change-only recording (DBManager._latest_prices) reads one row per product
+-- and site here instead of scanning the raw history. Rows survive compaction,
+-- so compacted sites keep their last price too.
+create table if not exists price_latest (
+    product_id    bigint      not null references products(id) on delete cascade,
+    site_name     text        not null,
+    price_inr     numeric     not null,
+    product_link  text,
+    scraped_at    timestamptz not null,
+    primary key (product_id, site_name)
+);
+
+create or replace function price_latest_upsert() returns trigger
+language plpgsql as $$
+begin
+    -- Write-behind can insert a row scraped before the one already recorded
+    insert into price_latest (product_id, site_name, price_inr, product_link, scraped_at)
+    values (new.product_id, new.site_name, new.price_inr, new.product_link, new.scraped_at)
+    on conflict (product_id, site_name) do update
+        set price_inr = excluded.price_inr,
+            product_link = excluded.product_link,
+            scraped_at = excluded.scraped_at
+        where price_latest.scraped_at <= excluded.scraped_at;
+    return new;
+end;
+$$;
+
+drop trigger if exists prices_latest_trg on prices;
+create trigger prices_latest_trg after insert on prices
+    for each row execute function price_latest_upsert();
+
+-- Backfill from the raw rows, then from the rollups for sites already compacted away
+insert into price_latest (product_id, site_name, price_inr, product_link, scraped_at)
+select distinct on (product_id, site_name) product_id, site_name, price_inr, product_link, scraped_at
+from prices
+order by product_id, site_name, scraped_at desc
+on conflict (product_id, site_name) do nothing;
+
+insert into price_latest (product_id, site_name, price_inr, scraped_at)
+select distinct on (product_id, site_name) product_id, site_name, close, (day + time '23:59:59') at time zone 'utc'
+from price_daily
+order by product_id, site_name, day desc
+on conflict (product_id, site_name) do nothing;
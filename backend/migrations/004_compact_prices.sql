@@ -0,0 +1,42 @@
+-- Folds one batch of raw `prices` rows older than `cutoff` into `price_daily`.
+-- Deleting the raw rows and merging them into the rollups is a single statement,
+-- so a crash can't leave rows both rolled up and still raw (and counted twice
+-- by the next run). Called in a loop by modules/services/compactor.py.
+create or replace function compact_prices(cutoff timestamptz, batch_size integer default 1000)
+returns table (compacted integer, days integer)
+language plpgsql as $$
+begin
+    return query
+    with batch as (
+        delete from prices
+        where id in (
+            select id from prices
+            where scraped_at < cutoff
+            order by scraped_at, id
+            limit batch_size
+        )
+        returning product_id, site_name, price_inr, scraped_at, id
+    ),
+    daily as (
+        select product_id, site_name, (scraped_at at time zone 'utc')::date as day,
+               (array_agg(price_inr order by scraped_at, id))[1] as open,
+               max(price_inr) as high,
+               min(price_inr) as low,
+               (array_agg(price_inr order by scraped_at desc, id desc))[1] as close,
+               count(*)::integer as samples
+        from batch
+        group by 1, 2, 3
+    ),
+    merged as (
+        insert into price_daily as d (product_id, site_name, day, open, high, low, close, samples)
+        select product_id, site_name, day, open, high, low, close, samples from daily
+        on conflict (product_id, site_name, day) do update
+            set high = greatest(d.high, excluded.high),
+                low = least(d.low, excluded.low),
+                close = excluded.close,
+                samples = d.samples + excluded.samples
+        returning 1
+    )
+    select (select count(*) from batch)::integer, (select count(*) from merged)::integer;
+end;
+$$;
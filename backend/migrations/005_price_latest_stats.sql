@@ -0,0 +1,41 @@
+-- All-time low, high and price count per product and site on price_latest, kept by
+-- the same insert trigger. Workers warm the deals index from these rows instead of
+-- each scanning the whole `prices` table.
+alter table price_latest
+    add column if not exists low_inr  numeric,
+    add column if not exists high_inr numeric,
+    add column if not exists samples  integer not null default 0;
+
+create or replace function price_latest_upsert() returns trigger
+language plpgsql as $$
+begin
+    -- Write-behind can insert a row scraped before the one already recorded:
+    -- it still counts toward the stats, but never replaces the latest price
+    insert into price_latest (product_id, site_name, price_inr, product_link, scraped_at, low_inr, high_inr, samples)
+    values (new.product_id, new.site_name, new.price_inr, new.product_link, new.scraped_at, new.price_inr, new.price_inr, 1)
+    on conflict (product_id, site_name) do update
+        set price_inr = case when price_latest.scraped_at <= excluded.scraped_at
+                             then excluded.price_inr else price_latest.price_inr end,
+            product_link = case when price_latest.scraped_at <= excluded.scraped_at
+                                then excluded.product_link else price_latest.product_link end,
+            scraped_at = greatest(price_latest.scraped_at, excluded.scraped_at),
+            low_inr = least(price_latest.low_inr, excluded.low_inr),
+            high_inr = greatest(price_latest.high_inr, excluded.high_inr),
+            samples = price_latest.samples + 1;
+    return new;
+end;
+$$;
+
+-- Backfill from both history tiers
+update price_latest l
+set low_inr = s.low, high_inr = s.high, samples = s.samples
+from (
+    select product_id, site_name, min(low) as low, max(high) as high, sum(samples)::integer as samples
+    from (
+        select product_id, site_name, price_inr as low, price_inr as high, 1 as samples from prices
+        union all
+        select product_id, site_name, low, high, samples from price_daily
+    ) tiers
+    group by product_id, site_name
+) s
+where l.product_id = s.product_id and l.site_name = s.site_name;
@@ -0,0 +1,3 @@
+-- Cancelling an alert requires the token returned when it was created.
+-- Only a SHA-256 of the token is stored.
+alter table price_alerts add column if not exists cancel_token_hash text;
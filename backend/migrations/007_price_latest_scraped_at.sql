@@ -0,0 +1,3 @@
+-- Every worker's deals index polls price_latest for rows changed since its last
+-- poll (DealIndex._sync), so the timestamp needs an index.
+create index if not exists price_latest_scraped_at_idx on price_latest (scraped_at);
@@ -0,0 +1,222 @@
+import time
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+from modules.services.db_manager import DBManager, IN_FILTER_CHUNK
+from modules.alerts.index import AlertIndex
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY
+from modules.alerts.notifier import NOTIFIERS, NotificationQueue
+
+
+class AlertEngine:
+    """
+    Matches every incoming price against registered alerts.
+    Alerts are stored in `price_alerts` (see migrations/002_price_alerts.sql) and
+    mirrored in an in-memory AlertIndex per process. New alerts created by other
+    workers are picked up by polling; a triggered alert is claimed in the database
+    before it is delivered, so each alert notifies exactly once.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(AlertEngine, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self.db = DBManager()
+        self.index = AlertIndex()
+        self._lock = threading.Lock()
+        self._known = {}        # alert_id -> (product_id, threshold, contact)
+        self._last_id = 0
+
+        name = _notifier_name()
+        notifier = NOTIFIERS[name](**_notifier_options(name))
+        self.notifications = NotificationQueue(notifier)
+
+        DBManager.add_price_listener(self.on_prices)
+        threading.Thread(target=self._sync_loop, name="alert-sync", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+    def create(self, product_id, threshold, contact):
+        """
+        Stores a new alert. Only the creator sees its contact and the cancel token,
+        which is returned once and stored as a hash.
+        """
+        token = secrets.token_urlsafe(24)
+        row = self.db.supabase.table('price_alerts').insert({
+            "product_id": product_id,
+            "threshold_inr": threshold,
+            "contact": contact,
+            "active": True,
+            "cancel_token_hash": _token_hash(token),
+        }).execute().data[0]
+        self._track(row)
+        return dict(_public(row), contact=row.get('contact'), cancel_token=token)
+
+    def cancel(self, alert_id, token):
+        if not token:
+            return False
+        res = self.db.supabase.table('price_alerts')\
+            .update({"active": False})\
+            .eq('id', alert_id)\
+            .eq('active', True)\
+            .eq('cancel_token_hash', _token_hash(token))\
+            .execute()
+        if not res.data:
+            return False
+        with self._lock:
+            known = self._known.pop(alert_id, None)
+            if known:
+                self.index.remove(known[0], known[1], alert_id)
+        return True
+
+    def list_for_product(self, product_id):
+        rows = self.db.supabase.table('price_alerts')\
+            .select('id, product_id, threshold_inr, active, created_at, triggered_at')\
+            .eq('product_id', product_id)\
+            .order('threshold_inr', desc=True)\
+            .execute().data or []
+        return [_public(row) for row in rows]
+
+    def _track(self, row):
+        with self._lock:
+            if row['id'] in self._known:
+                return
+            threshold = float(row['threshold_inr'])
+            self._known[row['id']] = (row['product_id'], threshold, row.get('contact'))
+            self.index.add(row['product_id'], threshold, row['id'])
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+    def on_prices(self, observations):
+        """Price listener: O(log n + k) per observed price."""
+        triggered = {}
+        with self._lock:
+            for obs in observations:
+                if obs.get('category') == WHOLESALE_CATEGORY:
+                    continue  # B2B leads are stored as unit prices, not the price a buyer pays
+                for alert_id in self.index.match(obs['product_id'], obs['price']):
+                    triggered[alert_id] = (obs, self._known.pop(alert_id, None))
+        if triggered:
+            self._deliver(triggered)
+
+    def _deliver(self, triggered):
+        # Claim first: only alerts still active in the DB notify, so a worker with a
+        # stale index (alert cancelled or fired elsewhere) stays silent.
+        claimed = []
+        now = datetime.now(timezone.utc).isoformat()
+        ids = list(triggered)
+        for i in range(0, len(ids), IN_FILTER_CHUNK):
+            try:
+                claimed += self.db.supabase.table('price_alerts')\
+                    .update({"active": False, "triggered_at": now})\
+                    .in_('id', ids[i:i + IN_FILTER_CHUNK])\
+                    .eq('active', True)\
+                    .execute().data or []
+            except Exception as e:
+                # Unclaimed alerts go back in the index, so the next matching price retries them
+                print(f"🔥 Alert claim error: {e}")
+                self._restore({alert_id: triggered[alert_id][1] for alert_id in ids[i:]})
+                break
+
+        for row in claimed:
+            obs = triggered[row['id']][0]
+            self.notifications.put({
+                "alert_id": row['id'],
+                "product_id": obs['product_id'],
+                "title": obs['title'],
+                "threshold": float(row['threshold_inr']),
+                "price": obs['price'],
+                "source": obs['source'],
+                "url": obs['url'],
+                "contact": row.get('contact'),
+                "triggered_at": now,
+            })
+
+    def _restore(self, alerts):
+        with self._lock:
+            for alert_id, known in alerts.items():
+                if known is not None and alert_id not in self._known:
+                    self._known[alert_id] = known
+                    self.index.add(known[0], known[1], alert_id)
+
+    # ------------------------------------------------------------------
+    # Sync with alerts created by other workers
+    # ------------------------------------------------------------------
+    def _sync_loop(self):
+        while True:
+            try:
+                self._sync()
+            except Exception as e:
+                print(f"⚠️ Alert sync failed: {e}")
+            time.sleep(Config.ALERT_SYNC_INTERVAL)
+
+    def _sync(self):
+        fetched = {}
+        while True:
+            rows = self.db.supabase.table('price_alerts')\
+                .select('id, product_id, threshold_inr, contact')\
+                .eq('active', True)\
+                .gt('id', self._last_id)\
+                .order('id')\
+                .limit(5000)\
+                .execute().data or []
+            if not rows:
+                break
+            with self._lock:
+                for row in rows:
+                    if row['id'] not in self._known:
+                        threshold = float(row['threshold_inr'])
+                        self._known[row['id']] = (row['product_id'], threshold, row.get('contact'))
+                        fetched.setdefault(row['product_id'], []).append((threshold, row['id']))
+                self._last_id = max(self._last_id, rows[-1]['id'])
+
+        if fetched:
+            with self._lock:
+                for product_id, alerts in fetched.items():
+                    self.index.load(product_id, alerts)
+            print(f"🔔 Alert index: +{sum(map(len, fetched.values()))} alerts ({len(self.index)} active)")
+
+
+def _notifier_name():
+    if Config.ALERT_NOTIFIER not in NOTIFIERS:
+        print(f"⚠️ Unknown ALERT_NOTIFIER '{Config.ALERT_NOTIFIER}'. Falling back to 'log'.")
+        return "log"
+    return Config.ALERT_NOTIFIER
+
+
+def _notifier_options(name):
+    if name == "webhook":
+        return {"url": Config.ALERT_WEBHOOK_URL, "allowed_hosts": Config.ALERT_WEBHOOK_ALLOWED_HOSTS}
+    return {}
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _public(row):
+    """What anyone may see about an alert: no contact, no token."""
+    return {
+        "id": row['id'],
+        "product_id": row['product_id'],
+        "threshold": float(row['threshold_inr']),
+        "active": row.get('active', True),
+        "created_at": row.get('created_at'),
+        "triggered_at": row.get('triggered_at'),
+    }
@@ -0,0 +1,79 @@
+import bisect
+from array import array
+
+
+class AlertIndex:
+    """
+    Per-product "notify me at or below ₹X" thresholds, kept sorted.
+    Thresholds live in a compact array('d') with alert ids in a parallel list,
+    so every alert a price triggers is a suffix: O(log n) to find, O(k) to take.
+    Not thread-safe on its own; AlertEngine serializes access.
+    """
+
+    def __init__(self):
+        self._thresholds = {}   # product_id -> array('d'), ascending
+        self._ids = {}          # product_id -> [alert_id], aligned with thresholds
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, product_id, threshold, alert_id):
+        thresholds = self._thresholds.get(product_id)
+        if thresholds is None:
+            thresholds = self._thresholds[product_id] = array('d')
+            self._ids[product_id] = []
+        i = bisect.bisect_right(thresholds, threshold)
+        thresholds.insert(i, threshold)
+        self._ids[product_id].insert(i, alert_id)
+        self._count += 1
+
+    def load(self, product_id, alerts):
+        """Bulk add of (threshold, alert_id) pairs: one sort instead of n inserts."""
+        pairs = sorted(alerts)
+        if product_id in self._thresholds:
+            pairs = sorted(pairs + list(zip(self._thresholds[product_id], self._ids[product_id])))
+            self._count -= len(self._ids[product_id])
+        self._thresholds[product_id] = array('d', (t for t, _ in pairs))
+        self._ids[product_id] = [alert_id for _, alert_id in pairs]
+        self._count += len(pairs)
+
+    def remove(self, product_id, threshold, alert_id):
+        thresholds = self._thresholds.get(product_id)
+        if thresholds is None:
+            return False
+        ids = self._ids[product_id]
+        lo = bisect.bisect_left(thresholds, threshold)
+        hi = bisect.bisect_right(thresholds, threshold)
+        for i in range(lo, hi):
+            if ids[i] == alert_id:
+                del thresholds[i]
+                del ids[i]
+                self._count -= 1
+                self._drop_if_empty(product_id)
+                return True
+        return False
+
+    def match(self, product_id, price, consume=True):
+        """
+        Alert ids whose threshold is >= price.
+        With consume=True (one-shot alerts) they are removed from the index.
+        """
+        thresholds = self._thresholds.get(product_id)
+        if not thresholds:
+            return []
+        i = bisect.bisect_left(thresholds, price)
+        if i == len(thresholds):
+            return []
+        triggered = self._ids[product_id][i:]
+        if consume:
+            del thresholds[i:]
+            del self._ids[product_id][i:]
+            self._count -= len(triggered)
+            self._drop_if_empty(product_id)
+        return triggered
+
+    def _drop_if_empty(self, product_id):
+        if not self._thresholds[product_id]:
+            del self._thresholds[product_id]
+            del self._ids[product_id]
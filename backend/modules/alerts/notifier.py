@@ -0,0 +1,144 @@
+import time
+import heapq
+import queue
+import socket
+import ipaddress
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+
+class Notifier:
+    """Delivers one triggered alert. Subclass and register in NOTIFIERS to add a channel."""
+
+    def send(self, alert):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    def send(self, alert):
+        print(f"🔔 ALERT {alert['alert_id']}: '{alert['title']}' is ₹{alert['price']} "
+              f"on {alert['source']} (target ₹{alert['threshold']}) -> {alert['contact']}")
+
+
+class WebhookNotifier(Notifier):
+    """
+    POSTs the alert as JSON. Uses the alert's own contact when it is a URL that
+    passes is_public_url; the operator's configured URL is trusted as is.
+    """
+
+    def __init__(self, url=None, allowed_hosts=(), timeout=5):
+        self.url = url
+        self.allowed_hosts = allowed_hosts
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert):
+        contact = alert.get('contact') or ''
+        url = self.url
+        if contact.startswith(('http://', 'https://')):
+            # Checked again at send time: the host may resolve elsewhere than at creation
+            if not is_public_url(contact, self.allowed_hosts):
+                raise ValueError(f"webhook host not allowed: {urlsplit(contact).hostname}")
+            url = contact
+        if not url:
+            raise ValueError("no webhook URL configured")
+        # A redirect could point anywhere, including back inside the network
+        response = self.session.post(url, json=alert, timeout=self.timeout, allow_redirects=False)
+        response.raise_for_status()
+
+
+def is_public_url(url, allowed_hosts=()):
+    """
+    True for an http(s) URL that is safe to call on a user's behalf: with
+    allowed_hosts, the host must be one of them; otherwise every address it
+    resolves to must be public (no loopback, private, link-local or metadata IPs).
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        return False
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return False
+    if allowed_hosts:
+        return parts.hostname.lower() in allowed_hosts
+
+    try:
+        addresses = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return False
+    for address in addresses:
+        ip = ipaddress.ip_address(address[4][0].split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            return False
+    return bool(addresses)
+
+
+NOTIFIERS = {
+    "log": LogNotifier,
+    "webhook": WebhookNotifier,
+}
+
+
+class NotificationQueue:
+    """
+    Bounded hand-off between alert matching and delivery.
+    Matching runs on the DB flush path, so slow channels are isolated in worker threads.
+    Failed deliveries are retried after retry_delay, doubling each time, so a
+    webhook that is down for a minute doesn't use up every attempt at once.
+    """
+
+    def __init__(self, notifier, workers=2, maxsize=10000, max_attempts=3, retry_delay=5.0):
+        self.notifier = notifier
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._retries = []      # heap of (due, seq, alert, attempt)
+        self._retry_seq = 0
+        self._retry_cond = threading.Condition()
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"alert-notifier-{i}", daemon=True).start()
+        threading.Thread(target=self._run_retries, name="alert-retry", daemon=True).start()
+
+    def put(self, alert, attempt=1):
+        try:
+            self._queue.put((alert, attempt), timeout=1)
+        except queue.Full:
+            print(f"⚠️ Alert queue full. Dropping notification for alert {alert['alert_id']}")
+
+    def _run(self):
+        while True:
+            alert, attempt = self._queue.get()
+            try:
+                self.notifier.send(alert)
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    self._retry_later(alert, attempt + 1)
+                else:
+                    print(f"❌ Alert {alert['alert_id']} undeliverable after {attempt} attempts: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _retry_later(self, alert, attempt):
+        due = time.monotonic() + self.retry_delay * 2 ** (attempt - 2)
+        with self._retry_cond:
+            if len(self._retries) >= self._queue.maxsize > 0:
+                print(f"⚠️ Alert retry queue full. Dropping notification for alert {alert['alert_id']}")
+                return
+            self._retry_seq += 1
+            heapq.heappush(self._retries, (due, self._retry_seq, alert, attempt))
+            self._retry_cond.notify()
+
+    def _run_retries(self):
+        while True:
+            with self._retry_cond:
+                while not self._retries or self._retries[0][0] > time.monotonic():
+                    self._retry_cond.wait(self._retries[0][0] - time.monotonic() if self._retries else None)
+                _, _, alert, attempt = heapq.heappop(self._retries)
+            self.put(alert, attempt)
+
+    def join(self):
+        """Waits until queued deliveries are done; retries still waiting out their delay are not included."""
+        self._queue.join()
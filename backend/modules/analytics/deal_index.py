@@ -0,0 +1,305 @@
+import time
+import bisect
+import threading
+from datetime import datetime, timedelta, timezone
+
+from config import Config
+
+from modules.services.db_manager import DBManager
+from modules.analytics.scorer import score_from_range, verdict_for
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY
+
+# Products need this many observed prices before they can rank as a deal,
+# matching calculate_price_score's "Not enough data" cut-off.
+MIN_SAMPLES = 2
+
+LATEST_COLUMNS = 'product_id, site_name, price_inr, product_link, scraped_at, low_inr, high_inr, samples'
+
+
+class TrackedProduct:
+    __slots__ = ('product_id', 'title', 'brand', 'category', 'image',
+                 'offers', 'site_samples', 'low', 'high', 'samples', 'rank_key')
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        self.title = self.brand = self.category = self.image = None
+        self.offers = {}        # source -> (price, url, scraped_at), latest per site
+        self.site_samples = {}  # source -> prices counted for that site
+        self.low = self.high = None
+        self.samples = 0
+        self.rank_key = None    # (category key, ranking tuple) while ranked
+
+    def observe(self, price, source=None, url=None, scraped_at='', low=None, high=None, samples=None):
+        """
+        Folds in one price. `samples` is how many stored prices this stands for
+        (rollups pass their count); by default a price counts only if it moved,
+        matching the change-only history calculate_price_score sees.
+        """
+        low = price if low is None else low
+        high = price if high is None else high
+        self.low = low if self.low is None else min(self.low, low)
+        self.high = high if self.high is None else max(self.high, high)
+        current = self.offers.get(source) if source is not None else None
+        if samples is None:
+            samples = 1 if current is None or current[0] != price else 0
+        self.samples += samples
+        if source is not None:
+            self.site_samples[source] = self.site_samples.get(source, 0) + samples
+            # Out-of-order observations (e.g. warm-up racing a live update) never roll a price back
+            if current is None or scraped_at >= current[2]:
+                self.offers[source] = (price, url, scraped_at)
+
+    def observe_latest(self, price, source, url, scraped_at, low, high, samples):
+        """
+        Folds in a price_latest row, whose stats cover the site's whole history.
+        Only the prices not yet counted for the site are added, so a row can be applied twice.
+        """
+        self.observe(price, source, url, scraped_at, low=low, high=high,
+                     samples=max(samples - self.site_samples.get(source, 0), 0))
+
+    def best_offer(self):
+        source = min(self.offers, key=lambda s: self.offers[s][0])
+        return (source,) + self.offers[source]
+
+    def score(self):
+        return score_from_range(self.best_offer()[1], self.low, self.high)[0]
+
+
+class DealIndex:
+    """
+    Ranking of every tracked product by deal score, kept current as prices arrive.
+    Sorted lists (global and per category) make top-k reads a slice instead of a rescore.
+    One index per process, warmed from the database in the background; prices
+    saved by other workers arrive by polling price_latest every DEAL_INDEX_SYNC_INTERVAL.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(DealIndex, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        # Built under the class lock and flagged last: a concurrent first caller waits for a complete index
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._lock = threading.RLock()
+            self._products = {}
+            self._ranked = {None: []}   # category -> sorted [(-score, price, product_id)]
+            self._ignored = set()       # Wholesale product ids seen while syncing
+            self._synced_at = None      # newest price_latest.scraped_at applied
+            self.ready = False
+
+            DBManager.add_price_listener(self.record_prices)
+            threading.Thread(target=self._run, name="deal-index-sync", daemon=True).start()
+            self._initialized = True
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def record_prices(self, observations):
+        """Price listener: applies a batch of fresh observations from DBManager."""
+        with self._lock:
+            for obs in observations:
+                if obs.get('category') == WHOLESALE_CATEGORY:
+                    continue  # B2B unit prices don't rank against retail listings
+                product = self._product(obs['product_id'], obs)
+                product.observe(obs['price'], obs['source'], obs['url'], obs['scraped_at'])
+                self._rerank(product)
+
+    def _product(self, product_id, meta=None):
+        product = self._products.get(product_id)
+        if product is None:
+            product = self._products[product_id] = TrackedProduct(product_id)
+        if meta:
+            product.title = meta.get('title') or meta.get('name') or product.title
+            product.brand = meta.get('brand') or product.brand
+            product.category = meta.get('category') or product.category
+            product.image = meta.get('image') or meta.get('image_url') or product.image
+        return product
+
+    def _rerank(self, product):
+        if product.rank_key is not None:
+            category, key = product.rank_key
+            self._remove(None, key)
+            self._remove(category, key)
+            product.rank_key = None
+
+        if product.samples < MIN_SAMPLES or not product.offers:
+            return
+
+        category = _category_key(product.category)
+        key = (-product.score(), product.best_offer()[1], product.product_id)
+        bisect.insort(self._ranked[None], key)
+        if category:
+            bisect.insort(self._ranked.setdefault(category, []), key)
+        product.rank_key = (category, key)
+
+    def _remove(self, category, key):
+        ranked = self._ranked.get(category)
+        if not ranked:
+            return
+        i = bisect.bisect_left(ranked, key)
+        if i < len(ranked) and ranked[i] == key:
+            del ranked[i]
+
+    def _run(self):
+        if not self._warm():
+            print("⚠️ Deal index: not syncing, the deals feed shows only this worker's prices")
+            return
+        while True:
+            time.sleep(Config.DEAL_INDEX_SYNC_INTERVAL)
+            try:
+                self._sync()
+            except Exception as e:
+                print(f"⚠️ Deal index sync failed: {e}")
+
+    def _warm(self):
+        """
+        Loads products and per-site price stats so the ranking covers the whole catalog.
+        price_latest (migrations/005_price_latest_stats.sql) has one row per product and
+        site; without it, both history tiers are scanned instead.
+        Returns True if price_latest is there to sync from.
+        """
+        synced = False
+        try:
+            db = DBManager()
+            with self._lock:
+                for row in db.scan('products', 'id, name, brand, category, image_url'):
+                    if row.get('category') != WHOLESALE_CATEGORY:
+                        self._product(row['id'], row)
+                    else:
+                        self._ignored.add(row['id'])
+
+            try:
+                self._warm_from_latest(db)
+                synced = True
+                if self._synced_at is None:
+                    self._synced_at = datetime.now(timezone.utc).isoformat()
+            except Exception as e:
+                print(f"⚠️ Deal index: no price_latest stats ({e}), scanning price history")
+                self._warm_from_history(db)
+
+            with self._lock:
+                for product in self._products.values():
+                    self._rerank(product)
+            print(f"🏷️ Deal index ready: {len(self._ranked[None])} ranked of {len(self._products)} products")
+        except Exception as e:
+            print(f"⚠️ Deal index warm-up failed: {e}")
+        finally:
+            self.ready = True
+        return synced
+
+    def _warm_from_latest(self, db):
+        for row in db.scan('price_latest', LATEST_COLUMNS, order_by='product_id, site_name'):
+            with self._lock:
+                product = self._products.get(row['product_id'])
+                if product is not None:
+                    self._observe_latest(product, row)
+
+    def _sync(self):
+        """
+        Applies price_latest rows changed since the last poll, which includes other
+        workers' writes. The window reaches back DEAL_INDEX_SYNC_LOOKBACK because
+        write-behind stores rows under their (earlier) scrape time; re-applied rows are no-ops.
+        """
+        if self._synced_at is None:
+            return
+        synced_at = datetime.fromisoformat(self._synced_at[:19]).replace(tzinfo=timezone.utc)
+        since = synced_at - timedelta(seconds=Config.DEAL_INDEX_SYNC_LOOKBACK)
+        db = DBManager()
+        rows = db.latest_since(since.isoformat(), LATEST_COLUMNS)
+
+        with self._lock:
+            unknown = list({row['product_id'] for row in rows} - self._products.keys() - self._ignored)
+        new_products = db.get_products(unknown) if unknown else []
+
+        with self._lock:
+            for row in new_products:
+                if row.get('category') != WHOLESALE_CATEGORY:
+                    self._product(row['id'], row)
+                else:
+                    self._ignored.add(row['id'])
+            changed = set()
+            for row in rows:
+                product = self._products.get(row['product_id'])
+                if product is not None:
+                    self._observe_latest(product, row)
+                    changed.add(product)
+            for product in changed:
+                self._rerank(product)
+
+    def _observe_latest(self, product, row):
+        """Caller holds the lock."""
+        price = float(row['price_inr'])
+        low = float(row['low_inr']) if row['low_inr'] is not None else price
+        high = float(row['high_inr']) if row['high_inr'] is not None else price
+        product.observe_latest(price, row['site_name'], row['product_link'], row['scraped_at'],
+                               low=low, high=high, samples=int(row['samples'] or 1))
+        if self._synced_at is None or row['scraped_at'] > self._synced_at:
+            self._synced_at = row['scraped_at']
+
+    def _warm_from_history(self, db):
+        try:
+            for row in db.scan('price_daily', 'product_id, site_name, day, low, high, close, samples', order_by='day'):
+                with self._lock:
+                    product = self._products.get(row['product_id'])
+                    if product is not None:
+                        product.observe(float(row['close']), row['site_name'], None, f"{row['day']}T23:59:59+00:00",
+                                        low=float(row['low']), high=float(row['high']), samples=int(row['samples']))
+        except Exception as e:
+            print(f"⚠️ Deal index: skipping rollup tier ({e})")
+
+        for row in db.scan('prices', 'product_id, site_name, price_inr, product_link, scraped_at', order_by='scraped_at'):
+            with self._lock:
+                product = self._products.get(row['product_id'])
+                if product is not None:
+                    product.observe(float(row['price_inr']), row['site_name'], row['product_link'], row['scraped_at'])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def top(self, k=20, category=None, min_score=0, max_price=None, source=None):
+        """Best deals first. Filters are applied while walking the ranking, so cost is ~k."""
+        results = []
+        with self._lock:
+            for neg_score, price, product_id in self._ranked.get(_category_key(category), ()):
+                if -neg_score < min_score:
+                    break  # everything after scores lower
+                if max_price is not None and price > max_price:
+                    continue
+                product = self._products[product_id]
+                best_source, best_price, url, scraped_at = product.best_offer()
+                if source and best_source.lower() != source.lower():
+                    continue
+                results.append({
+                    "product_id": product_id,
+                    "title": product.title,
+                    "brand": product.brand,
+                    "category": product.category,
+                    "image": product.image,
+                    "price": best_price,
+                    "source": best_source,
+                    "url": url,
+                    "score": -neg_score,
+                    "verdict": verdict_for(-neg_score),
+                    "low": product.low,
+                    "high": product.high,
+                    "samples": product.samples,
+                    "updated_at": scraped_at,
+                })
+                if len(results) >= k:
+                    break
+        return results
+
+    def categories(self):
+        with self._lock:
+            return sorted(c for c, ranked in self._ranked.items() if c and ranked)
+
+
+def _category_key(category):
+    return category.strip().lower() if category else None
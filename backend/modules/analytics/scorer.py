@@ -16,10 +16,14 @@ def calculate_price_score(current_price, price_history):
     if not prices:
         return 50, "No valid prices"
 
-    min_price = min(prices)
-    max_price = max(prices)
-    avg_price = sum(prices) / len(prices)
+    return score_from_range(current_price, min(prices), max(prices))
 
+
+def score_from_range(current_price, min_price, max_price):
+    """
+    Same 0-100 score as calculate_price_score, from a precomputed price range.
+    Lets incremental consumers (the deals index) keep just min/max per product.
+    """
     # 2. Avoid division by zero
     if max_price == min_price:
         return 50, "Stable Price"
@@ -31,17 +35,19 @@ def calculate_price_score(current_price, price_history):
     # Clamp score between 0 and 100
     final_score = max(0, min(100, int(raw_score)))
 
+    return final_score, verdict_for(final_score)
+
+
+def verdict_for(score):
     # 4. Generate Verdict
-    if final_score >= 85:
-        verdict = "🔥 Great Deal"
-    elif final_score >= 60:
-        verdict = "✅ Good Price"
-    elif final_score >= 40:
-        verdict = "⚠️ Fair Price"
+    if score >= 85:
+        return "🔥 Great Deal"
+    elif score >= 60:
+        return "✅ Good Price"
+    elif score >= 40:
+        return "⚠️ Fair Price"
     else:
-        verdict = "🛑 Overpriced"
-
-    return final_score, verdict
+        return "🛑 Overpriced"
 
 
 
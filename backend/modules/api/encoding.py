@@ -0,0 +1,62 @@
+import gzip
+import json
+import hashlib
+from datetime import date, datetime
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Payloads smaller than this aren't worth the CPU to gzip
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+
+def _default(obj):
+    """Fallback for types the encoders can't handle (scraper records, timestamps, numpy scalars)."""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(payload):
+        """Encodes `payload` to UTF-8 JSON bytes using orjson."""
+        return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+else:
+    def dumps(payload):
+        """Encodes `payload` to UTF-8 JSON bytes using the stdlib encoder."""
+        return json.dumps(payload, default=_default, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """
+    Drop-in replacement for `jsonify` used across api_bp.
+    Adds a content-hash ETag, answers If-None-Match with 304
+    and gzips large bodies when the client accepts it.
+    """
+    body = dumps(payload)
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    compress = len(body) >= GZIP_MIN_SIZE and request.accept_encodings['gzip']
+    if compress:
+        # The gzip body is a different representation and needs its own strong ETag
+        etag += '-gz'
+    headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding'}
+
+    if status == 200 and etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+
+    if compress:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(body, status=status, mimetype='application/json', headers=headers)
@@ -1,12 +1,132 @@
-from flask import Blueprint, request, jsonify
+import math
+import time
+import threading
+import concurrent.futures
+from flask import Blueprint, Response, request
 from modules.scraper.engine import ScraperEngine  # Consumer/Retail
 from modules.scraper.b2b_engine import B2BEngine  # 🏭 NEW Wholesale Engine
+from modules.scraper.batch import BatchSearchScheduler, batch_key
+from modules.scraper.b2b_pricing import normalize_leads, sort_leads, storage_record
 from modules.services.db_manager import DBManager
+from modules.services.write_behind import WriteBehindBuffer
+from modules.services.search_index import LocalSearchIndex
 from modules.analytics.scorer import calculate_price_score, calculate_volatility
+from modules.analytics.deal_index import DealIndex
+from modules.alerts.engine import AlertEngine
+from modules.alerts.notifier import is_public_url
 from modules.ml.forecaster import ForecastEngine
+from modules.api.encoding import json_response, dumps
+from config import Config
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+def _enrich_retail(items, db, forecaster, product_ids=None, wholesale=False):
+    """
+    Persists retail items in bulk, then scores them in a single pass.
+    Adds the 'analysis' block the frontend renders for each card.
+    Passing product_ids scores items that are already stored (local search results);
+    wholesale=True looks the items up among stored B2B leads instead of retail products.
+    """
+    buffer = WriteBehindBuffer() if Config.WRITE_BEHIND_ENABLED else None
+    if product_ids is None and buffer:
+        # Writes land in the background; fresh prices are read back from the buffer
+        buffer.enqueue_many(items)
+        known_ids = db.find_product_ids([item.title for item in items], wholesale=wholesale)
+        product_ids = [known_ids.get(item.title) for item in items]
+    elif product_ids is None:
+        product_ids = db.save_products(items)
+    histories = db.get_price_histories(product_ids)
+
+    for item, product_id in zip(items, product_ids):
+        # Handle DB status for history/forecasting
+        history = histories.get(product_id, []) if product_id else []
+        if buffer:
+            history = buffer.merge_history(item.title, history)
+        formatted_history = [{"price": h['price_inr']} for h in history]
+
+        score, verdict = calculate_price_score(item.price, formatted_history)
+        volatility = calculate_volatility(formatted_history)
+        forecast = forecaster.predict_next_week(history, product_id, item.category) if history else None
+
+        item.analysis = {
+            'score': score,
+            'verdict': verdict,
+            'volatility': volatility,
+            'history_count': len(history),
+            'price_history': history,
+            'forecast': forecast
+        }
+    return items
+
+def _enrich_b2b(leads, db, forecaster):
+    """
+    Normalizes B2B price strings, sorts leads by unit price and stores the priced
+    ones like retail items (price = INR per canonical unit), scored from that history.
+    """
+    sort_leads(normalize_leads(leads))
+    priced = [lead for lead in leads if lead.unit_price is not None]
+    if priced:
+        records = [storage_record(lead) for lead in priced]
+        _enrich_retail(records, db, forecaster, wholesale=True)
+        for lead, record in zip(priced, records):
+            lead.analysis = record.analysis
+    return leads
+
+def _search_local(query, intent, db, forecaster):
+    index = LocalSearchIndex()
+    if not index.ready:
+        return None
+
+    hits, stale = index.search(query)
+    product_ids = [product_id for product_id, _ in hits]
+    # Several sites' rows of one product are still one result
+    if len(set(product_ids)) < Config.LOCAL_SEARCH_MIN_RESULTS:
+        return None
+    local_products = [listing for _, listing in hits]
+
+    print(f"🔎 LOCAL HIT: {len(local_products)} stored listings for '{query}' ({'stale' if stale else 'fresh'})")
+    refresh = _schedule_refresh(query, intent) if stale else "fresh"
+
+    # The index already knows the ids; only the histories for scoring are read
+    response = json_response(_enrich_retail(local_products, db, forecaster, product_ids=product_ids))
+    response.headers['X-PriceAtlas-Results'] = 'local'
+    response.headers['X-PriceAtlas-Refresh'] = refresh
+    return response
+
+# Background live scrapes that refresh stale local results, one per query at a time.
+# At most LOCAL_SEARCH_MAX_REFRESHES are running or queued; beyond that a stale hit is
+# served without one, and a later search for it schedules the refresh instead.
+_refresh_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _schedule_refresh(query, intent):
+    key = batch_key(query, intent)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return "in-progress"
+        if len(_refreshing) >= Config.LOCAL_SEARCH_MAX_REFRESHES:
+            return "skipped"
+        _refreshing.add(key)
+
+    def refresh():
+        try:
+            items = ScraperEngine().search_product(query, intent=intent)
+            if not items:
+                return
+            if Config.WRITE_BEHIND_ENABLED:
+                WriteBehindBuffer().enqueue_many(items)
+            else:
+                DBManager().save_products(items)
+        except Exception as e:
+            print(f"⚠️ Background refresh failed for '{query}': {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresh_pool.submit(refresh)
+    return "scheduled"
+
 @api_bp.route('/search', methods=['GET'])
 def search_product():
     query = request.args.get('query') or request.args.get('q')
@@ -14,7 +134,7 @@ def search_product():
     pincode = request.args.get('pincode', '')
     
     if not query:
-        return jsonify({"error": "Missing search query"}), 400
+        return json_response({"error": "Missing search query"}, 400)
 
     db = DBManager()
 
@@ -26,53 +146,227 @@ def search_product():
             b2b_results = b2b_engine.search_b2b(query)
             
             if not b2b_results:
-                return jsonify({"error": "No wholesale suppliers found for this product."}), 404
+                return json_response({"error": "No wholesale suppliers found for this product."}, 404)
             
-            # Wholesale data is often unstructured (Strings like "₹400/kg"), 
-            # so we return it directly as B2B intelligence.
-            return jsonify(b2b_results)
+            # Wholesale prices are unstructured strings like "₹400/kg";
+            # normalize them to INR per unit so leads can be sorted, scored and stored.
+            return json_response(_enrich_b2b(b2b_results, db, ForecastEngine()))
         except Exception as e:
             print(f"❌ B2B Engine Error: {e}")
-            return jsonify({"error": "Wholesale search failed."}), 500
+            return json_response({"error": "Wholesale search failed."}, 500)
 
     # --- 🛒 LOGIC: IF SINGLE, USE STANDARD RETAIL ENGINE ---
     else:
         print(f"🛒 RETAIL MODE: Searching Amazon/Flipkart for: {query}")
         try:
-            scraper = ScraperEngine()
             forecaster = ForecastEngine()
-            
+
+            # Answer from stored products when we can; live scraping only refreshes them
+            if Config.LOCAL_SEARCH_ENABLED and request.args.get('live') != '1':
+                local_response = _search_local(query, intent, db, forecaster)
+                if local_response is not None:
+                    return local_response
+
+            scraper = ScraperEngine()
             all_products = scraper.search_product(query, intent=intent)
             if not all_products:
-                return jsonify({"error": "No retail products found."}), 404
-
-            enriched_results = []
-            for item in all_products:
-                product_id = db.save_product(item)
-                
-                # Handle DB status for history/forecasting
-                if product_id:
-                    history = db.get_price_history(product_id)
-                    formatted_history = [{"price": h['price_inr']} for h in history]
-                else:
-                    history, formatted_history = [], []
-
-                score, verdict = calculate_price_score(item['price'], formatted_history)
-                volatility = calculate_volatility(formatted_history)
-                forecast = forecaster.predict_next_week(history) if history else None
-
-                item['analysis'] = {
-                    'score': score,
-                    'verdict': verdict,
-                    'volatility': volatility,
-                    'history_count': len(history),
-                    'price_history': history,
-                    'forecast': forecast
-                }
-                enriched_results.append(item)
-
-            return jsonify(enriched_results)
+                return json_response({"error": "No retail products found."}, 404)
+
+            enriched_results = _enrich_retail(all_products, db, forecaster)
+
+            return json_response(enriched_results)
 
         except Exception as e:
             print(f"❌ Retail Engine Error: {e}")
-            return jsonify({"error": "Retail search failed."}), 500
\ No newline at end of file
+            return json_response({"error": "Retail search failed."}, 500)
+
+@api_bp.route('/search/batch', methods=['POST'])
+def search_batch():
+    """
+    Catalog monitoring: many searches in one request.
+    Body: {"queries": ["query", {"query": "...", "intent": "bulk"}, ...], "stream": false}
+    With "stream": true, one NDJSON line is emitted per query as soon as it completes.
+    The batch gets BATCH_DEADLINE seconds; queries still running then come back
+    with what they have and "timed_out": true. A query that fails gets an "error".
+    """
+    body = request.get_json(silent=True) or {}
+    raw_queries = body.get('queries')
+
+    if not isinstance(raw_queries, list) or not raw_queries:
+        return json_response({"error": "Missing 'queries' list"}, 400)
+    if len(raw_queries) > Config.BATCH_MAX_QUERIES:
+        return json_response({"error": f"Batch limited to {Config.BATCH_MAX_QUERIES} queries"}, 400)
+
+    requested = []
+    for entry in raw_queries:
+        if isinstance(entry, str):
+            entry = {"query": entry}
+        query = (entry.get('query') or entry.get('q') or '').strip() if isinstance(entry, dict) else ''
+        if not query:
+            return json_response({"error": "Every batch entry needs a query"}, 400)
+        intent = entry.get('intent', 'single')
+        requested.append((query, intent, batch_key(query, intent)))
+
+    # Duplicate queries share one fetch; each requested entry still gets its own result row
+    waiting = {}
+    for query, intent, key in requested:
+        waiting.setdefault(key, []).append((query, intent))
+
+    print(f"🗂️ BATCH MODE: {len(requested)} queries ({len(waiting)} unique)")
+
+    db = DBManager()
+    forecaster = ForecastEngine()
+    scheduler = BatchSearchScheduler()
+    deadline = time.monotonic() + Config.BATCH_DEADLINE
+
+    def result_rows(key, items):
+        extra = {"timed_out": True} if key in scheduler.timed_out else {}
+        return [dict({"query": query, "intent": intent, "count": len(items), "results": items}, **extra)
+                for query, intent in waiting[key]]
+
+    def error_rows(key, message):
+        return [{"query": query, "intent": intent, "count": 0, "results": [], "error": message}
+                for query, intent in waiting[key]]
+
+    if body.get('stream'):
+        def generate():
+            try:
+                for key, items in scheduler.run(waiting, deadline):
+                    try:
+                        if key[1] == 'single' and items:
+                            items = _enrich_retail(items, db, forecaster)
+                        elif items:
+                            items = _enrich_b2b(items, db, forecaster)
+                        rows = result_rows(key, items)
+                    except Exception as e:
+                        print(f"❌ Batch Search Error for '{key[0]}': {e}")
+                        rows = error_rows(key, "Search failed.")
+                    for row in rows:
+                        yield dumps(row) + b"\n"
+            except Exception as e:
+                # Whatever has streamed stays valid; the client sees why the rest is missing
+                print(f"❌ Batch Search Error: {e}")
+                yield dumps({"error": "Batch search failed."}) + b"\n"
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    try:
+        completed = dict(scheduler.run(waiting, deadline))
+
+        # Persist and score every retail item, and every B2B lead, of the batch in one pass
+        retail = [item for key, items in completed.items() if key[1] == 'single' for item in items]
+        if retail:
+            _enrich_retail(retail, db, forecaster)
+        wholesale = [key for key, items in completed.items() if key[1] != 'single' and items]
+        if wholesale:
+            _enrich_b2b([lead for key in wholesale for lead in completed[key]], db, forecaster)
+            for key in wholesale:
+                sort_leads(completed[key])
+
+        rows = {}
+        for key, items in completed.items():
+            for row in result_rows(key, items):
+                rows[(row['query'], row['intent'])] = row
+
+        return json_response({"results": [rows[(query, intent)] for query, intent, _ in requested]})
+
+    except Exception as e:
+        print(f"❌ Batch Search Error: {e}")
+        return json_response({"error": "Batch search failed."}, 500)
+
+@api_bp.route('/deals', methods=['GET'])
+def deals_feed():
+    """
+    Top deals across every tracked product, best score first.
+    Optional filters: category, source, min_score, max_price; limit caps the list (max 100).
+    """
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        min_score = int(request.args.get('min_score', 0))
+        max_price = request.args.get('max_price')
+        max_price = float(max_price) if max_price is not None else None
+    except ValueError:
+        return json_response({"error": "limit and min_score must be integers, max_price a number"}, 400)
+
+    index = DealIndex()
+    deals = index.top(
+        k=limit,
+        category=request.args.get('category'),
+        min_score=min_score,
+        max_price=max_price,
+        source=request.args.get('source'),
+    )
+    return json_response({
+        "deals": deals,
+        "count": len(deals),
+        "categories": index.categories(),
+        "warming_up": not index.ready,
+    })
+
+@api_bp.route('/alerts', methods=['POST'])
+def create_alert():
+    """
+    Registers a "notify me below ₹X" alert.
+    Body: {"product_id": 12 | "title": "...", "threshold": 49999, "contact": "email or webhook URL"}
+    The response carries a cancel_token; it is shown only once and DELETE needs it.
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        threshold = float(body.get('threshold'))
+    except (TypeError, ValueError):
+        return json_response({"error": "Missing or invalid 'threshold'"}, 400)
+    # NaN would sit anywhere in the AlertIndex's sorted thresholds and break its bisection
+    if not math.isfinite(threshold) or threshold <= 0:
+        return json_response({"error": "'threshold' must be a positive number"}, 400)
+
+    db = DBManager()
+    product_id = body.get('product_id')
+    if product_id is not None:
+        try:
+            if isinstance(product_id, bool) or int(product_id) != float(product_id):
+                raise ValueError(product_id)
+            product_id = int(product_id)
+        except (TypeError, ValueError, OverflowError):
+            return json_response({"error": "Invalid 'product_id'"}, 400)
+        if not db.has_product(product_id):
+            product_id = None
+    elif isinstance(body.get('title'), str):
+        product_id = db.find_product_ids([body['title']]).get(body['title'])
+    if not product_id:
+        return json_response({"error": "Unknown product. Search for it first."}, 404)
+
+    contact = body.get('contact')
+    if isinstance(contact, str) and contact.startswith(('http://', 'https://')) \
+            and not is_public_url(contact, Config.ALERT_WEBHOOK_ALLOWED_HOSTS):
+        return json_response({"error": "Webhook URL must be a public http(s) address."}, 400)
+
+    try:
+        alert = AlertEngine().create(product_id, threshold, contact)
+        return json_response(alert, 201)
+    except Exception as e:
+        print(f"❌ Alert Error: {e}")
+        return json_response({"error": "Could not create alert."}, 500)
+
+@api_bp.route('/alerts', methods=['GET'])
+def list_alerts():
+    product_id = request.args.get('product_id', type=int)
+    if not product_id:
+        return json_response({"error": "Missing product_id"}, 400)
+    try:
+        return json_response({"alerts": AlertEngine().list_for_product(product_id)})
+    except Exception as e:
+        print(f"❌ Alert Error: {e}")
+        return json_response({"error": "Could not load alerts."}, 500)
+
+@api_bp.route('/alerts/<int:alert_id>', methods=['DELETE'])
+def cancel_alert(alert_id):
+    """Needs the cancel_token returned by POST /alerts, as ?token= or an X-Alert-Token header."""
+    token = request.headers.get('X-Alert-Token') or request.args.get('token')
+    try:
+        if not AlertEngine().cancel(alert_id, token):
+            # Same answer for a wrong token, so ids can't be probed
+            return json_response({"error": "Alert not found, already triggered, or wrong token."}, 404)
+        return json_response({"cancelled": alert_id})
+    except Exception as e:
+        print(f"❌ Alert Error: {e}")
+        return json_response({"error": "Could not cancel alert."}, 500)
@@ -0,0 +1,181 @@
+"""
+Walk-forward backtest of ForecastEngine.predict_next_week.
+
+Replays the forecaster at every point of every product's stored history,
+compares each 7-day prediction with the price actually recorded, and writes
+MAPE and directional accuracy per product, per category and overall to
+Config.FORECAST_CALIBRATION_PATH. predict_next_week reads its confidence
+from that table.
+
+Run from the backend folder, e.g. nightly after the compactor:
+    python -m modules.ml.backtest --workers 4
+"""
+import os
+import argparse
+import collections
+import concurrent.futures
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import Config
+from modules.services.db_manager import DBManager
+from modules.ml.forecaster import to_series, HORIZON_DAYS, TREND_THRESHOLD_PCT
+from modules.ml.calibration import CalibrationTable, category_key
+
+# predict_next_week needs 3 points to fit a line
+MIN_POINTS = 3
+CHUNK_SIZE = 200
+
+
+def walk_forward(days, prices, horizon=HORIZON_DAYS):
+    """
+    Evaluates the forecaster at every prefix of one product's history at once.
+    Running sums give the least-squares line of each prefix, so n forecasts cost O(n)
+    instead of n separate fits. Returns (forecasts, sum of absolute % errors, correct trend calls).
+
+    A forecast made at point i is checked against the price in effect HORIZON_DAYS later:
+    the last recorded price at or before that day, since prices are only stored on change.
+    Forecasts whose target lies past the end of the history have no ground truth and are skipped.
+    """
+    x = np.asarray(days, dtype=np.float64)
+    y = np.asarray(prices, dtype=np.float64)
+    n = np.arange(1, len(x) + 1, dtype=np.float64)
+
+    sum_x, sum_y = np.cumsum(x), np.cumsum(y)
+    den = np.cumsum(x * x) - sum_x * sum_x / n
+    num = np.cumsum(x * y) - sum_x * sum_y / n
+    target = x + horizon
+
+    # den == 0 is predict_next_week's same-day case, where it returns no forecast
+    origins = np.flatnonzero((n >= MIN_POINTS) & (den > 1e-9) & (target <= x[-1]) & (y > 0))
+    if origins.size == 0:
+        return 0, 0.0, 0
+
+    slope = num[origins] / den[origins]
+    intercept = (sum_y[origins] - slope * sum_x[origins]) / n[origins]
+    predicted = slope * target[origins] + intercept
+
+    current = y[origins]
+    actual = y[np.searchsorted(x, target[origins], side='right') - 1]
+    keep = actual > 0
+    predicted, current, actual = predicted[keep], current[keep], actual[keep]
+
+    ape = np.abs(predicted - actual) / actual
+    hits = _trend_codes(predicted, current) == _trend_codes(actual, current)
+    return int(ape.size), float(ape.sum()), int(hits.sum())
+
+
+def _trend_codes(price, current):
+    # Same rounding and thresholds as predict_next_week's Upward / Stable / Downward
+    change_pct = np.round((price - current) / current * 100, 2)
+    return (change_pct > TREND_THRESHOLD_PCT).astype(np.int8) - (change_pct < -TREND_THRESHOLD_PCT).astype(np.int8)
+
+
+def evaluate_chunk(chunk):
+    """Process-pool task: [(product_id, category, days, prices)] -> [(product_id, category, forecasts, ape_sum, hits)]."""
+    results = []
+    for product_id, category, days, prices in chunk:
+        forecasts, ape_sum, hits = walk_forward(days, prices)
+        if forecasts:
+            results.append((product_id, category, forecasts, ape_sum, hits))
+    return results
+
+
+def summarize(forecasts, ape_sum, hits):
+    accuracy = hits / forecasts
+    return {
+        "forecasts": forecasts,
+        "mape": round(100 * ape_sum / forecasts, 2),
+        "directional_accuracy": round(100 * accuracy, 2),
+        "confidence": int(round(100 * accuracy)),
+    }
+
+
+class Backtester:
+    def __init__(self, workers=None, chunk_size=CHUNK_SIZE, min_forecasts=None):
+        self.db = DBManager()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_forecasts = min_forecasts if min_forecasts is not None else Config.FORECAST_CALIBRATION_MIN_FORECASTS
+
+    def chunks(self):
+        """Loads histories a chunk of products at a time, already converted to (days, prices)."""
+        products = [(row['id'], row.get('category')) for row in self.db.scan('products', 'id, category')]
+        for i in range(0, len(products), self.chunk_size):
+            batch = products[i:i + self.chunk_size]
+            histories = self.db.get_price_histories([pid for pid, _ in batch])
+            chunk = []
+            for product_id, category in batch:
+                history = histories.get(product_id) or []
+                if len(history) <= MIN_POINTS:
+                    continue  # no forecast point has a later price to check against
+                days, prices = to_series(history)
+                chunk.append((product_id, category_key(category),
+                              np.asarray(days, dtype=np.int32), np.asarray([float(p) for p in prices])))
+            if chunk:
+                yield chunk
+
+    def evaluate(self):
+        """Yields per-product results. Workers score one chunk while the next is read from the DB."""
+        if self.workers == 1:
+            for chunk in self.chunks():
+                yield from evaluate_chunk(chunk)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = collections.deque()
+            for chunk in self.chunks():
+                pending.append(pool.submit(evaluate_chunk, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def run(self, output=None, dry_run=False):
+        print(f"🧪 Backtesting forecasts ({self.workers} workers)...")
+        products = {}
+        categories = {}
+        overall = [0, 0.0, 0]
+        for product_id, category, forecasts, ape_sum, hits in self.evaluate():
+            if forecasts >= self.min_forecasts:
+                products[str(product_id)] = summarize(forecasts, ape_sum, hits)
+            for totals in (categories.setdefault(category, [0, 0.0, 0]) if category else None, overall):
+                if totals is not None:
+                    totals[0] += forecasts
+                    totals[1] += ape_sum
+                    totals[2] += hits
+
+        table = CalibrationTable({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "global": summarize(*overall) if overall[0] else None,
+            "categories": {c: summarize(*t) for c, t in categories.items() if t[0] >= self.min_forecasts},
+            "products": products,
+        })
+
+        if table.global_stats:
+            stats = table.global_stats
+            print(f"✅ {stats['forecasts']} forecasts: MAPE {stats['mape']}%, "
+                  f"direction {stats['directional_accuracy']}% "
+                  f"({len(products)} products, {len(table.categories)} categories calibrated)")
+        else:
+            print("⚠️ No product has enough history to backtest")
+
+        if not dry_run:
+            table.save(output)
+        return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the price forecaster")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument('--min-forecasts', type=int, default=Config.FORECAST_CALIBRATION_MIN_FORECASTS,
+                        help="forecasts a product or category needs before it gets its own calibration")
+    parser.add_argument('--output', default=Config.FORECAST_CALIBRATION_PATH)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    Backtester(workers=args.workers, min_forecasts=args.min_forecasts).run(output=args.output, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
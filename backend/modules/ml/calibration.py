@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import threading
+
+from config import Config
+
+# How often a running worker checks the calibration file for a newer backtest
+RELOAD_CHECK_SECONDS = 60
+
+
+class CalibrationTable:
+    """
+    Backtested forecast accuracy, written by modules/ml/backtest.py.
+    Lookups go product -> category -> global and are plain dict reads.
+    """
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.generated_at = data.get('generated_at')
+        self.global_stats = data.get('global')
+        self.categories = data.get('categories', {})
+        self.products = data.get('products', {})
+
+    def lookup(self, product_id=None, category=None):
+        """Returns (stats, source) for the most specific level available, or (None, None)."""
+        if product_id is not None:
+            stats = self.products.get(str(product_id))
+            if stats:
+                return stats, "product"
+        if category:
+            stats = self.categories.get(category_key(category))
+            if stats:
+                return stats, "category"
+        if self.global_stats:
+            return self.global_stats, "global"
+        return None, None
+
+    def to_dict(self):
+        return {
+            "generated_at": self.generated_at,
+            "global": self.global_stats,
+            "categories": self.categories,
+            "products": self.products,
+        }
+
+    def save(self, path=None):
+        path = path or Config.FORECAST_CALIBRATION_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)   # readers never see a half-written table
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or Config.FORECAST_CALIBRATION_PATH
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+class CalibrationCache:
+    """Process-wide CalibrationTable, reloaded when the backtest rewrites the file."""
+    _lock = threading.Lock()
+    _table = None
+    _mtime = None
+    _checked_at = 0.0
+
+    @classmethod
+    def get(cls):
+        now = time.monotonic()
+        if now - cls._checked_at < RELOAD_CHECK_SECONDS:
+            return cls._table
+
+        with cls._lock:
+            if now - cls._checked_at < RELOAD_CHECK_SECONDS:
+                return cls._table
+            cls._checked_at = now
+            path = Config.FORECAST_CALIBRATION_PATH
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                cls._table, cls._mtime = None, None
+                return None
+            if mtime != cls._mtime:
+                try:
+                    cls._table = CalibrationTable.load(path)
+                    cls._mtime = mtime
+                    print(f"🎯 Forecast calibration loaded ({cls._table.generated_at})")
+                except Exception as e:
+                    print(f"⚠️ Forecast calibration unreadable: {e}")
+            return cls._table
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._table, cls._mtime, cls._checked_at = None, None, 0.0
+
+
+def category_key(category):
+    return category.strip().lower() if category else None
@@ -1,6 +1,43 @@
 import statistics
 from datetime import datetime
 
+from modules.ml.calibration import CalibrationCache
+
+# Forecast horizon and the % move that counts as a trend; the backtest uses the same values
+HORIZON_DAYS = 7
+TREND_THRESHOLD_PCT = 1.5
+
+
+def to_series(history):
+    """
+    Sorts history chronologically and converts it to (days since first scrape, prices).
+    Shared with the backtest so both see exactly the same X values.
+    """
+    sorted_history = sorted(history, key=lambda x: x['scraped_at'])
+
+    start_date = sorted_history[0]['scraped_at']
+    if isinstance(start_date, str):
+        start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+
+    days = []
+    prices = []
+    for h in sorted_history:
+        current_date = h['scraped_at']
+        if isinstance(current_date, str):
+            current_date = datetime.fromisoformat(current_date.replace('Z', '+00:00'))
+
+        delta = (current_date - start_date).days
+        days.append(delta)
+        prices.append(h['price_inr'])
+    return days, prices
+
+
+def trend_for(change_pct):
+    if change_pct > TREND_THRESHOLD_PCT: return "Upward"
+    if change_pct < -TREND_THRESHOLD_PCT: return "Downward"
+    return "Stable"
+
+
 class ForecastEngine:
     def __init__(self):
         """
@@ -9,36 +46,19 @@ class ForecastEngine:
         """
         pass
 
-    def predict_next_week(self, history):
+    def predict_next_week(self, history, product_id=None, category=None):
         """
         Calculates Trend, % Change, and Confidence Score (UC4).
         Requires at least 3 historical data points for accuracy.
+        Confidence comes from the backtest calibration table when one exists.
         """
         # We need a minimum amount of history to draw a trend line
         if not history or len(history) < 3:
             return None
 
         try:
-            # 1. Sort history by date to ensure chronological math
-            # Using 'scraped_at' from the Supabase Schema
-            sorted_history = sorted(history, key=lambda x: x['scraped_at'])
-            
-            # 2. Convert timestamps to numerical 'X' values (Days since start)
-            start_date = sorted_history[0]['scraped_at']
-            if isinstance(start_date, str):
-                start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-
-            days = []
-            prices = []
-            
-            for h in sorted_history:
-                current_date = h['scraped_at']
-                if isinstance(current_date, str):
-                    current_date = datetime.fromisoformat(current_date.replace('Z', '+00:00'))
-                
-                delta = (current_date - start_date).days
-                days.append(delta)
-                prices.append(h['price_inr'])
+            # 1-2. Sort by 'scraped_at' and convert timestamps to numerical 'X' values (Days since start)
+            days, prices = to_series(history)
 
             # 3. Linear Regression (Least Squares Method)
             n = len(days)
@@ -54,7 +74,7 @@ class ForecastEngine:
             intercept = mean_y - (slope * mean_x)
 
             # 4. Predict +7 Days into the future
-            future_day = days[-1] + 7
+            future_day = days[-1] + HORIZON_DAYS
             predicted_price = (slope * future_day) + intercept
             current_price = prices[-1]
 
@@ -62,20 +82,25 @@ class ForecastEngine:
             change_pct = round(((predicted_price - current_price) / current_price) * 100, 2)
             
             # Trend Logic
-            if change_pct > 1.5: trend = "Upward"
-            elif change_pct < -1.5: trend = "Downward"
-            else: trend = "Stable"
-
-            # Confidence Score (MAPE-based approximation)
-            # More data points increase our confidence
-            confidence = min(40 + (n * 5), 95) 
+            trend = trend_for(change_pct)
 
-            return {
+            # Confidence Score: how often backtested trend calls were right
+            forecast = {
                 "trend": trend,
                 "change_pct": change_pct,
                 "predicted_price": round(predicted_price, 2),
-                "confidence": confidence
             }
+            calibration = CalibrationCache.get()
+            stats, level = calibration.lookup(product_id, category) if calibration else (None, None)
+            if stats:
+                forecast["confidence"] = stats['confidence']
+                forecast["mape"] = stats['mape']
+                forecast["confidence_source"] = level
+            else:
+                # No backtest yet: more data points increase our confidence
+                forecast["confidence"] = min(40 + (n * 5), 95)
+                forecast["confidence_source"] = "heuristic"
+            return forecast
 
         except Exception as e:
             print(f"ML Forecast Error: {e}")
@@ -4,6 +4,8 @@ from fake_useragent import UserAgent
 import random
 import time
 import re
+from modules.scraper.b2b_pricing import extract_moq
+from modules.scraper.records import B2BLead
 
 class B2BEngine:
     def __init__(self):
@@ -12,19 +14,33 @@ class B2BEngine:
         }
         self.ua = UserAgent()
 
+        # Direct sources, tried in order before the search-engine fallback
+        self.DIRECT_SOURCES = {
+            "tradeindia": self._scrape_tradeindia,
+            "indiamart": self._scrape_indiamart_mobile,
+        }
+        self.FALLBACK_SITE = "indiamart.com"
+
     def search_b2b(self, query):
         print(f"🏭 B2B ENGINE: Starting Multi-Source Scan for '{query}'...")
         results = []
         # Try direct methods first
-        results.extend(self._scrape_tradeindia(query))
-        results.extend(self._scrape_indiamart_mobile(query))
+        for source in self.DIRECT_SOURCES:
+            results.extend(self.fetch_source(source, query))
 
         if not results:
-            print("⚠️ Direct scanning blocked. Engaging Deep-Snippet Backdoor...")
-            results.extend(self._search_engine_fallback(query, "indiamart.com"))
+            results.extend(self.fallback(query))
         
         return results
 
+    def fetch_source(self, source, query):
+        method = self.DIRECT_SOURCES.get(source)
+        return method(query) if method else []
+
+    def fallback(self, query):
+        print("⚠️ Direct scanning blocked. Engaging Deep-Snippet Backdoor...")
+        return self._search_engine_fallback(query, self.FALLBACK_SITE)
+
     def _scrape_indiamart_mobile(self, query):
         print(f"🇮🇳 Scanning IndiaMART Mobile for '{query}'...")
         url = f"https://m.indiamart.com/impcat/{query.replace(' ', '-').lower()}.html"
@@ -41,16 +57,16 @@ class B2BEngine:
                     img_url = img_tag.get('data-src') or img_tag.get('src') if img_tag else None
                     
                     title_tag = card.find('a', {'class': 'p-name'})
-                    leads.append({
-                        "title": title_tag.get_text(strip=True),
-                        "price": card.find('span', {'class': 'p-price'}).get_text(strip=True) if card.find('span', {'class': 'p-price'}) else "Ask Price",
-                        "seller": card.find(['div', 'span'], {'class': re.compile(r'c-name|cname')}).get_text(strip=True) if card.find(['div', 'span'], {'class': re.compile(r'c-name|cname')}) else "Verified Supplier",
-                        "address": card.find(['div', 'span'], {'class': re.compile(r'c-loc|cloc')}).get_text(strip=True) if card.find(['div', 'span'], {'class': re.compile(r'c-loc|cloc')}) else "India",
-                        "url": "https://m.indiamart.com" + title_tag['href'] if title_tag else "#",
-                        "image": img_url if img_url and 'http' in img_url else "https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
-                        "source": "IndiaMART",
-                        "type": "B2B"
-                    })
+                    leads.append(B2BLead(
+                        title=title_tag.get_text(strip=True),
+                        price=card.find('span', {'class': 'p-price'}).get_text(strip=True) if card.find('span', {'class': 'p-price'}) else "Ask Price",
+                        seller=card.find(['div', 'span'], {'class': re.compile(r'c-name|cname')}).get_text(strip=True) if card.find(['div', 'span'], {'class': re.compile(r'c-name|cname')}) else "Verified Supplier",
+                        address=card.find(['div', 'span'], {'class': re.compile(r'c-loc|cloc')}).get_text(strip=True) if card.find(['div', 'span'], {'class': re.compile(r'c-loc|cloc')}) else "India",
+                        url="https://m.indiamart.com" + title_tag['href'] if title_tag else "#",
+                        image=img_url if img_url and 'http' in img_url else "https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
+                        source="IndiaMART",
+                        type="B2B"
+                    ))
                 except: continue
             return leads
         except: return []
@@ -71,16 +87,16 @@ class B2BEngine:
                     # This looks much better than a broken icon
                     placeholder = f"https://loremflickr.com/320/240/{query.replace(' ', ',')}"
                     
-                    results.append({
-                        "title": title_tag.get_text(strip=True),
-                        "price": "Wholesale Price", 
-                        "seller": title_tag.get_text().split('-')[0].strip(),
-                        "address": "Verified Location",
-                        "url": title_tag['href'],
-                        "source": f"{site} (Verified)",
-                        "image": placeholder, # ✨ Placeholder fix for fallback mode
-                        "type": "Wholesale"
-                    })
+                    results.append(B2BLead(
+                        title=title_tag.get_text(strip=True),
+                        price="Wholesale Price", 
+                        seller=title_tag.get_text().split('-')[0].strip(),
+                        address="Verified Location",
+                        url=title_tag['href'],
+                        source=f"{site} (Verified)",
+                        image=placeholder, # ✨ Placeholder fix for fallback mode
+                        type="Wholesale"
+                    ))
                 except: continue
             return results[:5]
         except: return []
@@ -107,18 +123,20 @@ class B2BEngine:
                     # 🧠 Extract City/Location from raw text
                     loc_text = card.get_text()
                     city_match = re.search(r'(Delhi|Mumbai|Pune|Ahmedabad|Chennai|Bangalore|Kolkata|Surat|Jaipur|Lucknow)', loc_text)
+                    price_tag = card.find(['span', 'div', 'p'], {'class': re.compile(r'price')})
                     
-                    leads.append({
-                        "title": title_tag.get_text(strip=True),
-                        "price": "Check Quote",
-                        "seller": card.find(['p', 'span'], {'class': re.compile(r'company|seller|name')}).text.strip() if card.find(['p', 'span'], {'class': re.compile(r'company|seller|name')}) else "Verified Supplier",
-                        "address": city_match.group(0) if city_match else "India",
-                        "contact": "Contact Supplier",
-                        "url": link,
-                        "image": "https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
-                        "source": "TradeIndia",
-                        "type": "B2B"
-                    })
+                    leads.append(B2BLead(
+                        title=title_tag.get_text(strip=True),
+                        price=price_tag.get_text(strip=True) if price_tag else "Check Quote",
+                        moq_text=extract_moq(card.get_text(" ", strip=True)),
+                        seller=card.find(['p', 'span'], {'class': re.compile(r'company|seller|name')}).text.strip() if card.find(['p', 'span'], {'class': re.compile(r'company|seller|name')}) else "Verified Supplier",
+                        address=city_match.group(0) if city_match else "India",
+                        contact="Contact Supplier",
+                        url=link,
+                        image="https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
+                        source="TradeIndia",
+                        type="B2B"
+                    ))
                 except: continue
             return leads
         except: return []
@@ -147,17 +165,18 @@ class B2BEngine:
                     seller_tag = card.find(['div', 'span'], {'class': re.compile(r'c-name|cname')})
                     loc_tag = card.find(['div', 'span'], {'class': re.compile(r'c-loc|cloc')})
 
-                    leads.append({
-                        "title": title_tag.get_text(strip=True),
-                        "price": price_tag.get_text(strip=True) if price_tag else "Ask Price",
-                        "seller": seller_tag.get_text(strip=True) if seller_tag else "Star Supplier",
-                        "address": loc_tag.get_text(strip=True) if loc_tag else "India",
-                        "contact": "Call Supplier",
-                        "url": link,
-                        "image": "https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
-                        "source": "IndiaMART",
-                        "type": "B2B"
-                    })
+                    leads.append(B2BLead(
+                        title=title_tag.get_text(strip=True),
+                        price=price_tag.get_text(strip=True) if price_tag else "Ask Price",
+                        moq_text=extract_moq(card.get_text(" ", strip=True)),
+                        seller=seller_tag.get_text(strip=True) if seller_tag else "Star Supplier",
+                        address=loc_tag.get_text(strip=True) if loc_tag else "India",
+                        contact="Call Supplier",
+                        url=link,
+                        image="https://tiimg.tistatic.com/fp/1/007/557/indiamart-logo-584.jpg",
+                        source="IndiaMART",
+                        type="B2B"
+                    ))
                 except: continue
             return leads
         except: return []
@@ -176,17 +195,18 @@ class B2BEngine:
                     title_tag = card.find('a', {'class': re.compile(r'pname|title')})
                     if not title_tag: continue
                     
-                    leads.append({
-                        "title": title_tag.get_text(strip=True),
-                        "price": card.find('div', {'class': 'price'}).get_text(strip=True) if card.find('div', {'class': 'price'}) else "Quote Only",
-                        "seller": card.find('a', {'class': 'cname'}).get_text(strip=True) if card.find('a', {'class': 'cname'}) else "Verified Exporter",
-                        "address": "View Profile",
-                        "contact": "Contact Exporter",
-                        "url": title_tag['href'],
-                        "image": "https://img.etimg.com/thumb/msid-64687661,width-300,imgsize-12497,,resizemode-4,quality-100/exporters-india.jpg",
-                        "source": "ExportersIndia",
-                        "type": "B2B"
-                    })
+                    leads.append(B2BLead(
+                        title=title_tag.get_text(strip=True),
+                        price=card.find('div', {'class': 'price'}).get_text(strip=True) if card.find('div', {'class': 'price'}) else "Quote Only",
+                        moq_text=extract_moq(card.get_text(" ", strip=True)),
+                        seller=card.find('a', {'class': 'cname'}).get_text(strip=True) if card.find('a', {'class': 'cname'}) else "Verified Exporter",
+                        address="View Profile",
+                        contact="Contact Exporter",
+                        url=title_tag['href'],
+                        image="https://img.etimg.com/thumb/msid-64687661,width-300,imgsize-12497,,resizemode-4,quality-100/exporters-india.jpg",
+                        source="ExportersIndia",
+                        type="B2B"
+                    ))
                 except: continue
             return leads
         except: return []
@@ -0,0 +1,196 @@
+import re
+from functools import lru_cache
+
+from modules.scraper.records import ProductListing
+
+# Stored B2B leads use this category, which keeps them out of retail-only views
+WHOLESALE_CATEGORY = "Wholesale"
+
+CURRENCIES = {
+    "₹": "INR", "rs": "INR", "rs.": "INR", "inr": "INR",
+    "$": "USD", "us$": "USD", "usd": "USD",
+    "€": "EUR", "eur": "EUR",
+    "£": "GBP", "gbp": "GBP",
+}
+
+SCALES = {"k": 1e3, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "crore": 1e7, "crores": 1e7, "cr": 1e7}
+
+# Quoted unit -> (canonical unit, how many canonical units one quoted unit is)
+UNITS = {
+    "kg": ("kg", 1), "kgs": ("kg", 1), "kilo": ("kg", 1), "kilogram": ("kg", 1),
+    "g": ("kg", 0.001), "gm": ("kg", 0.001), "gms": ("kg", 0.001), "gram": ("kg", 0.001),
+    "quintal": ("kg", 100), "qtl": ("kg", 100),
+    "ton": ("kg", 1000), "tonne": ("kg", 1000), "mt": ("kg", 1000), "metric ton": ("kg", 1000), "metric tonne": ("kg", 1000),
+    "l": ("litre", 1), "ltr": ("litre", 1), "litre": ("litre", 1), "liter": ("litre", 1),
+    "ml": ("litre", 0.001), "kl": ("litre", 1000),
+    "piece": ("piece", 1), "pc": ("piece", 1), "pcs": ("piece", 1), "nos": ("piece", 1), "no": ("piece", 1),
+    "number": ("piece", 1), "unit": ("piece", 1), "dozen": ("piece", 12),
+    "m": ("metre", 1), "mtr": ("metre", 1), "mtrs": ("metre", 1), "meter": ("metre", 1), "metre": ("metre", 1),
+    "cm": ("metre", 0.01), "mm": ("metre", 0.001), "km": ("metre", 1000),
+    "ft": ("metre", 0.3048), "feet": ("metre", 0.3048), "foot": ("metre", 0.3048),
+    "inch": ("metre", 0.0254), "yard": ("metre", 0.9144), "yd": ("metre", 0.9144),
+    "sq ft": ("sq m", 0.092903), "sqft": ("sq m", 0.092903), "square feet": ("sq m", 0.092903),
+    "sq m": ("sq m", 1), "sqm": ("sq m", 1), "square meter": ("sq m", 1), "square metre": ("sq m", 1),
+}
+# Packaging units have no fixed size; they only compare with the same unit
+for _pack in ("box", "pack", "packet", "bag", "roll", "set", "pair", "bottle", "carton", "bundle"):
+    UNITS[_pack] = (_pack, 1)
+
+_CURRENCY = r"(?:₹|rs\.?|inr|us\s?\$|\$|usd|€|eur|£|gbp)"
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?"
+_SCALE = r"(?:lakhs?|lacs?|crores?|cr|k)(?![a-z])"
+# Any known unit as a whole word, longest first ("metric ton" before "m"), plurals included
+_UNIT = r"(?:{})(?:e?s)?\b\.?".format("|".join(
+    re.escape(unit).replace(r"\ ", r"\s+") for unit in sorted(UNITS, key=len, reverse=True)))
+
+
+def _per(name):
+    # "/Kg", "per 10 Pieces", "/Packet of 10", "/Bag of 25 Kg"
+    return (rf"(?:/|\bper\b)\s*(?:(?P<{name}per>{_AMOUNT})\s*)?(?P<{name}unit>[a-z][a-z. ]*?)"
+            rf"(?:\s+of\s+(?P<{name}pack>{_AMOUNT})\s*(?P<{name}pack_unit>[a-z][a-z. ]*?)?)?")
+
+
+# "₹ 400/Kg", "Rs. 1.2 Lakh / Metric Ton", "$5 - $7 per 10 Pieces", "₹ 45,000/Ton (approx)",
+# "₹ 10/kg - ₹ 12/kg", "₹ 120/Packet of 10"
+PRICE_PATTERN = re.compile(
+    rf"^\s*(?P<currency>{_CURRENCY})?\s*(?P<low>{_AMOUNT})\s*(?P<low_scale>{_SCALE})?(?:\s*{_per('low_')})?"
+    rf"(?:\s*(?:-|–|to)\s*{_CURRENCY}?\s*(?P<high>{_AMOUNT})\s*(?P<high_scale>{_SCALE})?)?"
+    rf"(?:\s*{_per('')})?\s*(?:\(.*\))?\s*$",
+    re.IGNORECASE,
+)
+
+# "100 Kg", "5 Metric Ton", "1000 Pieces"
+QUANTITY_PATTERN = re.compile(rf"(?P<amount>{_AMOUNT})\s*(?P<unit>[a-z][a-z. ]*)?", re.IGNORECASE)
+
+# "MOQ: 100 Kg", "Minimum Order Quantity: 50 Piece", "Min. Order: 1 Ton".
+# Only a known unit is taken, never the seller name or button text that follows.
+MOQ_PATTERN = re.compile(
+    rf"(?:moq|min(?:imum)?\.?\s*order(?:\s*quantity)?)\s*[:\-]?\s*({_AMOUNT}(?:\s*{_UNIT})?)",
+    re.IGNORECASE,
+)
+
+
+def _number(text, scale=None):
+    return float(text.replace(",", "")) * (SCALES[scale.lower()] if scale else 1)
+
+
+def _unit(text):
+    """(canonical unit, factor) for a quoted unit. Unknown units are kept as quoted."""
+    if not text:
+        return None, 1
+    words = text.lower().replace(".", " ").split()
+    # Longest known unit at the start wins: "metric ton", "piece onwards", "kg surat"
+    for n in range(min(len(words), 3), 0, -1):
+        unit = " ".join(words[:n])
+        for candidate in (unit, unit[:-1] if unit.endswith("s") else None, unit[:-2] if unit.endswith("es") else None):
+            if candidate in UNITS:
+                return UNITS[candidate]
+    unit = " ".join(words)
+    return (unit, 1) if unit and len(unit) <= 20 else (None, 1)
+
+
+@lru_cache(maxsize=4096)
+def parse_price(text):
+    """
+    Parses a quoted B2B price. Returns (low, high, currency, unit, factor) with
+    low/high per canonical unit in the quoted currency, or None for "Ask Price" etc.
+    """
+    match = PRICE_PATTERN.match(text or "")
+    if not match:
+        return None
+
+    low = _number(match['low'], match['low_scale'])
+    high = _number(match['high'], match['high_scale'] or match['low_scale']) if match['high'] else low
+    # "₹ 2 - 3 Lakh" scales both ends, "₹ 500 - 2 Lakh" only the upper one
+    if match['high'] and match['high_scale'] and not match['low_scale'] and low * SCALES[match['high_scale'].lower()] <= high:
+        low *= SCALES[match['high_scale'].lower()]
+
+    # Each end is per its own unit clause; a single clause applies to both
+    low_per = _per_clause(match, 'low_' if match['low_unit'] else '')
+    high_per = _per_clause(match, '' if match['unit'] else 'low_')
+    if low_per[0] != high_per[0]:
+        return None  # "₹ 10/Kg - ₹ 500/Piece" has no single unit price
+    unit, low_quantity = low_per
+    low, high = sorted((low / low_quantity, high / high_per[1]))
+    factor = _unit(match['unit'] or match['low_unit'])[1]
+    currency = CURRENCIES.get(re.sub(r"\s", "", match['currency'] or "₹").lower(), "INR")
+    return low, high, currency, unit, factor
+
+
+def _per_clause(match, name):
+    """(canonical unit, canonical units priced) for one "/unit" clause of PRICE_PATTERN."""
+    unit, factor = _unit(match[name + 'unit'])
+    quantity = factor * (_number(match[name + 'per']) if match[name + 'per'] else 1)
+    if match[name + 'pack']:
+        # "/Packet of 10" prices 10 pieces; "/Bag of 25 Kg" prices 25 kg
+        unit, factor = _unit(match[name + 'pack_unit'] or "piece")
+        quantity *= factor * _number(match[name + 'pack'])
+    return unit, quantity
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(text):
+    """Parses "100 Kg" style quantities into (amount in canonical units, canonical unit)."""
+    match = QUANTITY_PATTERN.search(text or "")
+    if not match:
+        return None
+    unit, factor = _unit(match['unit'])
+    return _number(match['amount']) * factor, unit
+
+
+def extract_moq(text):
+    """Finds a minimum-order clause in a card's text; scrapers store it as moq_text."""
+    match = MOQ_PATTERN.search(text or "")
+    return match.group(1).strip() if match else None
+
+
+def normalize_leads(leads, forex=None):
+    """
+    Fills in the numeric pricing of scraped B2BLead records in place:
+    unit_price / unit_price_max (INR per canonical unit), unit, the quoted currency,
+    and moq / moq_unit when a minimum order was found. "price" keeps the quoted text.
+    """
+    for lead in leads:
+        parsed = parse_price(lead.price) if isinstance(lead.price, str) else None
+        if parsed:
+            low, high, currency, unit, factor = parsed
+            if currency != "INR":
+                if forex is None:
+                    from modules.analytics.forex_engine import ForexEngine
+                    forex = ForexEngine()
+                low, high = forex.convert_to_inr(low, currency), forex.convert_to_inr(high, currency)
+            lead.unit_price = round(low, 4)
+            lead.unit_price_max = round(high, 4)
+            lead.unit = unit
+            lead.currency = currency
+        else:
+            lead.unit_price = lead.unit_price_max = lead.unit = lead.currency = None
+
+        moq = parse_quantity(lead.moq_text) if lead.moq_text else None
+        lead.moq, lead.moq_unit = moq if moq else (None, None)
+    return leads
+
+
+def sort_leads(leads):
+    """Priced leads first, grouped by unit (most common unit first), cheapest first within a unit."""
+    counts = {}
+    for lead in leads:
+        if lead.unit_price is not None:
+            counts[lead.unit] = counts.get(lead.unit, 0) + 1
+    leads.sort(key=lambda lead: (lead.unit_price is None, -counts.get(lead.unit, 0),
+                                 lead.unit or "", lead.unit_price or 0))
+    return leads
+
+
+def storage_name(lead):
+    """
+    Stored product name of a lead. Sellers quote the same titles, so each seller,
+    site and unit gets its own history instead of interleaving into one.
+    """
+    return f"{lead.title} [{lead.seller or 'Unknown'} · {lead.source} · per {lead.unit or 'unit'}]"
+
+
+def storage_record(lead):
+    """A priced lead as a Wholesale ProductListing, so DBManager stores its unit price history."""
+    return ProductListing(storage_name(lead), lead.unit_price, lead.url, lead.image, lead.source,
+                          brand=lead.seller or "Unknown", category=WHOLESALE_CATEGORY, type=lead.type)
@@ -0,0 +1,122 @@
+import time
+import concurrent.futures
+from collections import deque
+from config import Config
+from modules.scraper.engine import ScraperEngine
+from modules.scraper.b2b_engine import B2BEngine
+
+WHOLESALE_INTENTS = ('wholesale', 'bulk')
+FALLBACK_HOST = "duckduckgo"
+
+
+def batch_key(query, intent):
+    """Identical queries (ignoring case/whitespace) with the same mode are fetched once."""
+    mode = 'wholesale' if intent in WHOLESALE_INTENTS else 'single'
+    return " ".join(query.lower().split()), mode
+
+
+class BatchSearchScheduler:
+    """
+    Runs many searches over one shared, bounded thread pool.
+    Every (query, source) fetch is its own task. Tasks wait in a queue per host
+    and are handed to the pool only while that host has fewer than
+    per_host_limit fetches running, so a busy retailer never ties up pool
+    threads that other hosts could use.
+    """
+
+    def __init__(self, max_workers=None, per_host_limit=None):
+        self.max_workers = max_workers or Config.BATCH_MAX_WORKERS
+        self.per_host_limit = per_host_limit or Config.BATCH_PER_HOST_LIMIT
+        self.scraper = ScraperEngine()
+        self._b2b = None
+        self.timed_out = set()
+
+    @property
+    def b2b(self):
+        if self._b2b is None:
+            self._b2b = B2BEngine()
+        return self._b2b
+
+    def run(self, keys, deadline=None):
+        """
+        Yields (key, results) for each unique batch_key as soon as all of its
+        sources have finished. Retail results are sorted by price.
+        Past `deadline` (time.monotonic()), fetches not yet started are dropped and the
+        remaining keys are yielded with what they have so far, listed in self.timed_out.
+        """
+        pending = {}
+        results = {}
+        futures = {}
+        queued = {}     # host -> deque of (key, fn, args) waiting for a slot
+        running = {}    # host -> fetches in the pool
+
+        def dispatch(host):
+            waiting = queued.get(host)
+            while waiting and running.get(host, 0) < self.per_host_limit:
+                key, fn, args = waiting.popleft()
+                running[host] = running.get(host, 0) + 1
+                futures[executor.submit(fn, *args)] = (key, host)
+
+        def submit(key, host, fn, *args):
+            queued.setdefault(host, deque()).append((key, fn, args))
+            pending[key] = pending.get(key, 0) + 1
+            dispatch(host)
+
+        def finish(key):
+            items = results.pop(key)
+            if key[1] == 'single':
+                items.sort(key=lambda x: x.price)
+            return key, items
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for key in dict.fromkeys(keys):
+                query, mode = key
+                results[key] = []
+                if mode == 'wholesale':
+                    for source in self.b2b.DIRECT_SOURCES:
+                        submit(key, source, self.b2b.fetch_source, source, query)
+                else:
+                    category, sources = self.scraper.plan_sources(query, mode)
+                    for source in sources:
+                        if self.scraper.has_source(source):
+                            submit(key, source, self.scraper.fetch_source, source, query, category)
+
+                if not pending.get(key):
+                    yield key, results.pop(key)
+
+            print(f"🗂️ BATCH: {len(results)} unique queries, {sum(pending.values())} fetches queued")
+
+            while futures:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                done, _ = concurrent.futures.wait(futures, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                if not done:
+                    print(f"⏱️ BATCH: deadline reached with {len(results)} queries unfinished")
+                    self.timed_out.update(results)
+                    for key in list(results):
+                        yield finish(key)
+                    return
+
+                for future in done:
+                    key, host = futures.pop(future)
+                    running[host] -= 1
+                    dispatch(host)
+                    try:
+                        results[key].extend(future.result() or [])
+                    except Exception as e:
+                        print(f"⚠️ CRASH in {host} for '{key[0]}': {e}")
+
+                    pending[key] -= 1
+                    if pending[key]:
+                        continue
+
+                    # B2B falls back to the search engine only when every direct source came back empty
+                    if key[1] == 'wholesale' and not results[key] and host != FALLBACK_HOST:
+                        submit(key, FALLBACK_HOST, self.b2b.fallback, key[0])
+                        continue
+
+                    yield finish(key)
+        finally:
+            # Past the deadline (or when the client went away) queued fetches are dropped, not awaited
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,15 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import random
 import time
 import re
-import json
+import threading
 import concurrent.futures
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 import urllib3
 
+from modules.scraper.parsers import PARSERS
+from modules.scraper.pipeline import ParseStage
+
 # Disable SSL Warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -18,9 +20,26 @@ try:
 except ImportError:
     ForexEngine = None
 
+def normalize_tokens(text):
+    """Lowercase alphanumeric tokens with a naive plural strip ("shoes" -> "shoe")."""
+    clean = re.sub(r'[^a-zA-Z0-9\s]', '', text.lower())
+    return [w[:-1] if w.endswith('s') and len(w) > 3 else w for w in clean.split()]
+
+# UserAgent() loads its browser database on every construction (~100ms of CPU),
+# so every engine in the process shares one
+_user_agent = None
+_user_agent_lock = threading.Lock()
+
+def shared_user_agent():
+    global _user_agent
+    with _user_agent_lock:
+        if _user_agent is None:
+            _user_agent = UserAgent()
+        return _user_agent
+
 class ScraperEngine:
     def __init__(self):
-        self.ua = UserAgent()
+        self.ua = shared_user_agent()
         
         # --- 1. ROUTING RULES ---
         self.SOURCE_ROUTING = {
@@ -47,12 +66,30 @@ class ScraperEngine:
             if any(k in q for k in keywords): return cat
         return "general"
 
-    def search_product(self, query, intent="single"):
+    def plan_sources(self, query, intent="single"):
+        """Returns (category, sources) that a query should be routed to."""
         if intent in ['bulk', 'wholesale']:
-            target_sources = self.SOURCE_ROUTING["wholesale"]
-        else:
-            category = self._identify_category(query)
-            target_sources = self.SOURCE_ROUTING.get(category, self.SOURCE_ROUTING["general"])
+            return "wholesale", self.SOURCE_ROUTING["wholesale"]
+        category = self._identify_category(query)
+        return category, self.SOURCE_ROUTING.get(category, self.SOURCE_ROUTING["general"])
+
+    def has_source(self, source):
+        return source in PARSERS and hasattr(self, f"_fetch_{source}")
+
+    def fetch_source(self, source, query, category):
+        """
+        Fetches one source's page on the calling (I/O) thread, then hands the bytes
+        to the parse stage. Unknown sources and failed fetches return no results.
+        """
+        if not self.has_source(source):
+            return []
+        content = getattr(self, f"_fetch_{source}")(query)
+        if not content:
+            return []
+        return ParseStage().parse(source, content, query, category)
+
+    def search_product(self, query, intent="single"):
+        category, target_sources = self.plan_sources(query, intent)
         
         print(f"🚦 Routing '{query}' ({category}) to: {target_sources}")
 
@@ -62,9 +99,8 @@ class ScraperEngine:
         with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
             futures = {}
             for source in target_sources:
-                method_name = f"_get_price_{source}"
-                if hasattr(self, method_name):
-                    futures[executor.submit(getattr(self, method_name), query, category)] = source
+                if self.has_source(source):
+                    futures[executor.submit(self.fetch_source, source, query, category)] = source
 
             for future in concurrent.futures.as_completed(futures):
                 source_name = futures[future]
@@ -79,6 +115,11 @@ class ScraperEngine:
                     print(f"⚠️ CRASH in {source_name}: {e}") # Print crash details
                     source_counts[source_name] = "ERR"
 
+        self._print_report(source_counts, len(results))
+
+        return sorted(results, key=lambda x: x.price)
+
+    def _print_report(self, source_counts, total):
         print("\n" + "="*45)
         print("🕵️‍♀️  SCRAPER INTELLIGENCE REPORT")
         print("-" * 45)
@@ -86,150 +127,45 @@ class ScraperEngine:
             status = "✅" if isinstance(count, int) and count > 0 else "❌"
             print(f"{status} {src.upper():<12} : Found {count} products")
         print("-" * 45)
-        print(f"📦 TOTAL AGGREGATED  : {len(results)} products")
+        print(f"📦 TOTAL AGGREGATED  : {total} products")
         print("="*45 + "\n")
 
-        return sorted(results, key=lambda x: x['price'])
-
     # -------------------------------------------------------------------------
-    # 🇮🇳  SOURCE: FLIPKART (Furniture Grid Fix)
+    # 📡 FETCHERS: raw page bytes only; parsing lives in modules/scraper/parsers.py
     # -------------------------------------------------------------------------
-    def _get_price_flipkart(self, query, category="general"):
+    def _fetch_flipkart(self, query):
         url = f"https://www.flipkart.com/search?q={query.replace(' ', '%20')}&otracker=search"
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9'
         }
-        
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # COMBINED SELECTORS (List + Grid + New)
-            cards = soup.find_all('div', {'class': '_1AtVbE'}) or \
-                    soup.find_all('div', {'class': '_4ddWXP'}) or \
-                    soup.find_all('div', {'class': 'cPHDOP'})
-            
-            products = []
-            for card in cards:
-                # 1. Title
-                title_tag = card.find('a', {'class': 's1Q9rs'}) or \
-                            card.find('div', {'class': '_4rR01T'}) or \
-                            card.find('a', {'class': 'wjcEIp'})
-                
-                # 2. Price
-                price_tag = card.find('div', {'class': '_30jeq3'}) or \
-                            card.find('div', {'class': 'Nx9bqj'})
+            return requests.get(url, headers=headers, timeout=10).content
+        except Exception:
+            return None
 
-                if title_tag and price_tag:
-                    title = title_tag.get_text(strip=True)
-                    price = float(re.sub(r'[^\d.]', '', price_tag.get_text()))
-                    
-                    # 3. Link
-                    link_tag = card.find('a', href=True)
-                    if not link_tag: link_tag = title_tag if title_tag.name == 'a' else None
-                    link = "https://www.flipkart.com" + link_tag['href'] if link_tag else ""
-                    
-                    # 4. Image
-                    img_tag = card.find('img')
-                    img = img_tag['src'] if img_tag else ""
-
-                    products.append({
-                        "title": title, "brand": "Flipkart", "category": category.title(),
-                        "price": price, "currency": "INR",
-                        "url": link, "image": img, "source": "Flipkart", "type": "Retail"
-                    })
-                    if len(products) >= 10: break
-            return products
-        except Exception as e:
-            return []
-
-    # -------------------------------------------------------------------------
-    # 🪑 SOURCE: IKEA (Fixed Crash)
-    # -------------------------------------------------------------------------
-    def _get_price_ikea(self, query, category="furniture"):
+    def _fetch_ikea(self, query):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
             'Accept': '*/*'
         }
         # IKEA uses a specific API-like search URL
         url = f"https://www.ikea.com/in/en/search/?q={query.replace(' ', '%20')}"
-        
         try:
-            response = requests.get(url, headers=headers, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Selector for IKEA Grid
-            cards = soup.find_all('div', {'class': 'plp-fragment-wrapper'})
-            
-            products = []
-            for card in cards[:8]:
-                try:
-                    # JSON Data is often hidden in data attributes
-                    title = card.find('span', {'class': 'header-section__title'}).text.strip()
-                    price_txt = card.find('span', {'class': 'pip-price__integer'}).text.strip()
-                    price = float(re.sub(r'[^\d.]', '', price_txt))
-                    
-                    link = card.find('a')['href']
-                    img = card.find('img')['src']
-
-                    products.append({
-                        "title": title, "brand": "IKEA", "category": "Furniture",
-                        "price": price, "currency": "INR",
-                        "url": link, "image": img, "source": "IKEA", "type": "Retail"
-                    })
-                except: continue
-            return products
-        except Exception as e:
-            # print(f"IKEA Error: {e}")
-            return []
+            return requests.get(url, headers=headers, timeout=15).content
+        except Exception:
+            return None
 
-    # -------------------------------------------------------------------------
-    # 🌎 SOURCE: EBAY (Simplified)
-    # -------------------------------------------------------------------------
-    def _get_price_ebay(self, query, category="general"):
+    def _fetch_ebay(self, query):
         session = requests.Session()
         session.headers.update({'User-Agent': self.ua.random, 'Connection': 'keep-alive'})
         url = f"https://www.ebay.com/sch/i.html?_nkw={query.replace(' ', '+')}"
-        
         try:
-            response = session.get(url, timeout=20, verify=False)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            items = soup.find_all('div', {'class': 's-item__wrapper'})
-            products = []
-            for item in items[1:10]: # Skip first (dummy)
-                try:
-                    title = item.find('div', {'class': 's-item__title'}).text.strip()
-                    if "Shop on eBay" in title: continue
-                    
-                    price_tag = item.find('span', {'class': 's-item__price'})
-                    if not price_tag: continue
-                    
-                    # Robust Price Parsing
-                    price_str = price_tag.text.split(' to ')[0] # Handle ranges
-                    price_val = float(re.sub(r'[^\d.]', '', price_str))
-                    
-                    # Convert USD/EUR if needed, else assume INR approx
-                    if '$' in price_str: price_val *= 86.5
-                    elif 'EUR' in price_str: price_val *= 92.0
-
-                    link = item.find('a')['href']
-                    img = item.find('img')['src']
-
-                    products.append({
-                        "title": title, "brand": "eBay", "category": "General",
-                        "price": round(price_val, 2), "currency": "INR",
-                        "url": link, "image": img, "source": "eBay", "type": "Retail"
-                    })
-                except: continue
-            return products
-        except: return []
+            return session.get(url, timeout=20, verify=False).content
+        except Exception:
+            return None
 
-    # -------------------------------------------------------------------------
-    # 🥦 SOURCE: JIOMART
-    # -------------------------------------------------------------------------
-    def _get_price_jiomart(self, query, category="general"):
+    def _fetch_jiomart(self, query):
         session = requests.Session()
         session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
@@ -237,98 +173,36 @@ class ScraperEngine:
         })
         url = f"https://www.jiomart.com/search/{query.replace(' ', '%20')}"
         try:
-            response = session.get(url, timeout=15)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            cards = soup.find_all('div', class_=re.compile(r'card|plp-card'))
-            products = []
-            for card in cards[:10]:
-                try:
-                    text = card.get_text(strip=True)
-                    if '₹' not in text: continue
-                    price = float(re.search(r'₹\s?([\d,]+)', text).group(1).replace(',', ''))
-                    
-                    title_tag = card.find(class_=re.compile(r'name|title'))
-                    title = title_tag.text.strip() if title_tag else "JioMart Item"
-                    
-                    if not any(w in title.lower() for w in query.lower().split()): continue
-                    
-                    products.append({
-                        "title": title, "brand": "JioMart", "category": "Grocery",
-                        "price": price, "currency": "INR",
-                        "url": "https://www.jiomart.com" + card.find('a')['href'],
-                        "image": card.find('img')['src'], "source": "JioMart", "type": "Retail"
-                    })
-                except: continue
-            return products
-        except: return []
+            return session.get(url, timeout=15).content
+        except Exception:
+            return None
 
-    # -------------------------------------------------------------------------
-    # 👗 SOURCE: MYNTRA
-    # -------------------------------------------------------------------------
-    def _get_price_myntra(self, query, category="fashion"):
-        # Keep existing working Safe JSON Logic
+    def _fetch_myntra(self, query):
         session = requests.Session()
         headers = {'User-Agent': self.ua.random, 'Referer': 'https://www.myntra.com/'}
         url = f"https://www.myntra.com/{query.replace(' ', '-')}"
         try:
-            response = session.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            script = soup.find('script', string=re.compile('window.__myx'))
-            if not script: return []
-            data = json.loads(script.string.split('window.__myx = ')[1].split(';')[0])
-            items = data.get('searchData', {}).get('results', {}).get('products', [])
-            products = []
-            for item in items[:10]:
-                try:
-                    imgs = item.get('images', [])
-                    img_src = imgs[0].get('src') if imgs else ""
-                    products.append({
-                        "title": item.get('productName'), "brand": item.get('brand'), "category": "Fashion",
-                        "price": float(item.get('price') or item.get('mrp') or 0), "currency": "INR",
-                        "url": f"https://www.myntra.com/{item.get('landingPageUrl')}",
-                        "image": img_src, "source": "Myntra", "type": "Retail"
-                    })
-                except: continue
-            return products
-        except: return []
+            return session.get(url, headers=headers, timeout=10).content
+        except Exception:
+            return None
 
-    # -------------------------------------------------------------------------
-    # 🌍 SOURCE: AMAZON
-    # -------------------------------------------------------------------------
-    def _get_price_amazon(self, query, category="general"):
-        # Keep existing working Amazon logic
+    def _fetch_amazon(self, query):
         header_list = [{'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'}]
         url = f"https://www.amazon.in/s?k={query.replace(' ', '+')}"
         for attempt, headers in enumerate(header_list):
             try:
                 time.sleep(1)
                 response = requests.get(url, headers=headers, timeout=10)
-                if "api-services-support@amazon.com" in response.text: continue
-                soup = BeautifulSoup(response.content, 'html.parser')
-                results = soup.find_all('div', {'data-component-type': 's-search-result'})
-                products = []
-                for card in results:
-                    title_tag = card.find('h2')
-                    if not title_tag: continue
-                    price_tag = card.find('span', {'class': 'a-price-whole'})
-                    if not price_tag: continue
-                    products.append({
-                        "title": title_tag.text.strip(), "brand": "Amazon", "category": "Retail",
-                        "price": float(re.sub(r'[^\d.]', '', price_tag.text)), "currency": "INR",
-                        "url": "https://www.amazon.in" + card.find('a', {'class': 'a-link-normal'})['href'],
-                        "image": card.find('img', {'class': 's-image'})['src'], "source": "Amazon", "type": "Retail"
-                    })
-                    if len(products) >= 10: break
-                if products: return products
+                if "api-services-support@amazon.com" in response.text: continue  # captcha page
+                return response.content
             except: continue
-        return []
+        return None
+
     # -------------------------------------------------------------------------
     # 🛠️  HELPER METHODS
     # -------------------------------------------------------------------------
     def _normalize(self, text):
-        clean = re.sub(r'[^a-zA-Z0-9\s]', '', text.lower())
-        return [w[:-1] if w.endswith('s') and len(w) > 3 else w for w in clean.split()]
+        return normalize_tokens(text)
 
     def _get_synonyms(self, word):
         return self.SYNONYMS.get(word, set())
@@ -0,0 +1,229 @@
+"""
+Per-source extractors: raw page bytes -> ProductListing records.
+
+Kept at module level with no network or DB imports, so they can run in the
+parse process pool (modules/scraper/pipeline.py) as well as inline.
+Each parser takes (content, query, category) and never raises.
+"""
+import re
+import json
+from bs4 import BeautifulSoup
+
+from modules.scraper.records import ProductListing
+
+
+# -------------------------------------------------------------------------
+# 🇮🇳  SOURCE: FLIPKART (Furniture Grid Fix)
+# -------------------------------------------------------------------------
+def parse_flipkart(content, query, category="general"):
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # COMBINED SELECTORS (List + Grid + New)
+        cards = soup.find_all('div', {'class': '_1AtVbE'}) or \
+                soup.find_all('div', {'class': '_4ddWXP'}) or \
+                soup.find_all('div', {'class': 'cPHDOP'})
+
+        products = []
+        for card in cards:
+            # 1. Title
+            title_tag = card.find('a', {'class': 's1Q9rs'}) or \
+                        card.find('div', {'class': '_4rR01T'}) or \
+                        card.find('a', {'class': 'wjcEIp'})
+
+            # 2. Price
+            price_tag = card.find('div', {'class': '_30jeq3'}) or \
+                        card.find('div', {'class': 'Nx9bqj'})
+
+            if title_tag and price_tag:
+                title = title_tag.get_text(strip=True)
+                price = float(re.sub(r'[^\d.]', '', price_tag.get_text()))
+
+                # 3. Link
+                link_tag = card.find('a', href=True)
+                if not link_tag: link_tag = title_tag if title_tag.name == 'a' else None
+                link = "https://www.flipkart.com" + link_tag['href'] if link_tag else ""
+
+                # 4. Image
+                img_tag = card.find('img')
+                img = img_tag['src'] if img_tag else ""
+
+                products.append(ProductListing(
+                    title=title, brand="Flipkart", category=category.title(),
+                    price=price, currency="INR",
+                    url=link, image=img, source="Flipkart", type="Retail"
+                ))
+                if len(products) >= 10: break
+        return products
+    except Exception as e:
+        return []
+
+
+# -------------------------------------------------------------------------
+# 🪑 SOURCE: IKEA (Fixed Crash)
+# -------------------------------------------------------------------------
+def parse_ikea(content, query, category="furniture"):
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # Selector for IKEA Grid
+        cards = soup.find_all('div', {'class': 'plp-fragment-wrapper'})
+
+        products = []
+        for card in cards[:8]:
+            try:
+                # JSON Data is often hidden in data attributes
+                title = card.find('span', {'class': 'header-section__title'}).text.strip()
+                price_txt = card.find('span', {'class': 'pip-price__integer'}).text.strip()
+                price = float(re.sub(r'[^\d.]', '', price_txt))
+
+                link = card.find('a')['href']
+                img = card.find('img')['src']
+
+                products.append(ProductListing(
+                    title=title, brand="IKEA", category="Furniture",
+                    price=price, currency="INR",
+                    url=link, image=img, source="IKEA", type="Retail"
+                ))
+            except: continue
+        return products
+    except Exception as e:
+        # print(f"IKEA Error: {e}")
+        return []
+
+
+# -------------------------------------------------------------------------
+# 🌎 SOURCE: EBAY (Simplified)
+# -------------------------------------------------------------------------
+def parse_ebay(content, query, category="general"):
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+
+        items = soup.find_all('div', {'class': 's-item__wrapper'})
+        products = []
+        for item in items[1:10]: # Skip first (dummy)
+            try:
+                title = item.find('div', {'class': 's-item__title'}).text.strip()
+                if "Shop on eBay" in title: continue
+
+                price_tag = item.find('span', {'class': 's-item__price'})
+                if not price_tag: continue
+
+                # Robust Price Parsing
+                price_str = price_tag.text.split(' to ')[0] # Handle ranges
+                price_val = float(re.sub(r'[^\d.]', '', price_str))
+
+                # Convert USD/EUR if needed, else assume INR approx
+                if '$' in price_str: price_val *= 86.5
+                elif 'EUR' in price_str: price_val *= 92.0
+
+                link = item.find('a')['href']
+                img = item.find('img')['src']
+
+                products.append(ProductListing(
+                    title=title, brand="eBay", category="General",
+                    price=round(price_val, 2), currency="INR",
+                    url=link, image=img, source="eBay", type="Retail"
+                ))
+            except: continue
+        return products
+    except: return []
+
+
+# -------------------------------------------------------------------------
+# 🥦 SOURCE: JIOMART
+# -------------------------------------------------------------------------
+def parse_jiomart(content, query, category="general"):
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+
+        cards = soup.find_all('div', class_=re.compile(r'card|plp-card'))
+        products = []
+        for card in cards[:10]:
+            try:
+                text = card.get_text(strip=True)
+                if '₹' not in text: continue
+                price = float(re.search(r'₹\s?([\d,]+)', text).group(1).replace(',', ''))
+
+                title_tag = card.find(class_=re.compile(r'name|title'))
+                title = title_tag.text.strip() if title_tag else "JioMart Item"
+
+                if not any(w in title.lower() for w in query.lower().split()): continue
+
+                products.append(ProductListing(
+                    title=title, brand="JioMart", category="Grocery",
+                    price=price, currency="INR",
+                    url="https://www.jiomart.com" + card.find('a')['href'],
+                    image=card.find('img')['src'], source="JioMart", type="Retail"
+                ))
+            except: continue
+        return products
+    except: return []
+
+
+# -------------------------------------------------------------------------
+# 👗 SOURCE: MYNTRA
+# -------------------------------------------------------------------------
+def parse_myntra(content, query, category="fashion"):
+    # Keep existing working Safe JSON Logic
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+        script = soup.find('script', string=re.compile('window.__myx'))
+        if not script: return []
+        data = json.loads(script.string.split('window.__myx = ')[1].split(';')[0])
+        items = data.get('searchData', {}).get('results', {}).get('products', [])
+        products = []
+        for item in items[:10]:
+            try:
+                imgs = item.get('images', [])
+                img_src = imgs[0].get('src') if imgs else ""
+                products.append(ProductListing(
+                    title=item.get('productName'), brand=item.get('brand'), category="Fashion",
+                    price=float(item.get('price') or item.get('mrp') or 0), currency="INR",
+                    url=f"https://www.myntra.com/{item.get('landingPageUrl')}",
+                    image=img_src, source="Myntra", type="Retail"
+                ))
+            except: continue
+        return products
+    except: return []
+
+
+# -------------------------------------------------------------------------
+# 🌍 SOURCE: AMAZON
+# -------------------------------------------------------------------------
+def parse_amazon(content, query, category="general"):
+    # Keep existing working Amazon logic
+    try:
+        soup = BeautifulSoup(content, 'html.parser')
+        results = soup.find_all('div', {'data-component-type': 's-search-result'})
+        products = []
+        for card in results:
+            title_tag = card.find('h2')
+            if not title_tag: continue
+            price_tag = card.find('span', {'class': 'a-price-whole'})
+            if not price_tag: continue
+            products.append(ProductListing(
+                title=title_tag.text.strip(), brand="Amazon", category="Retail",
+                price=float(re.sub(r'[^\d.]', '', price_tag.text)), currency="INR",
+                url="https://www.amazon.in" + card.find('a', {'class': 'a-link-normal'})['href'],
+                image=card.find('img', {'class': 's-image'})['src'], source="Amazon", type="Retail"
+            ))
+            if len(products) >= 10: break
+        return products
+    except: return []
+
+
+PARSERS = {
+    "flipkart": parse_flipkart,
+    "ikea": parse_ikea,
+    "ebay": parse_ebay,
+    "jiomart": parse_jiomart,
+    "myntra": parse_myntra,
+    "amazon": parse_amazon,
+}
+
+
+def parse_page(source, content, query, category):
+    """Runs the extractor for `source`; the unit of work sent to parse workers."""
+    parser = PARSERS.get(source)
+    return parser(content, query, category) if parser else []
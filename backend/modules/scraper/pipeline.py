@@ -0,0 +1,106 @@
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+from modules.scraper.parsers import parse_page
+
+
+def _ready(_):
+    return True
+
+
+def _context():
+    # Workers fork from a single-threaded forkserver, never from this (threaded) process
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(['modules.scraper.parsers'])
+    return context
+
+
+class ParseStage:
+    """
+    CPU half of the scraper pipeline.
+    Fetch threads (ScraperEngine.fetch_source, BatchSearchScheduler) do the network
+    I/O and hand raw pages to a process pool that runs the per-source extractors,
+    so BeautifulSoup parsing uses every core instead of contending for the GIL.
+    A semaphore bounds the pages in flight: when parsers fall behind, fetchers
+    block instead of piling up pages in memory. One stage per process, so the
+    worker count is per gunicorn worker (Config.SCRAPER_PARSE_WORKERS).
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(ParseStage, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self.workers = Config.SCRAPER_PARSE_WORKERS
+        self._slots = threading.BoundedSemaphore(max(Config.SCRAPER_PARSE_QUEUE, 1))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts every parser process now instead of on the first searches, so the
+        forkserver and the preloaded parsers are paid for at boot. Workers come
+        from the forkserver, so this is safe after background threads exist.
+        """
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                # One task per worker: the executor spawns a process for each one that finds no idle worker
+                list(pool.map(_ready, range(self.workers)))
+                print(f"🧩 Parse stage: {self.workers} worker processes")
+            except Exception as e:
+                print(f"⚠️ Parse stage unavailable, parsing inline: {e}")
+                self._discard(pool)
+        return self
+
+    def _get_pool(self):
+        if self.workers <= 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=_context())
+            return self._pool
+
+    def _discard(self, pool):
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def parse(self, source, content, query, category):
+        """Parses one fetched page into records; blocks while the stage is full."""
+        pool = self._get_pool()
+        if pool is None:
+            return parse_page(source, content, query, category)
+
+        with self._slots:
+            try:
+                return pool.submit(parse_page, source, content, query, category).result()
+            except BrokenProcessPool as e:
+                # A worker died (OOM, killed): rebuild the pool next time, parse this page here
+                print(f"⚠️ Parse worker crashed ({e}). Restarting pool.")
+                self._discard(pool)
+            except RuntimeError:
+                pass  # pool shut down under us (interpreter exit)
+        return parse_page(source, content, query, category)
+
+    def close(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
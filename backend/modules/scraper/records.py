@@ -0,0 +1,112 @@
+import sys
+
+
+def _intern(value):
+    # Sources, brands and categories repeat across thousands of listings; share one copy
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class ProductListing:
+    """
+    One retail offer as scraped. Slotted instead of a dict: scrapers, DBManager,
+    the write-behind buffer and the indexes all read attributes, and the record
+    only becomes a dict at the response boundary (to_dict / api.encoding).
+    """
+    __slots__ = ('title', 'brand', 'category', 'price', 'currency', 'url', 'image',
+                 'source', 'type', 'scraped_at', 'analysis')
+
+    FIELDS = ('title', 'brand', 'category', 'price', 'currency', 'url', 'image', 'source', 'type')
+
+    def __init__(self, title, price, url, image, source, brand="Unknown", category="General",
+                 currency="INR", type="Retail", scraped_at=None, analysis=None):
+        self.title = title
+        self.brand = _intern(brand)
+        self.category = _intern(category)
+        self.price = price
+        self.currency = _intern(currency)
+        self.url = url
+        self.image = image
+        self.source = _intern(source)
+        self.type = _intern(type)
+        self.scraped_at = scraped_at
+        self.analysis = analysis
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: value for key, value in data.items() if key in cls.__slots__})
+
+    def snapshot(self, scraped_at):
+        """Copy for persistence: timestamped, without the response-only analysis."""
+        return ProductListing(self.title, self.price, self.url, self.image, self.source, self.brand,
+                              self.category, self.currency, self.type, scraped_at)
+
+    def __reduce__(self):
+        # Unpickling (parse workers -> parent) rebuilds through __init__, so strings are interned again
+        return (type(self), (self.title, self.price, self.url, self.image, self.source, self.brand, self.category,
+                             self.currency, self.type, self.scraped_at, self.analysis))
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        if self.scraped_at is not None:
+            data['scraped_at'] = self.scraped_at
+        if self.analysis is not None:
+            data['analysis'] = self.analysis
+        return data
+
+    def __repr__(self):
+        return f"ProductListing({self.title!r}, {self.price!r}, source={self.source!r})"
+
+
+class B2BLead:
+    """
+    One wholesale supplier lead. `price` keeps the quoted text ("₹400/kg");
+    the numeric fields are filled in by b2b_pricing.normalize_leads.
+    """
+    __slots__ = ('title', 'price', 'seller', 'address', 'contact', 'url', 'image', 'source', 'type',
+                 'moq_text', 'unit_price', 'unit_price_max', 'unit', 'currency', 'moq', 'moq_unit', 'analysis')
+
+    FIELDS = ('title', 'price', 'seller', 'address', 'contact', 'url', 'image', 'source', 'type',
+              'moq_text', 'unit_price', 'unit_price_max', 'unit', 'currency', 'moq', 'moq_unit')
+
+    def __init__(self, title, price, url, image, source, seller="Verified Supplier", address="India",
+                 contact=None, type="B2B", moq_text=None):
+        self.title = title
+        self.price = price
+        self.seller = seller
+        self.address = _intern(address)
+        self.contact = _intern(contact)
+        self.url = url
+        self.image = _intern(image)    # B2B sources use one logo per site
+        self.source = _intern(source)
+        self.type = _intern(type)
+        self.moq_text = moq_text
+        self.unit_price = self.unit_price_max = None
+        self.unit = self.currency = None
+        self.moq = self.moq_unit = None
+        self.analysis = None
+
+    @classmethod
+    def from_dict(cls, data):
+        lead = cls(data['title'], data['price'], data.get('url'), data.get('image'), data['source'],
+                   data.get('seller', "Verified Supplier"), data.get('address', "India"), data.get('contact'),
+                   data.get('type', "B2B"), data.get('moq_text'))
+        for field in ('unit_price', 'unit_price_max', 'moq', 'analysis'):
+            if field in data:
+                setattr(lead, field, data[field])
+        for field in ('unit', 'currency', 'moq_unit'):
+            if field in data:
+                setattr(lead, field, _intern(data[field]))
+        return lead
+
+    def __reduce__(self):
+        # Rebuilt through from_dict on unpickling, so repeated strings are interned again
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        if self.analysis is not None:
+            data['analysis'] = self.analysis
+        return data
+
+    def __repr__(self):
+        return f"B2BLead({self.title!r}, {self.price!r}, source={self.source!r})"
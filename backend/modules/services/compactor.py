@@ -0,0 +1,102 @@
+"""
+Price history compaction.
+
+Folds raw `prices` rows older than N days into daily open/high/low/close rows
+in `price_daily` (see migrations/001_price_daily.sql) and deletes the raw rows.
+Each batch is folded by the compact_prices function (migrations/004_compact_prices.sql),
+so the rollup and the delete commit together. DBManager merges both tiers when
+reading history.
+
+Run from the backend folder, e.g. nightly from cron:
+    python -m modules.services.compactor --days 30
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from config import Config
+from modules.services.supabase_client import supabase
+
+PAGE_SIZE = 1000
+
+
+def rollup_rows(rows):
+    """
+    Aggregates raw price rows into {(product_id, site_name, day): ohlc}.
+    Rows must be in ascending scraped_at order so open/close come out right.
+    """
+    rollups = {}
+    for row in rows:
+        key = (row['product_id'], row['site_name'], row['scraped_at'][:10])
+        price = float(row['price_inr'])
+        agg = rollups.get(key)
+        if agg is None:
+            rollups[key] = {"open": price, "high": price, "low": price, "close": price, "samples": 1}
+        else:
+            agg["high"] = max(agg["high"], price)
+            agg["low"] = min(agg["low"], price)
+            agg["close"] = price
+            agg["samples"] += 1
+    return rollups
+
+
+class PriceCompactor:
+    def __init__(self, days=None, page_size=PAGE_SIZE):
+        self.supabase = supabase
+        self.days = days if days is not None else Config.PRICE_COMPACT_AFTER_DAYS
+        self.page_size = page_size
+
+    def cutoff(self):
+        """Midnight UTC `days` ago; only whole days are rolled up."""
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=self.days)
+
+    def run(self, dry_run=False):
+        cutoff = self.cutoff().isoformat()
+        print(f"🗜️ Compacting prices older than {cutoff}...")
+        if dry_run:
+            compacted, days_written = self._preview(cutoff)
+        else:
+            compacted, days_written = 0, 0
+            while True:
+                # Deleted rows drop out of the next batch, so this stops when nothing is older than cutoff
+                result = self.supabase.rpc('compact_prices', {'cutoff': cutoff, 'batch_size': self.page_size})\
+                    .execute().data or []
+                batch = result[0] if result else {'compacted': 0, 'days': 0}
+                compacted += batch['compacted']
+                days_written += batch['days']
+                if batch['compacted'] < self.page_size:
+                    break
+
+        verb = "Would compact" if dry_run else "Compacted"
+        print(f"✅ {verb} {compacted} raw prices into {days_written} daily rows")
+        return compacted
+
+    def _preview(self, cutoff):
+        """Counts what a real run would fold, without writing anything."""
+        compacted, days, offset = 0, set(), 0
+        while True:
+            page = self.supabase.table('prices')\
+                .select('id, product_id, site_name, price_inr, scraped_at')\
+                .lt('scraped_at', cutoff)\
+                .order('scraped_at')\
+                .order('id')\
+                .range(offset, offset + self.page_size - 1)\
+                .execute().data or []
+            compacted += len(page)
+            days.update(rollup_rows(page))
+            if len(page) < self.page_size:
+                return compacted, len(days)
+            offset += len(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll old raw prices up into daily OHLC rows")
+    parser.add_argument('--days', type=int, default=Config.PRICE_COMPACT_AFTER_DAYS,
+                        help="keep raw rows for this many days")
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    PriceCompactor(days=args.days).run(dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
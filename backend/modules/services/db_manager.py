@@ -1,70 +1,301 @@
+from datetime import datetime, timezone
 from modules.services.supabase_client import supabase
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY
+
+# PostgREST encodes `in` filters in the URL, so large lookups are chunked
+IN_FILTER_CHUNK = 100
+# PostgREST cuts every response at max-rows (1000 by default), so long reads are paged
+PAGE_SIZE = 1000
 
 class DBManager:
+    # Callbacks fired with every batch of observed prices (deals index, alerts)
+    price_listeners = []
+
     def __init__(self):
         self.supabase = supabase
 
+    @classmethod
+    def add_price_listener(cls, callback):
+        if callback not in DBManager.price_listeners:
+            DBManager.price_listeners.append(callback)
+
     def save_product(self, data):
         """
-        Saves product and price. 
+        Saves product and price.
         Dynamically handles categories and brands instead of hardcoding 'Electronics'.
         """
         if not data:
             return None
+        return self.save_products([data])[0]
+
+    def save_products(self, items):
+        """
+        Bulk version of save_product. Items are ProductListing records.
+        One lookup for existing products, one insert for new products and one
+        insert for all prices. Returns product ids aligned with `items`.
+        Products are matched by name within their kind: a Wholesale record never
+        lands on a retail product of the same name, nor the other way round.
+        """
+        if not items:
+            return []
 
         try:
-            # Check if Product Exists
-            existing = self.supabase.table('products').select("id").eq("name", data['title']).execute()
-            
-            product_id = None
-
-            if existing.data:
-                product_id = existing.data[0]['id']
-            else:
-                # --- NEW DYNAMIC MAPPING ---
-                # We extract the brand from the title if it's 'Unknown'
-                brand_name = data.get('brand', 'Unknown')
-                if brand_name == 'Unknown':
-                    brand_name = data['title'].split(' ')[0] # Simple heuristic: first word is often brand
-
-                new_product = {
-                    "name": data['title'],
-                    "brand": brand_name,
-                    "category": data.get('category', 'General'), # Use scraped category or 'General'
-                    "image_url": data['image']
-                }
-                res = self.supabase.table('products').insert(new_product).execute()
-                product_id = res.data[0]['id']
-
-            # Insert Price History entry
-            new_price = {
-                "product_id": product_id,
-                "price_inr": data['price'],
-                "site_name": data['source'],
-                "product_link": data['url']
-            }
-            
-            self.supabase.table('prices').insert(new_price).execute()
-            return product_id
+            # Check which products already exist
+            keys = [_product_key(item.title, item.category) for item in items]
+            product_ids = self._select_product_ids(list(dict.fromkeys(item.title for item in items)))
+            latest = self._latest_prices(list(dict.fromkeys(product_ids[key] for key in keys if key in product_ids)))
+
+            # --- NEW DYNAMIC MAPPING ---
+            new_products = {}
+            for key, item in zip(keys, items):
+                if key not in product_ids and key not in new_products:
+                    new_products[key] = self._product_row(item)
+
+            if new_products:
+                res = self.supabase.table('products').insert(list(new_products.values())).execute()
+                for row in res.data:
+                    product_ids[_product_key(row['name'], row.get('category'))] = row['id']
+
+            # Insert Price History entries, only where the price actually moved
+            new_prices = []
+            for key, item in zip(keys, items):
+                product_id = product_ids[key]
+                key = (product_id, item.source)
+                price = round(float(item.price), 2)
+                if latest.get(key) == price:
+                    continue
+                latest[key] = price
+                new_prices.append(self._price_row(item, product_id))
+
+            if new_prices:
+                self.supabase.table('prices').insert(new_prices).execute()
+
+            saved_ids = [product_ids[key] for key in keys]
+            self._notify_price_listeners(items, saved_ids)
+            return saved_ids
 
         except Exception as e:
             print(f"🔥 Database Error: {e}")
-            return None
+            return [None] * len(items)
+
+    def _notify_price_listeners(self, items, product_ids):
+        """Every observed price is reported, including unchanged ones that weren't stored."""
+        if not DBManager.price_listeners:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        observations = [{
+            "product_id": product_id,
+            "title": item.title,
+            "brand": item.brand,
+            "category": item.category,
+            "image": item.image or '',
+            "price": float(item.price),
+            "source": item.source,
+            "url": item.url,
+            "scraped_at": item.scraped_at or now,
+        } for item, product_id in zip(items, product_ids) if product_id is not None]
+
+        for callback in DBManager.price_listeners:
+            try:
+                callback(observations)
+            except Exception as e:
+                print(f"⚠️ Price listener error: {e}")
+
+    def _product_row(self, data):
+        # We extract the brand from the title if it's 'Unknown'
+        brand_name = data.brand
+        if brand_name == 'Unknown':
+            brand_name = data.title.split(' ')[0] # Simple heuristic: first word is often brand
+
+        return {
+            "name": data.title,
+            "brand": brand_name,
+            "category": data.category, # Scraped category, 'General' by default
+            "image_url": data.image
+        }
+
+    def _price_row(self, data, product_id):
+        row = {
+            "product_id": product_id,
+            "price_inr": data.price,
+            "site_name": data.source,
+            "product_link": data.url
+        }
+        # Buffered writes carry the time they were scraped, not the time they were flushed
+        if data.scraped_at:
+            row["scraped_at"] = data.scraped_at
+        return row
+
+    def _latest_prices(self, product_ids):
+        """
+        Last recorded price per (product_id, site_name), used for change-only recording.
+        Reads price_latest (see migrations/003_price_latest.sql), which holds one row
+        per product and site, so the cost doesn't grow with the length of the history.
+        """
+        latest = {}
+        try:
+            for i in range(0, len(product_ids), IN_FILTER_CHUNK):
+                chunk = product_ids[i:i + IN_FILTER_CHUNK]
+                rows = _fetch_all(lambda: self.supabase.table('price_latest')
+                                  .select('product_id, site_name, price_inr')
+                                  .in_('product_id', chunk)
+                                  .order('product_id')
+                                  .order('site_name'))
+                for row in rows:
+                    latest[(row['product_id'], row['site_name'])] = round(float(row['price_inr']), 2)
+        except Exception as e:
+            # Without the table every price is recorded, as before change-only recording
+            print(f"DB Latest Error: {e}")
+        return latest
+
+    def find_product_ids(self, names, wholesale=False):
+        """Read-only lookup of {name: product_id} for retail (or Wholesale) products already stored."""
+        try:
+            found = self._select_product_ids(list(dict.fromkeys(names)))
+        except Exception as e:
+            print(f"🔥 Database Error: {e}")
+            return {}
+        return {name: product_id for (name, is_wholesale), product_id in found.items() if is_wholesale == wholesale}
+
+    def has_product(self, product_id):
+        """True if a product with this id is stored."""
+        try:
+            res = self.supabase.table('products').select("id").eq("id", product_id).limit(1).execute()
+            return bool(res.data)
+        except Exception as e:
+            print(f"🔥 Database Error: {e}")
+            return False
+
+    def _select_product_ids(self, names):
+        """{(name, is_wholesale): product_id} for stored products with these names."""
+        found = {}
+        for i in range(0, len(names), IN_FILTER_CHUNK):
+            chunk = names[i:i + IN_FILTER_CHUNK]
+            res = self.supabase.table('products').select("id, name, category").in_("name", chunk).execute()
+            for row in res.data or []:
+                found.setdefault(_product_key(row['name'], row.get('category')), row['id'])
+        return found
+
+    def scan(self, table, columns, order_by='id', page_size=1000):
+        """
+        Yields every row of a table, paging through it in `order_by` order.
+        `order_by` may list several columns ("product_id, site_name") for tables without an id.
+        """
+        offset = 0
+        while True:
+            query = self.supabase.table(table).select(columns)
+            for column in order_by.split(','):
+                query = query.order(column.strip())
+            rows = query.range(offset, offset + page_size - 1).execute().data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def latest_since(self, since, columns):
+        """price_latest rows whose price changed at or after `since` (ISO timestamp), oldest first."""
+        return _fetch_all(lambda: self.supabase.table('price_latest')
+                          .select(columns)
+                          .gte('scraped_at', since)
+                          .order('scraped_at')
+                          .order('product_id')
+                          .order('site_name'))
+
+    def get_products(self, product_ids, columns='id, name, brand, category, image_url'):
+        """Product rows for these ids, in no particular order."""
+        rows = []
+        for i in range(0, len(product_ids), IN_FILTER_CHUNK):
+            chunk = product_ids[i:i + IN_FILTER_CHUNK]
+            rows.extend(self.supabase.table('products').select(columns).in_('id', chunk).execute().data or [])
+        return rows
 
     def get_price_history(self, product_id):
         """Fetches price AND timestamp for the chart using the correct column name"""
         try:
             # Changed 'created_at' to 'scraped_at' to match your schema
-            response = self.supabase.table('prices')\
-                .select('price_inr, scraped_at')\
-                .eq('product_id', product_id)\
-                .order('scraped_at', desc=True)\
-                .execute()
-            
-            if response.data:
-                return response.data
+            history = _fetch_all(lambda: self.supabase.table('prices')
+                                 .select('price_inr, scraped_at')
+                                 .eq('product_id', product_id)
+                                 .order('scraped_at', desc=True)
+                                 .order('id', desc=True))
+            rollups = self._rollup_histories([product_id]).get(product_id)
+            return _merge_tiers(history, rollups) if rollups else history
+
+        except Exception as e:
+            print(f"DB History Error: {e}")
             return []
-            
+
+    def get_price_histories(self, product_ids):
+        """Bulk version of get_price_history. Returns {product_id: history}, newest first."""
+        ids = list(dict.fromkeys(pid for pid in product_ids if pid))
+        histories = {pid: [] for pid in ids}
+        try:
+            for i in range(0, len(ids), IN_FILTER_CHUNK):
+                chunk = ids[i:i + IN_FILTER_CHUNK]
+                # One product with a long history would otherwise use up the page for the whole chunk
+                rows = _fetch_all(lambda: self.supabase.table('prices')
+                                  .select('product_id, price_inr, scraped_at')
+                                  .in_('product_id', chunk)
+                                  .order('scraped_at', desc=True)
+                                  .order('id', desc=True))
+                for row in rows:
+                    histories[row.pop('product_id')].append(row)
+
+            for pid, rollups in self._rollup_histories(ids).items():
+                histories[pid] = _merge_tiers(histories[pid], rollups)
         except Exception as e:
             print(f"DB History Error: {e}")
-            return []
\ No newline at end of file
+        return histories
+
+    def _rollup_histories(self, product_ids):
+        """
+        Daily open/high/low/close rows written by the compactor, shaped like raw
+        price rows (the close is the day's price) so callers can't tell the tiers apart.
+        """
+        rollups = {}
+        for i in range(0, len(product_ids), IN_FILTER_CHUNK):
+            columns = 'product_id, day, open, high, low, close, samples'
+            for row in self._select_rollups(product_ids[i:i + IN_FILTER_CHUNK], columns):
+                rollups.setdefault(row['product_id'], []).append({
+                    "price_inr": row['close'],
+                    "scraped_at": f"{row['day']}T23:59:59+00:00",
+                    "open": row['open'], "high": row['high'], "low": row['low'],
+                    "samples": row['samples'],
+                })
+        return rollups
+
+    def _select_rollups(self, product_ids, columns):
+        # The rollup tier is optional: without the price_daily table, history is raw-only
+        try:
+            return _fetch_all(lambda: self.supabase.table('price_daily')
+                              .select(columns)
+                              .in_('product_id', product_ids)
+                              .order('day', desc=True)
+                              .order('product_id')
+                              .order('site_name'))
+        except Exception as e:
+            print(f"DB Rollup Error: {e}")
+            return []
+
+
+def _product_key(name, category):
+    return name, category == WHOLESALE_CATEGORY
+
+
+def _fetch_all(build, page_size=PAGE_SIZE):
+    """
+    Runs the query `build()` returns one .range() page at a time until a short page.
+    The query needs a total order so pages don't overlap; builders are single-use.
+    """
+    rows, offset = [], 0
+    while True:
+        page = build().range(offset, offset + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+def _merge_tiers(raw, rollups):
+    """Raw rows and daily rollups as one newest-first history."""
+    return sorted(raw + rollups, key=lambda h: h['scraped_at'], reverse=True)
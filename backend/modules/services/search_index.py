@@ -0,0 +1,191 @@
+import math
+import heapq
+import threading
+from datetime import datetime, timezone
+
+from config import Config
+from modules.services.db_manager import DBManager
+from modules.scraper.engine import normalize_tokens
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY
+from modules.scraper.records import ProductListing
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class IndexedProduct:
+    __slots__ = ('product_id', 'title', 'brand', 'category', 'image', 'length', 'offers')
+
+    def __init__(self, product_id, title, brand, category, image, length):
+        self.product_id = product_id
+        self.title = title
+        self.brand = brand
+        self.category = category
+        self.image = image
+        self.length = length
+        self.offers = {}    # source -> (price, url, scraped_at)
+
+    def observe(self, price, source, url, scraped_at):
+        current = self.offers.get(source)
+        if current is None or scraped_at >= current[2]:
+            # Rollup rows carry no link; keep the last one seen for this site
+            self.offers[source] = (price, url or (current[1] if current else None), scraped_at)
+
+
+class LocalSearchIndex:
+    """
+    Inverted index over stored product titles, brands and categories.
+    Uses the scraper's own tokenization and BM25 ranking, and is kept current
+    through the DBManager price-listener hook. One index per process.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(LocalSearchIndex, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self._lock = threading.RLock()
+        self._docs = {}         # product_id -> IndexedProduct
+        self._postings = {}     # token -> {product_id: term frequency}
+        self._total_length = 0
+        self.ready = False
+
+        DBManager.add_price_listener(self.record_prices)
+        threading.Thread(target=self._warm, name="search-index-warm", daemon=True).start()
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add_product(self, product_id, title, brand=None, category=None, image=None):
+        with self._lock:
+            doc = self._docs.get(product_id)
+            if doc is not None:
+                return doc
+
+            tokens = normalize_tokens(" ".join(filter(None, (title, brand, category))))
+            doc = self._docs[product_id] = IndexedProduct(product_id, title, brand, category, image, len(tokens))
+            self._total_length += len(tokens)
+            for token in tokens:
+                postings = self._postings.setdefault(token, {})
+                postings[product_id] = postings.get(product_id, 0) + 1
+            return doc
+
+    def record_prices(self, observations):
+        """Price listener: indexes new products and refreshes offers of known ones."""
+        with self._lock:
+            for obs in observations:
+                if obs.get('category') == WHOLESALE_CATEGORY:
+                    continue  # B2B leads are stored per unit, not as retail listings
+                doc = self.add_product(obs['product_id'], obs['title'], obs.get('brand'),
+                                       obs.get('category'), obs.get('image'))
+                doc.observe(obs['price'], obs['source'], obs['url'], obs['scraped_at'])
+
+    def _warm(self):
+        try:
+            db = DBManager()
+            for row in db.scan('products', 'id, name, brand, category, image_url'):
+                if row.get('category') == WHOLESALE_CATEGORY:
+                    continue
+                self.add_product(row['id'], row['name'], row.get('brand'), row.get('category'), row.get('image_url'))
+
+            # price_latest has the newest price and link per product and site in one row
+            try:
+                rows = db.scan('price_latest', 'product_id, site_name, price_inr, product_link, scraped_at',
+                               order_by='product_id, site_name')
+                self._observe_rows(rows)
+            except Exception as e:
+                print(f"⚠️ Local search index: no price_latest ({e}), scanning price history")
+                self._warm_from_history(db)
+            print(f"🔎 Local search index ready: {len(self._docs)} products, {len(self._postings)} terms")
+        except Exception as e:
+            print(f"⚠️ Local search index warm-up failed: {e}")
+        finally:
+            self.ready = True
+
+    def _warm_from_history(self, db):
+        # Products whose raw prices were all compacted still have a daily close
+        try:
+            rows = db.scan('price_daily', 'product_id, site_name, day, close', order_by='day')
+            self._observe_rows({"product_id": row['product_id'], "site_name": row['site_name'],
+                                "price_inr": row['close'], "product_link": None,
+                                "scraped_at": f"{row['day']}T23:59:59+00:00"} for row in rows)
+        except Exception as e:
+            print(f"⚠️ Local search index: skipping rollup tier ({e})")
+        self._observe_rows(db.scan('prices', 'product_id, site_name, price_inr, product_link, scraped_at',
+                                   order_by='scraped_at'))
+
+    def _observe_rows(self, rows):
+        for row in rows:
+            with self._lock:
+                doc = self._docs.get(row['product_id'])
+                if doc is not None:
+                    doc.observe(float(row['price_inr']), row['site_name'], row['product_link'], row['scraped_at'])
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def search(self, query, max_products=None):
+        """
+        BM25 search over stored products. Every query term must match.
+        Returns (hits, stale): hits are (product_id, listing) pairs, listings
+        shaped like scraper results (one per product and site, cheapest first);
+        stale is True when any of them is older than LOCAL_SEARCH_TTL.
+        """
+        terms = list(dict.fromkeys(normalize_tokens(query)))
+        if not terms:
+            return [], False
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return [], False
+
+            # Intersect from the rarest term, then rank the survivors
+            postings.sort(key=len)
+            candidates = [pid for pid in postings[0]
+                          if all(pid in plist for plist in postings[1:]) and self._docs[pid].offers]
+            if not candidates:
+                return [], False
+
+            n_docs = len(self._docs)
+            avg_length = self._total_length / n_docs
+            idfs = [math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5)) for plist in postings]
+
+            def bm25(pid):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._docs[pid].length / avg_length)
+                return sum(idf * plist[pid] * (BM25_K1 + 1) / (plist[pid] + norm)
+                           for idf, plist in zip(idfs, postings))
+
+            top = heapq.nlargest(max_products or Config.LOCAL_SEARCH_MAX_PRODUCTS, candidates, key=bm25)
+            hits = []
+            oldest = None
+            for pid in top:
+                doc = self._docs[pid]
+                for source, (price, url, scraped_at) in doc.offers.items():
+                    hits.append((pid, ProductListing(doc.title, price, url, doc.image, source,
+                                                     brand=doc.brand or "Unknown", category=doc.category or "General")))
+                    oldest = scraped_at if oldest is None or scraped_at < oldest else oldest
+
+        hits.sort(key=lambda hit: hit[1].price)
+        return hits, _is_stale(oldest)
+
+
+def _is_stale(scraped_at):
+    if not scraped_at:
+        return True
+    try:
+        seen = datetime.fromisoformat(scraped_at[:19]).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return True
+    return (datetime.now(timezone.utc) - seen).total_seconds() > Config.LOCAL_SEARCH_TTL
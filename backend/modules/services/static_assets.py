@@ -0,0 +1,118 @@
+import os
+import re
+import gzip
+import hashlib
+import mimetypes
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Vite emits content-hashed bundles like `assets/index-B7f3aQ1x.js`.
+# Those never change under the same name, so browsers may cache them forever.
+HASHED_ASSET = re.compile(r'(^|/)assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$')
+
+# Already-compressed formats gain nothing from gzip/brotli.
+INCOMPRESSIBLE = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico',
+                  '.woff', '.woff2', '.mp4', '.webm', '.zip', '.gz', '.br'}
+MIN_COMPRESS_SIZE = 1024
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+class StaticAsset:
+    __slots__ = ('body', 'gzip', 'br', 'etag', 'mimetype', 'cache_control')
+
+    def __init__(self, body, mimetype, cache_control):
+        self.body = body
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.etag = hashlib.md5(body).hexdigest()
+        self.gzip = None
+        self.br = None
+
+    def compress(self):
+        gz = gzip.compress(self.body, compresslevel=9, mtime=0)
+        if len(gz) < len(self.body):
+            self.gzip = gz
+        if brotli is not None:
+            br = brotli.compress(self.body, quality=11)
+            if len(br) < len(self.body):
+                self.br = br
+
+
+class StaticManifest:
+    """
+    In-memory index of the React build.
+    Built once at startup so requests never stat the filesystem.
+    """
+
+    def __init__(self, root, index_file='index.html'):
+        self.root = root
+        self.index_file = index_file
+        self.assets = {}
+        self.build()
+
+    def build(self):
+        self.assets = {}
+        if not os.path.isdir(self.root):
+            print(f"⚠️ Static folder '{self.root}' not found. Frontend will not be served.")
+            return
+
+        total_raw, total_gz = 0, 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    body = f.read()
+
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                cache = IMMUTABLE_CACHE if HASHED_ASSET.search(rel_path) else REVALIDATE_CACHE
+                asset = StaticAsset(body, mimetype, cache)
+
+                ext = os.path.splitext(filename)[1].lower()
+                if ext not in INCOMPRESSIBLE and len(body) >= MIN_COMPRESS_SIZE:
+                    asset.compress()
+
+                self.assets[rel_path] = asset
+                total_raw += len(body)
+                total_gz += len(asset.gzip or body)
+
+        print(f"📦 Static manifest: {len(self.assets)} files, "
+              f"{total_raw // 1024} KB raw / {total_gz // 1024} KB gzip")
+
+    def lookup(self, path):
+        """Returns the asset for `path`, falling back to index.html for client-side routes."""
+        return self.assets.get(path) or self.assets.get(self.index_file)
+
+    def respond(self, path):
+        asset = self.lookup(path)
+        if asset is None:
+            return Response("Frontend build not found.", status=404, mimetype='text/plain')
+
+        body, encoding = asset.body, None
+        accepted = request.accept_encodings
+        if asset.br is not None and accepted['br']:
+            body, encoding = asset.br, 'br'
+        elif asset.gzip is not None and accepted['gzip']:
+            body, encoding = asset.gzip, 'gzip'
+
+        # Each encoding is a different representation, so each gets its own strong ETag
+        etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        if etag in request.if_none_match:
+            headers.pop('Content-Encoding', None)
+            return Response(status=304, headers=headers)
+
+        return Response(body, mimetype=asset.mimetype, headers=headers)
@@ -0,0 +1,476 @@
+import os
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from config import Config
+from modules.services.db_manager import DBManager
+from modules.scraper.records import ProductListing
+
+# Landed writes stay readable for a while, so a history read that raced the
+# flush still sees them. Duplicates with the DB copy are removed in merge_history.
+LANDED_GRACE_SECONDS = 60
+# Landed records are acked with a line appended to the journal; the journal is
+# compacted down to the unflushed records once it holds this many lines, or
+# four times the unflushed count, whichever is larger.
+JOURNAL_COMPACT_MIN_LINES = 1000
+
+
+class WriteBehindBuffer:
+    """
+    Takes scraped items off the response path.
+    Items are coalesced per (title, source), journaled to disk and flushed to
+    DBManager in batches by a background worker. One buffer per process.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = super(WriteBehindBuffer, cls).__new__(cls)
+                cls._instance._initialized = False
+            return cls._instance
+
+    def __init__(self):
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self._initialized = True
+
+        self.max_pending = Config.WRITE_BEHIND_MAX_PENDING
+        self.batch_size = Config.WRITE_BEHIND_BATCH_SIZE
+        self.flush_interval = Config.WRITE_BEHIND_FLUSH_INTERVAL
+        self.put_timeout = Config.WRITE_BEHIND_PUT_TIMEOUT
+        self.max_attempts = Config.WRITE_BEHIND_MAX_ATTEMPTS
+
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()   # (title, source) -> record, oldest first
+        self._inflight = {}             # (title, source) -> record being flushed
+        self._landed = {}               # (title, source) -> [(record, landed_at)]
+        self._landed_order = deque()    # (key, landed_at), for expiring _landed
+        self._sources = set()
+
+        self._failures = {}             # (title, source) -> (failures while the DB was up, _landed_batches then)
+        self._landed_batches = 0
+        self.dropped = 0                # overflow the DB refused while the buffer was full
+        self.dead_lettered = 0
+
+        self._journal_dir = Config.WRITE_BEHIND_DIR
+        self._journal_path = os.path.join(self._journal_dir, f"journal-{os.getpid()}.jsonl")
+        self._dead_letter_path = os.path.join(self._journal_dir, "dead-letter.jsonl")
+        self._journal = None
+        self._journal_lines = 0
+        self._compacting = False
+        recovered = self._recover_journals()
+        self._open_journal()
+        if recovered:
+            self._compact_journal()
+
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def enqueue_many(self, items):
+        """
+        Buffers items and returns immediately.
+        When the buffer is full we wait up to put_timeout for the worker; if it
+        is still full the overflow is written synchronously by the caller, and
+        dropped (counted in stats) if the DB refuses it too.
+        """
+        scraped_at = datetime.now(timezone.utc).isoformat()
+        records = [item.snapshot(scraped_at) for item in items]
+        overflow = []
+
+        with self._cond:
+            deadline = time.monotonic() + self.put_timeout
+            accepted = []
+            for record in records:
+                key = (record.title, record.source)
+                while key not in self._pending and len(self._pending) >= self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.notify_all()
+                    self._cond.wait(remaining)
+
+                if key in self._pending or len(self._pending) < self.max_pending:
+                    # Coalesce: the newest price for a listing replaces the buffered one
+                    self._pending.pop(key, None)
+                    self._pending[key] = record
+                    self._sources.add(record.source)
+                    accepted.append(record)
+                else:
+                    overflow.append(record)
+
+            self._append_journal(accepted)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+        if overflow:
+            print(f"⚠️ Write-behind buffer full. Writing {len(overflow)} items synchronously.")
+            try:
+                saved = any(pid is not None for pid in DBManager().save_products(overflow))
+            except Exception as e:
+                print(f"🔥 Write-behind overflow error: {e}")
+                saved = False
+            if not saved:
+                # Full buffer and a failing DB: the request still succeeds, these prices don't
+                with self._cond:
+                    self.dropped += len(overflow)
+                print(f"🔥 Write-behind: dropped {len(overflow)} prices ({self.dropped} since start)")
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+    def pending_history(self, title):
+        """Buffered prices for a product, in get_price_history format (newest first)."""
+        records = []
+        with self._cond:
+            for source in self._sources:
+                key = (title, source)
+                if key in self._pending:
+                    records.append(self._pending[key])
+                if key in self._inflight:
+                    records.append(self._inflight[key])
+                records.extend(record for record, _ in self._landed.get(key, ()))
+        records.sort(key=lambda r: r.scraped_at, reverse=True)
+        return [{"price_inr": r.price, "scraped_at": r.scraped_at} for r in records]
+
+    def merge_history(self, title, stored_history):
+        """Buffered prices layered over the stored history, without double-counting landed rows."""
+        buffered = self.pending_history(title)
+        if not buffered:
+            return stored_history
+
+        seen = {(h['scraped_at'][:19], float(h['price_inr'])) for h in stored_history}
+        fresh = [h for h in buffered if (h['scraped_at'][:19], float(h['price_inr'])) not in seen]
+        return sorted(fresh + stored_history, key=lambda h: h['scraped_at'], reverse=True)
+
+    def stats(self):
+        with self._cond:
+            return {"pending": len(self._pending), "inflight": len(self._inflight),
+                    "dropped": self.dropped, "dead_lettered": self.dead_lettered}
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                # Producers notify for other reasons too; only a full batch, the interval or close() flushes
+                self._cond.wait_for(lambda: self._stopping or len(self._pending) >= self.batch_size,
+                                    self.flush_interval)
+                if self._stopping and not self._pending:
+                    return
+                batch = self._take_batch()
+
+            try:
+                flushed = not batch or self._flush(batch)
+                if flushed and self._journal_due():
+                    self._compact_journal()
+            except Exception as e:
+                # The flusher must outlive any bug: a dead worker means an ever-growing buffer
+                print(f"🔥 Write-behind worker error: {e}")
+                self._requeue(batch)
+                flushed = False
+            if not flushed:
+                # Supabase is down: back off instead of spinning, but let close() cut it short
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, min(self.flush_interval * 5, 30))
+
+    def _take_batch(self):
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+            key = next(iter(self._pending))
+            if key in self._failures and batch:
+                break  # suspects are retried on their own so they can't sink a whole batch
+            record = self._pending.pop(key)
+            self._inflight[key] = record
+            batch.append((key, record))
+            if key in self._failures:
+                break
+        self._cond.notify_all()
+        return batch
+
+    def _flush(self, batch):
+        if self._save(batch):
+            landed, failed = batch, []
+        else:
+            landed, failed = self._bisect(batch)
+        now = time.monotonic()
+        dead = []
+
+        with self._cond:
+            if landed:
+                self._landed_batches += 1
+            for key, record in landed:
+                self._inflight.pop(key, None)
+                self._failures.pop(key, None)
+                self._landed.setdefault(key, []).append((record, now))
+                self._landed_order.append((key, now))
+
+            # A whole batch failing means the DB is down: it goes back to the front as it was.
+            # Records that failed while others landed, or a suspect retried alone, go to the back.
+            suspect = landed or (len(batch) == 1 and batch[0][0] in self._failures)
+            for key, record in (failed if suspect else reversed(failed)):
+                self._inflight.pop(key, None)
+                if suspect and self._count_failure(key, db_up=bool(landed)):
+                    dead.append(record)
+                elif key not in self._pending:
+                    # Requeue unless a newer price arrived meanwhile
+                    self._pending[key] = record
+                    if not suspect:
+                        self._pending.move_to_end(key, last=False)
+
+            while self._landed_order and now - self._landed_order[0][1] >= LANDED_GRACE_SECONDS:
+                key, landed_at = self._landed_order.popleft()
+                kept = [entry for entry in self._landed.get(key, ()) if entry[1] > landed_at]
+                if kept:
+                    self._landed[key] = kept
+                else:
+                    self._landed.pop(key, None)
+
+            if landed or dead:
+                self._ack_journal([record for _, record in landed] + dead)
+
+        if landed:
+            print(f"💾 Write-behind: flushed {len(landed)} prices")
+        if dead:
+            self._dead_letter(dead)
+        if failed:
+            print(f"⚠️ Write-behind: flush of {len(failed)} prices failed, will retry")
+        return bool(landed)
+
+    def _requeue(self, batch):
+        """Returns a batch that failed unexpectedly to the front of the buffer."""
+        with self._cond:
+            for key, record in reversed(batch):
+                if self._inflight.get(key) is record:
+                    del self._inflight[key]
+                    if key not in self._pending:
+                        self._pending[key] = record
+                        self._pending.move_to_end(key, last=False)
+
+    def _save(self, batch):
+        try:
+            product_ids = DBManager().save_products([record for _, record in batch])
+        except Exception as e:
+            print(f"🔥 Write-behind flush error: {e}")
+            return False
+        return any(pid is not None for pid in product_ids)
+
+    def _bisect(self, batch):
+        """
+        Retries a failed batch in halves to isolate the records that break it.
+        Returns (landed, failed). When both halves fail the DB itself is the
+        problem and the half is not split any further.
+        """
+        if len(batch) == 1:
+            return [], batch
+        mid = len(batch) // 2
+        halves = (batch[:mid], batch[mid:])
+        saved = [self._save(half) for half in halves]
+        if not any(saved):
+            return [], batch
+
+        landed, failed = [], []
+        for half, ok in zip(halves, saved):
+            if ok:
+                landed.extend(half)
+            else:
+                sub_landed, sub_failed = self._bisect(half)
+                landed.extend(sub_landed)
+                failed.extend(sub_failed)
+        return landed, failed
+
+    def _count_failure(self, key, db_up):
+        """
+        Counts a failure of `key` if the DB was up: other records landed in the same
+        flush, or since its last failure. Returns True once it has failed
+        max_attempts times and should be dead-lettered. Caller holds the lock.
+        """
+        failures, seen = self._failures.get(key, (0, -1))
+        if db_up or self._landed_batches > seen:
+            failures += 1
+        if failures >= self.max_attempts:
+            self._failures.pop(key, None)
+            return True
+        self._failures[key] = (failures, self._landed_batches)
+        return False
+
+    def _dead_letter(self, records):
+        """Parks records the DB keeps rejecting in dead-letter.jsonl for a human to look at."""
+        with self._cond:
+            self.dead_lettered += len(records)
+        print(f"🪦 Write-behind: dead-lettered {len(records)} prices that keep failing")
+        try:
+            os.makedirs(self._journal_dir, exist_ok=True)
+            with open(self._dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in records))
+        except OSError as e:
+            print(f"⚠️ Write-behind dead letter failed: {e}")
+
+    def flush_now(self):
+        """Synchronously drains the buffer (used at shutdown and by scripts)."""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch or not self._flush(batch):
+                return
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._worker.join(timeout=10)
+        self.flush_now()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+            with self._cond:
+                if not self._pending and not self._inflight:
+                    os.remove(self._journal_path)
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+    def _open_journal(self):
+        try:
+            os.makedirs(self._journal_dir, exist_ok=True)
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+        except OSError as e:
+            print(f"⚠️ Write-behind journal disabled: {e}")
+            self._journal = None
+
+    def _append_journal(self, records):
+        """Caller holds the lock, which keeps journal lines in buffer order."""
+        if not records:
+            return
+        self._write_journal("".join(json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in records),
+                            len(records))
+
+    def _ack_journal(self, records):
+        """Marks records as flushed (or dead-lettered) so recovery skips them. Caller holds the lock."""
+        acked = [[r.title, r.source, r.scraped_at] for r in records]
+        self._write_journal(json.dumps({"acked": acked}, ensure_ascii=False) + "\n", 1)
+
+    def _write_journal(self, text, lines):
+        if not self._journal:
+            return
+        try:
+            self._journal.write(text)
+            self._journal.flush()
+            self._journal_lines += lines
+        except (OSError, ValueError) as e:
+            # The prices are still buffered in memory; only crash recovery is at risk
+            print(f"⚠️ Write-behind journal write failed: {e}")
+
+    def _journal_due(self):
+        with self._cond:
+            live = len(self._pending) + len(self._inflight)
+            return bool(self._journal) and not self._compacting \
+                and self._journal_lines >= max(JOURNAL_COMPACT_MIN_LINES, 4 * live)
+
+    def _compact_journal(self):
+        """
+        Rewrites the journal down to what is still unflushed. The snapshot is written
+        without the lock; only the lines appended meanwhile are copied under it.
+        """
+        with self._cond:
+            if not self._journal or self._compacting:
+                return
+            self._compacting = True
+            try:
+                self._journal.flush()
+                offset = self._journal.tell()
+            except (OSError, ValueError) as e:
+                self._compacting = False
+                print(f"⚠️ Write-behind journal compaction skipped: {e}")
+                return
+            snapshot = list(self._inflight.values()) + list(self._pending.values())
+
+        tmp_path = self._journal_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write("".join(json.dumps(r.to_dict(), ensure_ascii=False) + "\n" for r in snapshot))
+            with self._cond:
+                with open(self._journal_path, encoding='utf-8') as live, open(tmp_path, 'a', encoding='utf-8') as f:
+                    live.seek(offset)
+                    tail = live.read()
+                    f.write(tail)
+                self._journal.close()
+                os.replace(tmp_path, self._journal_path)
+                self._journal = open(self._journal_path, 'a', encoding='utf-8')
+                self._journal_lines = len(snapshot) + tail.count("\n")
+        except OSError as e:
+            print(f"⚠️ Write-behind journal compaction failed: {e}")
+        finally:
+            with self._cond:
+                self._compacting = False
+
+    def _recover_journals(self):
+        """
+        Replays journals left behind by workers that died before flushing.
+        A journal is claimed by renaming it, so two workers never replay the same file.
+        The last line for a listing wins, unless an ack line says it was flushed.
+        """
+        if not os.path.isdir(self._journal_dir):
+            return 0
+
+        recovered = 0
+        for name in os.listdir(self._journal_dir):
+            if not name.startswith("journal-") or not name.endswith(".jsonl"):
+                continue
+            path = os.path.join(self._journal_dir, name)
+            # Our own pid can only be here if a previous process with the same pid died
+            if path != self._journal_path and _pid_alive(name[len("journal-"):-len(".jsonl")]):
+                continue
+
+            claimed = f"{path}.claimed-{os.getpid()}"
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # another worker got there first
+
+            records, acked = {}, set()
+            with open(claimed, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        data = json.loads(line)
+                        if "acked" in data:
+                            acked.update(tuple(entry) for entry in data["acked"])
+                            continue
+                        record = ProductListing.from_dict(data)
+                    except (ValueError, TypeError, AttributeError):
+                        continue  # torn last line from a crash
+                    records[(record.title, record.source)] = record
+            for key, record in records.items():
+                if (record.title, record.source, record.scraped_at) not in acked:
+                    self._pending[key] = record
+                    self._sources.add(record.source)
+                    recovered += 1
+            os.remove(claimed)
+
+        if recovered:
+            print(f"♻️ Write-behind: recovered {recovered} unflushed prices from journal")
+        return recovered
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
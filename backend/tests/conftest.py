@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Tests import the app's modules the way app.py does: absolute, from the backend folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest import stubs  # noqa: E402
+
+# No test talks to Supabase; DB-backed modules get the in-memory DBManager or a fake
+stubs.stub_supabase()
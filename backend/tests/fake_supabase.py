@@ -0,0 +1,106 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+
+class FakeSupabase:
+    """
+    Just enough of the supabase-py query builder for DBManager, backed by lists
+    of dicts. Inserts into `prices` keep `price_latest` current like the trigger
+    in migrations/003 and 005 does.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self._ids = itertools.count(1)
+        self._clock = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rows(self, name):
+        return self.tables.setdefault(name, [])
+
+    def now(self):
+        self._clock += timedelta(seconds=1)
+        return self._clock.isoformat()
+
+    def _record_latest(self, row):
+        latest = self.rows('price_latest')
+        key = (row['product_id'], row['site_name'])
+        current = next((r for r in latest if (r['product_id'], r['site_name']) == key), None)
+        if current is None:
+            latest.append({"product_id": row['product_id'], "site_name": row['site_name'],
+                           "price_inr": row['price_inr'], "product_link": row.get('product_link'),
+                           "scraped_at": row['scraped_at']})
+        elif current['scraped_at'] <= row['scraped_at']:
+            current.update(price_inr=row['price_inr'], product_link=row.get('product_link'),
+                           scraped_at=row['scraped_at'])
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.columns = None
+        self.filters = []
+        self.orders = []
+        self.window = None
+        self.payload = None
+
+    def select(self, columns):
+        self.columns = [c.strip() for c in columns.split(',')]
+        return self
+
+    def insert(self, rows):
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) < value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def execute(self):
+        table = self.db.rows(self.name)
+        if self.payload is not None:
+            inserted = []
+            for row in self.payload:
+                row = dict(row, id=next(self.db._ids))
+                if self.name == 'prices':
+                    row.setdefault('scraped_at', self.db.now())
+                    self.db._record_latest(row)
+                table.append(row)
+                inserted.append(dict(row))
+            return _Result(inserted)
+
+        rows = [row for row in table if all(f(row) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: row.get(column), reverse=desc)
+        if self.window:
+            rows = rows[self.window[0]:self.window[1]]
+        return _Result([{c: row.get(c) for c in self.columns} for row in rows])
@@ -0,0 +1,52 @@
+from modules.alerts.index import AlertIndex
+
+
+def index_with(*alerts):
+    index = AlertIndex()
+    for product_id, threshold, alert_id in alerts:
+        index.add(product_id, threshold, alert_id)
+    return index
+
+
+def test_match_returns_every_threshold_at_or_above_the_price():
+    index = index_with(("p1", 100, "a"), ("p1", 80, "b"), ("p1", 120, "c"), ("p2", 500, "d"))
+
+    assert sorted(index.match("p1", 100, consume=False)) == ["a", "c"]
+    assert index.match("p1", 121) == []
+    assert index.match("unknown", 1) == []
+    assert len(index) == 4
+
+
+def test_match_consumes_one_shot_alerts():
+    index = index_with(("p1", 100, "a"), ("p1", 80, "b"))
+
+    assert index.match("p1", 90) == ["a"]
+    assert index.match("p1", 90) == []
+    assert index.match("p1", 50) == ["b"]
+    assert len(index) == 0
+
+
+def test_equal_thresholds_are_all_kept():
+    index = index_with(("p1", 100, "a"), ("p1", 100, "b"))
+
+    assert sorted(index.match("p1", 100)) == ["a", "b"]
+
+
+def test_load_merges_with_alerts_already_indexed():
+    index = index_with(("p1", 100, "a"))
+    index.load("p1", [(150, "b"), (50, "c")])
+
+    assert len(index) == 3
+    assert index.match("p1", 100) == ["a", "b"]
+    assert index.match("p1", 50) == ["c"]
+
+
+def test_remove():
+    index = index_with(("p1", 100, "a"), ("p1", 100, "b"))
+
+    assert index.remove("p1", 100, "b")
+    assert not index.remove("p1", 100, "b")
+    assert not index.remove("p1", 90, "a")     # wrong threshold
+    assert not index.remove("p2", 100, "a")
+    assert len(index) == 1
+    assert index.match("p1", 0) == ["a"]
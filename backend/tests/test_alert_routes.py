@@ -0,0 +1,77 @@
+import time
+
+import pytest
+from flask import Flask
+
+from loadtest.memory_db import InMemoryDBManager
+from modules.api import routes
+from modules.alerts.notifier import Notifier, NotificationQueue
+from modules.scraper.records import ProductListing
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(routes, 'DBManager', InMemoryDBManager)
+    InMemoryDBManager.reset()
+    app = Flask(__name__)
+    app.register_blueprint(routes.api_bp)
+    yield app.test_client()
+    InMemoryDBManager.reset()
+
+
+@pytest.mark.parametrize("threshold", ["nan", "inf", "-inf", -5, 0, "cheap", None])
+def test_rejects_thresholds_that_are_not_positive_numbers(client, threshold):
+    res = client.post('/api/alerts', json={"product_id": 1, "threshold": threshold})
+    assert res.status_code == 400
+
+
+@pytest.mark.parametrize("product_id", ["abc", 1.5, True, [1], "1e400"])
+def test_rejects_malformed_product_ids(client, product_id):
+    res = client.post('/api/alerts', json={"product_id": product_id, "threshold": 100})
+    assert res.status_code == 400
+
+
+def test_unknown_products_are_not_found(client):
+    InMemoryDBManager().save_products([ProductListing("Kettle", 999.0, None, None, "Amazon")])
+
+    assert client.post('/api/alerts', json={"product_id": 999, "threshold": 100}).status_code == 404
+    assert client.post('/api/alerts', json={"title": "Toaster", "threshold": 100}).status_code == 404
+
+
+class FlakyNotifier(Notifier):
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = []
+
+    def send(self, alert):
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise ConnectionError("webhook down")
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failed_deliveries_back_off_before_retrying():
+    notifier = FlakyNotifier(failures=2)
+    notifications = NotificationQueue(notifier, workers=1, max_attempts=3, retry_delay=0.1)
+    notifications.put({"alert_id": 1})
+
+    assert wait_for(lambda: len(notifier.attempts) == 3)
+    first, second, third = notifier.attempts
+    assert second - first >= 0.1
+    assert third - second >= 0.2
+
+
+def test_gives_up_after_max_attempts():
+    notifier = FlakyNotifier(failures=10)
+    notifications = NotificationQueue(notifier, workers=1, max_attempts=2, retry_delay=0.01)
+    notifications.put({"alert_id": 1})
+
+    assert wait_for(lambda: len(notifier.attempts) == 2)
+    time.sleep(0.1)
+    assert len(notifier.attempts) == 2
@@ -0,0 +1,91 @@
+import pytest
+
+from modules.scraper.records import B2BLead
+from modules.scraper.b2b_pricing import (WHOLESALE_CATEGORY, parse_price, parse_quantity, extract_moq,
+                                         normalize_leads, sort_leads, storage_record)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("₹ 400/Kg", (400.0, 400.0, "INR", "kg", 1)),
+    ("Rs. 45,000/Metric Ton", (45.0, 45.0, "INR", "kg", 1000)),
+    ("₹ 50/100 g", (500.0, 500.0, "INR", "kg", 0.001)),
+    ("US $ 5/Piece", (5.0, 5.0, "USD", "piece", 1)),
+    ("₹ 2 - 3 Lakh/Piece", (200000.0, 300000.0, "INR", "piece", 1)),
+    ("₹ 500 - 2 Lakh", (500.0, 200000.0, "INR", None, 1)),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+def test_parse_price_range_with_a_unit_on_each_end():
+    assert parse_price("₹ 10/kg - ₹ 12/kg") == (10.0, 12.0, "INR", "kg", 1)
+    # Both ends are converted to the canonical unit, then ordered
+    assert parse_price("₹ 10/kg - ₹ 9,000/ton")[:2] == (9.0, 10.0)
+
+
+def test_parse_price_rejects_a_range_across_units():
+    assert parse_price("₹ 10/Kg - ₹ 500/Piece") is None
+
+
+@pytest.mark.parametrize("text, unit_price, unit", [
+    ("₹ 120/Packet of 10", 12.0, "piece"),
+    ("₹ 900/Bag of 25 Kg", 36.0, "kg"),
+])
+def test_parse_price_pack(text, unit_price, unit):
+    low, high, _, parsed_unit, _ = parse_price(text)
+    assert (low, high, parsed_unit) == (unit_price, unit_price, unit)
+
+
+@pytest.mark.parametrize("text", ["Ask Price", "", None, "Get Latest Price"])
+def test_parse_price_unpriced(text):
+    assert parse_price(text) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("MOQ: 100 Kg Delhi Seller", "100 Kg"),
+    ("Minimum Order Quantity: 500 Piece", "500 Piece"),
+    ("Min. Order: 2 Tons", "2 Tons"),
+    ("no minimum here", None),
+])
+def test_extract_moq(text, expected):
+    assert extract_moq(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("100 Kg", (100.0, "kg")),
+    ("2 Tons", (2000.0, "kg")),
+    ("1 dozen", (12.0, "piece")),
+    ("50", (50.0, None)),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+
+class FixedForex:
+    def convert_to_inr(self, amount, currency):
+        return amount * {"USD": 80.0}[currency]
+
+
+def lead(price, moq_text=None):
+    return B2BLead("Basmati Rice", price, "https://example.com", None, "IndiaMART", moq_text=moq_text)
+
+
+def test_normalize_leads():
+    rice, import_rice, unpriced = normalize_leads(
+        [lead("₹ 90/Kg", "100 Kg"), lead("US $ 1/Kg"), lead("Ask Price")], forex=FixedForex())
+
+    assert (rice.unit_price, rice.unit_price_max, rice.unit, rice.currency) == (90.0, 90.0, "kg", "INR")
+    assert (rice.moq, rice.moq_unit) == (100.0, "kg")
+    assert (import_rice.unit_price, import_rice.currency) == (80.0, "USD")
+    assert import_rice.price == "US $ 1/Kg"   # the quoted text is kept
+    assert unpriced.unit_price is None and unpriced.moq is None
+
+
+def test_sort_leads_puts_the_common_unit_first_and_unpriced_last():
+    leads = normalize_leads([lead("Ask Price"), lead("₹ 5/Piece"), lead("₹ 95/Kg"), lead("₹ 90/Kg")])
+    assert [l.price for l in sort_leads(leads)] == ["₹ 90/Kg", "₹ 95/Kg", "₹ 5/Piece", "Ask Price"]
+
+
+def test_storage_record_is_wholesale():
+    record = storage_record(normalize_leads([lead("₹ 90/Kg")])[0])
+    assert (record.price, record.category) == (90.0, WHOLESALE_CATEGORY)
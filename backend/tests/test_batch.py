@@ -0,0 +1,103 @@
+import json
+import time
+import threading
+
+import pytest
+from flask import Flask
+
+from loadtest.memory_db import InMemoryDBManager
+from modules.api import routes
+from modules.scraper import batch
+from modules.scraper.batch import BatchSearchScheduler, batch_key
+from modules.scraper.records import ProductListing
+
+
+class FakeScraper:
+    """Every query goes to `sources`; fetches sleep `delays[source]` and record their concurrency."""
+
+    def __init__(self, sources, delays):
+        self.sources = sources
+        self.delays = delays
+        self.running = {}
+        self.peak = {}
+        self.finished = []
+        self._lock = threading.Lock()
+
+    def plan_sources(self, query, intent="single"):
+        return "general", self.sources
+
+    def has_source(self, source):
+        return True
+
+    def fetch_source(self, source, query, category):
+        with self._lock:
+            self.running[source] = self.running.get(source, 0) + 1
+            self.peak[source] = max(self.peak.get(source, 0), self.running[source])
+        time.sleep(self.delays[source])
+        with self._lock:
+            self.running[source] -= 1
+            self.finished.append((source, time.monotonic()))
+        if query == "broken":
+            raise ValueError("parser failed")
+        return [ProductListing(query, 100.0, None, None, source)]
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    fake = FakeScraper(["slow", "fast"], {"slow": 0.1, "fast": 0.01})
+    monkeypatch.setattr(batch, 'ScraperEngine', lambda: fake)
+    return fake
+
+
+def keys(*queries):
+    return [batch_key(query, 'single') for query in queries]
+
+
+def test_a_busy_host_does_not_hold_back_the_others(scraper):
+    scheduler = BatchSearchScheduler(max_workers=2, per_host_limit=1)
+    results = dict(scheduler.run(keys(*(f"q{i}" for i in range(5)))))
+
+    assert all(len(items) == 2 for items in results.values())
+    assert scraper.peak == {"slow": 1, "fast": 1}
+    # The fast host's fetches never queued behind the slow host's
+    fast_done = max(t for source, t in scraper.finished if source == "fast")
+    slow_done = sorted(t for source, t in scraper.finished if source == "slow")
+    assert fast_done < slow_done[1]
+
+
+def test_deadline_returns_partial_results(scraper):
+    scheduler = BatchSearchScheduler(max_workers=4, per_host_limit=1)
+    started = time.monotonic()
+    results = dict(scheduler.run(keys(*(f"q{i}" for i in range(10))), deadline=time.monotonic() + 0.25))
+
+    assert time.monotonic() - started < 0.5
+    assert len(results) == 10
+    assert scheduler.timed_out and all(len(results[key]) < 2 for key in scheduler.timed_out)
+
+
+class NoForecast:
+    def predict_next_week(self, history, product_id, category):
+        return None
+
+
+def test_stream_reports_a_failing_query_and_keeps_going(scraper, monkeypatch):
+    monkeypatch.setattr(routes, 'DBManager', InMemoryDBManager)
+    monkeypatch.setattr(routes, 'ForecastEngine', NoForecast)
+    monkeypatch.setattr(routes.Config, 'WRITE_BEHIND_ENABLED', False)
+    enrich = routes._enrich_retail
+
+    def failing_enrich(items, db, forecaster, **kwargs):
+        if items[0].title == "cursed":
+            raise RuntimeError("scoring failed")
+        return enrich(items, db, forecaster, **kwargs)
+
+    monkeypatch.setattr(routes, '_enrich_retail', failing_enrich)
+    app = Flask(__name__)
+    app.register_blueprint(routes.api_bp)
+
+    res = app.test_client().post('/api/search/batch', json={"queries": ["kettle", "cursed", "toaster"], "stream": True})
+    rows = {row["query"]: row for row in map(json.loads, res.data.splitlines())}
+
+    assert rows["cursed"]["error"] and rows["cursed"]["results"] == []
+    assert rows["kettle"]["count"] == 2 and rows["toaster"]["count"] == 2
+    InMemoryDBManager.reset()
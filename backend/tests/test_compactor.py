@@ -0,0 +1,59 @@
+from modules.services.compactor import PriceCompactor, rollup_rows
+
+from fake_supabase import FakeSupabase
+
+
+def price(product_id, site, value, scraped_at):
+    return {"product_id": product_id, "site_name": site, "price_inr": value, "scraped_at": scraped_at}
+
+
+def test_rollup_rows_builds_daily_ohlc():
+    rows = [price(1, "Amazon", 999, "2026-01-01T08:00:00+00:00"),
+            price(1, "Amazon", 899, "2026-01-01T12:00:00+00:00"),
+            price(1, "Amazon", 949, "2026-01-01T20:00:00+00:00"),
+            price(1, "Flipkart", 979, "2026-01-01T09:00:00+00:00"),
+            price(1, "Amazon", 929, "2026-01-02T09:00:00+00:00")]
+
+    assert rollup_rows(rows) == {
+        (1, "Amazon", "2026-01-01"): {"open": 999, "high": 999, "low": 899, "close": 949, "samples": 3},
+        (1, "Flipkart", "2026-01-01"): {"open": 979, "high": 979, "low": 979, "close": 979, "samples": 1},
+        (1, "Amazon", "2026-01-02"): {"open": 929, "high": 929, "low": 929, "close": 929, "samples": 1},
+    }
+
+
+def test_dry_run_counts_old_rows_without_writing():
+    db = FakeSupabase()
+    old = [price(1, "Amazon", 999 - i, f"2020-01-0{1 + i % 3}T08:00:00+00:00") for i in range(5)]
+    recent = [price(1, "Amazon", 899, "2999-01-01T08:00:00+00:00")]
+    db.rows('prices').extend(dict(row, id=i) for i, row in enumerate(old + recent))
+
+    compactor = PriceCompactor(days=30, page_size=2)
+    compactor.supabase = db
+    assert compactor.run(dry_run=True) == 5
+    assert len(db.rows('prices')) == 6 and not db.rows('price_daily')
+
+
+class CompactRpc:
+    """Stands in for the compact_prices function: hands out the queued batch results in turn."""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        self.data = [self.batches.pop(0)]
+        return self
+
+    def execute(self):
+        return self
+
+
+def test_run_compacts_in_batches_until_a_short_one():
+    rpc = CompactRpc([{"compacted": 2, "days": 1}, {"compacted": 2, "days": 2}, {"compacted": 1, "days": 1}])
+    compactor = PriceCompactor(days=30, page_size=2)
+    compactor.supabase = rpc
+
+    assert compactor.run() == 5
+    assert [name for name, _ in rpc.calls] == ["compact_prices"] * 3
+    assert all(params["batch_size"] == 2 for _, params in rpc.calls)
@@ -0,0 +1,73 @@
+import pytest
+
+from modules.scraper.records import ProductListing, B2BLead
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY, normalize_leads, storage_record
+from modules.services.db_manager import DBManager
+
+from fake_supabase import FakeSupabase
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(DBManager, 'price_listeners', [])
+    manager = DBManager()
+    manager.supabase = FakeSupabase()
+    return manager
+
+
+def listing(title, price, source="Amazon", category="Grocery"):
+    return ProductListing(title, price, "https://example.com/item", None, source, category=category)
+
+
+def stored_leads(db, *quotes):
+    leads = normalize_leads([B2BLead(title, price, "https://example.com/lead", None, "IndiaMART", seller=seller)
+                             for title, price, seller in quotes])
+    return db.save_products([storage_record(lead) for lead in leads])
+
+
+def test_wholesale_leads_never_share_a_retail_product(db):
+    [retail_id] = db.save_products([listing("Basmati Rice", 5000.0)])
+    [lead_id] = stored_leads(db, ("Basmati Rice", "₹ 90/Kg", "Rice Traders"))
+
+    assert lead_id != retail_id
+    assert [h['price_inr'] for h in db.get_price_history(retail_id)] == [5000.0]
+    assert db.find_product_ids(["Basmati Rice"]) == {"Basmati Rice": retail_id}
+    products = {row['id']: row for row in db.supabase.rows('products')}
+    assert products[lead_id]['category'] == WHOLESALE_CATEGORY
+
+
+def test_sellers_quoting_the_same_title_keep_separate_histories(db):
+    first, second = stored_leads(db, ("Laptop Wholesale Lot 3", "₹ 215/Piece", "Supplier A"),
+                                 ("Laptop Wholesale Lot 3", "₹ 1,022/Piece", "Supplier B"))
+    assert first != second
+
+    # Alternating quotes are unchanged prices per seller, so nothing new is recorded
+    assert stored_leads(db, ("Laptop Wholesale Lot 3", "₹ 215/Piece", "Supplier A"),
+                        ("Laptop Wholesale Lot 3", "₹ 1,022/Piece", "Supplier B")) == [first, second]
+    assert [h['price_inr'] for h in db.get_price_history(first)] == [215.0]
+    assert [h['price_inr'] for h in db.get_price_history(second)] == [1022.0]
+
+
+def stored_prices(db, product_id):
+    return [(row['site_name'], row['price_inr']) for row in db.supabase.rows('prices') if row['product_id'] == product_id]
+
+
+def test_only_price_changes_are_recorded(db):
+    [kettle] = db.save_products([listing("Kettle", 999.0)])
+    db.save_products([listing("Kettle", 999.0)])
+    db.save_products([listing("Kettle", 999.004)])     # the same price to the paisa
+    db.save_products([listing("Kettle", 949.0), listing("Kettle", 999.0, "Flipkart")])
+    db.save_products([listing("Kettle", 999.0)])
+
+    assert stored_prices(db, kettle) == [("Amazon", 999.0), ("Amazon", 949.0), ("Flipkart", 999.0),
+                                         ("Amazon", 999.0)]
+
+
+def test_unchanged_prices_still_reach_the_listeners(db):
+    observed = []
+    DBManager.add_price_listener(observed.extend)
+    db.save_products([listing("Kettle", 999.0)])
+    db.save_products([listing("Kettle", 999.0)])
+
+    assert [obs['price'] for obs in observed] == [999.0, 999.0]
+    assert len(db.supabase.rows('prices')) == 1
@@ -0,0 +1,75 @@
+import time
+import threading
+
+import pytest
+
+from loadtest.memory_db import InMemoryDBManager
+from modules.analytics import deal_index
+from modules.analytics.deal_index import DealIndex
+from modules.scraper.records import ProductListing
+from modules.services.db_manager import DBManager
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(DBManager, 'price_listeners', [])
+    monkeypatch.setattr(deal_index, 'DBManager', InMemoryDBManager)
+    InMemoryDBManager.reset()
+    DealIndex._instance = None
+    yield InMemoryDBManager()
+    DealIndex._instance = None
+    InMemoryDBManager.reset()
+
+
+def wait_ready(index):
+    deadline = time.monotonic() + 5
+    while not index.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return index
+
+
+def listing(title, price, source="Amazon"):
+    return ProductListing(title, price, "https://example.com/item", None, source, category="Kitchen")
+
+
+def test_concurrent_first_use_sees_a_complete_index(db):
+    errors = []
+
+    def use():
+        try:
+            DealIndex().top()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=use) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_ranks_prices_seen_by_this_worker(db):
+    index = wait_ready(DealIndex())
+    db.save_products([listing("Kettle", 1200.0)])
+    db.save_products([listing("Kettle", 900.0)])
+
+    [deal] = index.top()
+    assert (deal["title"], deal["price"], deal["score"], deal["samples"]) == ("Kettle", 900.0, 100, 2)
+
+
+def test_sync_picks_up_other_workers_prices(db, monkeypatch):
+    index = wait_ready(DealIndex())
+
+    # Another worker's writes reach this process only through price_latest
+    monkeypatch.setattr(DBManager, 'price_listeners', [])
+    db.save_products([listing("Toaster", 2000.0)])
+    db.save_products([listing("Toaster", 1500.0), listing("Toaster", 1800.0, "Flipkart")])
+    index._sync()
+
+    [deal] = index.top()
+    assert (deal["title"], deal["price"], deal["source"], deal["samples"]) == ("Toaster", 1500.0, "Amazon", 3)
+
+    # Rows inside the look-back window are applied again without being counted twice
+    index._sync()
+    assert index.top()[0]["samples"] == 3
@@ -0,0 +1,128 @@
+import time
+import threading
+
+import pytest
+
+from loadtest.memory_db import InMemoryDBManager
+from modules.scraper.records import ProductListing
+from modules.scraper.b2b_pricing import WHOLESALE_CATEGORY
+from modules.api import routes
+from modules.services import search_index
+from modules.services.db_manager import DBManager
+from modules.services.search_index import IndexedProduct, LocalSearchIndex
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(DBManager, 'price_listeners', [])
+    monkeypatch.setattr(search_index, 'DBManager', InMemoryDBManager)
+    InMemoryDBManager.reset()
+    yield InMemoryDBManager()
+    InMemoryDBManager.reset()
+
+
+@pytest.fixture
+def new_index(db):
+    def new():
+        LocalSearchIndex._instance = None
+        index = LocalSearchIndex()
+        deadline = time.monotonic() + 5
+        while not index.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return index
+
+    yield new
+    LocalSearchIndex._instance = None
+
+
+def listing(title, price, source="Amazon", url="https://example.com/item", **kwargs):
+    return ProductListing(title, price, url, None, source, **kwargs)
+
+
+def test_warms_from_stored_products(db, new_index):
+    db.save_products([listing("Nike Running Shoes", 4999.0), listing("Nike Running Shoes", 4799.0, "Flipkart"),
+                      listing("Cast Iron Skillet", 1299.0)])
+    index = new_index()
+
+    hits, stale = index.search("running shoe")
+    assert [(h.source, h.price) for _, h in hits] == [("Flipkart", 4799.0), ("Amazon", 4999.0)]
+    assert len({pid for pid, _ in hits}) == 1
+    assert not stale
+
+
+def test_every_query_term_must_match(db, new_index):
+    index = new_index()
+    db.save_products([listing("Nike Running Shoes", 4999.0), listing("Nike Cap", 799.0)])
+
+    assert [h.title for _, h in index.search("nike cap")[0]] == ["Nike Cap"]
+    assert index.search("adidas cap") == ([], False)
+    assert index.search("!!!") == ([], False)
+
+
+def test_ranks_the_closer_title_first(db, new_index):
+    index = new_index()
+    db.save_products([listing("Green Tea", 299.0),
+                      listing("Green Tea Lemon Honey Ginger Detox Infusion Bags", 199.0),
+                      listing("Green Apple", 99.0)])
+
+    hits, _ = index.search("green tea", max_products=1)
+    assert [h.title for _, h in hits] == ["Green Tea"]
+
+
+def test_wholesale_leads_are_not_indexed(db, new_index):
+    index = new_index()
+    db.save_products([listing("Basmati Rice", 90.0, "IndiaMART", category=WHOLESALE_CATEGORY)])
+
+    assert index.search("basmati rice") == ([], False)
+
+
+def test_old_prices_are_stale(db, new_index):
+    db.save_products([listing("Cast Iron Skillet", 1299.0).snapshot("2020-01-01T00:00:00+00:00")])
+    index = new_index()
+
+    hits, stale = index.search("skillet")
+    assert len(hits) == 1 and stale
+
+
+def test_observe_keeps_the_link_when_a_rollup_has_none():
+    product = IndexedProduct(1, "Kettle", None, None, None, 1)
+    product.observe(999.0, "Amazon", "https://example.com/kettle", "2026-01-01T00:00:00+00:00")
+    product.observe(949.0, "Amazon", None, "2026-01-02T23:59:59+00:00")
+    product.observe(899.0, "Amazon", "https://example.com/old", "2025-12-31T00:00:00+00:00")
+
+    assert product.offers["Amazon"] == (949.0, "https://example.com/kettle", "2026-01-02T23:59:59+00:00")
+
+
+class BlockedScraper:
+    release = threading.Event()
+    queries = []
+
+    def search_product(self, query, intent="single"):
+        self.queries.append(query)
+        self.release.wait(5)
+        return []
+
+
+def test_refreshes_are_deduplicated_and_bounded(monkeypatch):
+    monkeypatch.setattr(routes, 'ScraperEngine', BlockedScraper)
+    monkeypatch.setattr(routes.Config, 'LOCAL_SEARCH_MAX_REFRESHES', 3)
+    BlockedScraper.release.clear()
+    try:
+        assert routes._schedule_refresh("Green Tea", "single") == "scheduled"
+        assert routes._schedule_refresh("  green   tea ", "single") == "in-progress"
+        assert routes._schedule_refresh("kettle", "single") == "scheduled"
+        assert routes._schedule_refresh("toaster", "single") == "scheduled"
+        assert routes._schedule_refresh("blender", "single") == "skipped"
+    finally:
+        BlockedScraper.release.set()
+    deadline = time.monotonic() + 5
+    while routes._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert routes._schedule_refresh("blender", "single") == "scheduled"
+
+
+def test_one_product_on_many_sites_is_not_enough_for_a_local_hit(db, new_index, monkeypatch):
+    monkeypatch.setattr(routes.Config, 'LOCAL_SEARCH_MIN_RESULTS', 2)
+    new_index()
+    db.save_products([listing("Kettle", 999.0, source) for source in ("Amazon", "Flipkart", "Croma")])
+    assert routes._search_local("kettle", "single", db, None) is None
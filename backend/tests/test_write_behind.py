@@ -0,0 +1,215 @@
+import os
+import time
+import json
+
+import pytest
+
+from config import Config
+from modules.scraper.records import ProductListing
+from modules.services import write_behind
+from modules.services.write_behind import WriteBehindBuffer
+
+
+class FakeDB:
+    """Records what was saved; raises for a batch containing a title in `rejects`, or always when `down`."""
+
+    def __init__(self):
+        self.saved = []
+        self.rejects = set()
+        self.down = False
+
+    def save_products(self, items):
+        if self.down or any(item.title in self.rejects for item in items):
+            raise ValueError("rejected")
+        self.saved.extend(items)
+        return list(range(len(items)))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(write_behind, 'DBManager', lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def new_buffer(monkeypatch, tmp_path):
+    # Flushes only happen when a test calls flush_now
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_FLUSH_INTERVAL', 3600)
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_BATCH_SIZE', 100)
+    buffers = []
+
+    def new():
+        WriteBehindBuffer._instance = None
+        buffers.append(WriteBehindBuffer())
+        return buffers[-1]
+
+    yield new
+    for buffer in buffers:
+        buffer.close()
+    WriteBehindBuffer._instance = None
+
+
+def listing(title, price, source="Amazon"):
+    return ProductListing(title, price, f"https://example.com/{title}", None, source)
+
+
+def test_coalesces_per_title_and_source(db, new_buffer):
+    buffer = new_buffer()
+    buffer.enqueue_many([listing("Kettle", 999.0), listing("Kettle", 899.0, "Flipkart")])
+    buffer.enqueue_many([listing("Kettle", 949.0)])
+
+    assert buffer.stats()["pending"] == 2
+    assert sorted(h["price_inr"] for h in buffer.pending_history("Kettle")) == [899.0, 949.0]
+
+    buffer.flush_now()
+    assert sorted((r.source, r.price) for r in db.saved) == [("Amazon", 949.0), ("Flipkart", 899.0)]
+    assert buffer.stats()["pending"] == 0
+
+
+def test_replays_a_dead_workers_journal(db, new_buffer, tmp_path):
+    records = [listing("Kettle", 999.0).snapshot("2026-01-01T00:00:00+00:00"),
+               listing("Toaster", 1499.0).snapshot("2026-01-01T00:00:00+00:00")]
+    lines = "".join(json.dumps(r.to_dict()) + "\n" for r in records)
+    # A torn last line, as a crash mid-write leaves it
+    (tmp_path / "journal-999999999.jsonl").write_text(lines + '{"title": "Bl', encoding="utf-8")
+
+    buffer = new_buffer()
+    assert buffer.stats()["pending"] == 2
+    assert not (tmp_path / "journal-999999999.jsonl").exists()
+
+    buffer.flush_now()
+    assert sorted(r.title for r in db.saved) == ["Kettle", "Toaster"]
+
+
+def test_a_rejected_record_does_not_hold_back_its_batch(db, new_buffer, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_MAX_ATTEMPTS', 2)
+    db.rejects.add("Broken")
+    buffer = new_buffer()
+
+    buffer.enqueue_many([listing("Kettle", 999.0), listing("Broken", 1.0), listing("Toaster", 1499.0)])
+    buffer.flush_now()
+    assert sorted(r.title for r in db.saved) == ["Kettle", "Toaster"]
+    assert buffer.stats()["pending"] == 1
+
+    # Second failure while the DB is up: parked in the dead-letter file
+    buffer.enqueue_many([listing("Blender", 2999.0)])
+    buffer.flush_now()
+    buffer.flush_now()
+    assert buffer.stats() == {"pending": 0, "inflight": 0, "dropped": 0, "dead_lettered": 1}
+    with open(os.path.join(tmp_path, "dead-letter.jsonl"), encoding="utf-8") as f:
+        assert [json.loads(line)["title"] for line in f] == ["Broken"]
+
+
+def test_nothing_is_dead_lettered_while_the_db_is_down(db, new_buffer, monkeypatch):
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_MAX_ATTEMPTS', 1)
+    db.down = True
+    buffer = new_buffer()
+
+    buffer.enqueue_many([listing("Kettle", 999.0), listing("Toaster", 1499.0)])
+    for _ in range(3):
+        buffer.flush_now()
+    assert buffer.stats()["pending"] == 2
+    assert buffer.stats()["dead_lettered"] == 0
+
+    db.down = False
+    buffer.flush_now()
+    assert sorted(r.title for r in db.saved) == ["Kettle", "Toaster"]
+
+
+def journal_lines(buffer):
+    with open(buffer._journal_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_flushed_records_are_acked_not_rewritten(db, new_buffer, tmp_path):
+    buffer = new_buffer()
+    buffer.enqueue_many([listing("Kettle", 999.0), listing("Toaster", 1499.0)])
+    buffer.flush_now()
+    buffer.enqueue_many([listing("Blender", 2999.0)])
+
+    lines = journal_lines(buffer)
+    assert [line.get("title") for line in lines] == ["Kettle", "Toaster", None, "Blender"]
+    assert sorted(title for title, _, _ in lines[2]["acked"]) == ["Kettle", "Toaster"]
+
+    # A crash now replays only the unflushed listing
+    os.rename(buffer._journal_path, tmp_path / "journal-999999999.jsonl")
+    buffer._journal.close()
+    buffer._journal = None
+    recovered = new_buffer()
+    assert [key[0] for key in recovered._pending] == ["Blender"]
+
+
+def test_an_ack_does_not_cover_a_newer_price(db, new_buffer, tmp_path):
+    buffer = new_buffer()
+    buffer.enqueue_many([listing("Kettle", 999.0)])
+    buffer.flush_now()
+    buffer.enqueue_many([listing("Kettle", 899.0)])
+    buffer._journal.close()
+    buffer._journal = None
+    os.rename(buffer._journal_path, tmp_path / "journal-999999999.jsonl")
+
+    recovered = new_buffer()
+    assert [r.price for r in recovered._pending.values()] == [899.0]
+
+
+def test_journal_is_compacted_to_unflushed_records(db, new_buffer, monkeypatch):
+    monkeypatch.setattr(write_behind, 'JOURNAL_COMPACT_MIN_LINES', 4)
+    buffer = new_buffer()
+    for i in range(3):
+        buffer.enqueue_many([listing(f"Kettle {i}", 999.0)])
+        buffer.flush_now()
+    buffer.enqueue_many([listing("Toaster", 1499.0)])
+
+    assert buffer._journal_due()
+    buffer._compact_journal()
+    assert [line["title"] for line in journal_lines(buffer)] == ["Toaster"]
+
+    # Appends keep going to the compacted journal
+    buffer.enqueue_many([listing("Blender", 2999.0)])
+    assert [line["title"] for line in journal_lines(buffer)] == ["Toaster", "Blender"]
+
+
+class BrokenFile:
+    def write(self, text):
+        raise OSError(28, "No space left on device")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_journal_errors_do_not_reach_the_request(db, new_buffer):
+    buffer = new_buffer()
+    buffer._journal = BrokenFile()
+
+    buffer.enqueue_many([listing("Kettle", 999.0)])
+    buffer.flush_now()
+    assert [r.title for r in db.saved] == ["Kettle"]
+    buffer._journal = None
+
+
+def test_worker_survives_an_unexpected_error(db, new_buffer, monkeypatch):
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_BATCH_SIZE', 1)
+    monkeypatch.setattr(Config, 'WRITE_BEHIND_FLUSH_INTERVAL', 0.01)
+    buffer = new_buffer()
+    flush = buffer._flush
+    calls = []
+
+    def flaky_flush(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("bug")
+        return flush(batch)
+
+    monkeypatch.setattr(buffer, '_flush', flaky_flush)
+    buffer.enqueue_many([listing("Kettle", 999.0)])
+
+    deadline = time.monotonic() + 5
+    while not db.saved and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [r.title for r in db.saved] == ["Kettle"]
+    assert buffer._worker.is_alive()